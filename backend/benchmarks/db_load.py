@@ -0,0 +1,73 @@
+"""
+Load test for the async Neo4j access layer.
+
+Runs the /crimesubtypes query through Neo4jDatabase.execute_query at
+increasing concurrency levels and reports throughput and latency for each
+level. With a non-blocking driver, throughput should scale with concurrency
+until the connection pool or the server saturates.
+
+Usage (from backend/, with NEO4J_* set in .env):
+    python -m benchmarks.db_load --levels 1,2,4,8,16,32 --requests 400
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from services.db import Neo4jDatabase
+
+QUERY = """
+MATCH (n:CrimeSubtype)
+RETURN n.name AS name
+ORDER BY name
+"""
+
+async def run_level(db, concurrency, total_requests):
+    """Issue total_requests queries with at most `concurrency` in flight."""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await db.execute_query(QUERY)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "concurrency": concurrency,
+        "throughput": total_requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+async def main(levels, total_requests):
+    db = Neo4jDatabase(max_pool_size=max(levels))
+    try:
+        # Warm the pool so the first level doesn't pay connection setup
+        await db.execute_query("RETURN 1 AS n")
+
+        print(f"{'concurrency':>11} {'req/s':>10} {'p50 ms':>10} {'p95 ms':>10}")
+        baseline = None
+        for level in levels:
+            stats = await run_level(db, level, total_requests)
+            baseline = baseline or stats["throughput"]
+            print(
+                f"{stats['concurrency']:>11} {stats['throughput']:>10.1f} "
+                f"{stats['p50_ms']:>10.2f} {stats['p95_ms']:>10.2f}"
+                f"   x{stats['throughput'] / baseline:.2f}"
+            )
+    finally:
+        await db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,2,4,8,16,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=400, help="Queries issued per level")
+    args = parser.parse_args()
+
+    asyncio.run(main([int(level) for level in args.levels.split(",")], args.requests))
@@ -0,0 +1,94 @@
+"""
+Latency benchmark for GET /evidence/{subtype}: legacy and snapshot paths.
+
+The legacy path reproduces the four sequential queries the endpoint used
+to run (full subtype scan, exact-match count, case-insensitive scan,
+evidence query). The current path resolves the name and reads the
+evidence from the in-memory catalogue snapshot (CatalogStore) without a
+round-trip.
+
+Usage (from backend/, with NEO4J_* set in .env):
+    python -m benchmarks.evidence_latency --subtype "ransomware" --device windows --iterations 200
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from services.catalog_snapshot import get_catalog_store
+from services.db import get_db
+
+# Evidence items for one subtype with their locations on one device, as
+# the endpoint queried them before the catalogue snapshot
+EVIDENCE_QUERY = """
+MATCH (s:CrimeSubtype {name: $subtype})-[:HAS_EVIDENCE]->(e:EvidenceItem)
+OPTIONAL MATCH (e)-[r]->(p:PossibleLocation)
+WHERE type(r) = $relationship_type
+WITH e, collect(p.path) AS locations
+RETURN e.name AS name, e.significance AS significance, locations
+"""
+
+async def legacy_path(db, subtype, relationship_type):
+    await db.execute_query("MATCH (s:CrimeSubtype) RETURN s.name as name")
+    check = await db.execute_query(
+        "MATCH (s:CrimeSubtype {name: $subtype}) RETURN count(s) as count", {"subtype": subtype}
+    )
+    if not check or check[0].get("count", 0) == 0:
+        matches = await db.execute_query(
+            "MATCH (s:CrimeSubtype) WHERE toLower(s.name) = toLower($subtype) RETURN s.name as name",
+            {"subtype": subtype},
+        )
+        if not matches:
+            return []
+        subtype = matches[0]["name"]
+    return await db.execute_query(EVIDENCE_QUERY, {"subtype": subtype, "relationship_type": relationship_type})
+
+async def snapshot_path(subtype, device):
+    snapshot = await get_catalog_store().get()
+    resolved = snapshot.resolve(subtype)
+    if resolved is None:
+        return []
+    return snapshot.evidence(resolved, device)
+
+async def measure(label, fn, iterations):
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        await fn()
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    p50 = statistics.median(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<10} p50 {p50:8.2f} ms   p95 {p95:8.2f} ms   mean {statistics.fmean(latencies):8.2f} ms")
+    return p50
+
+async def main(subtype, device, iterations):
+    db = get_db()
+    relationship_type = f"POSSIBLE_LOCATION_ON_{device.upper()}"
+    try:
+        if subtype is None:
+            names = await db.execute_query("MATCH (s:CrimeSubtype) RETURN s.name AS name LIMIT 1")
+            if not names:
+                raise SystemExit("No CrimeSubtype nodes in the database")
+            # Deliberately off-case so the legacy path takes its fallback scan
+            subtype = names[0]["name"].upper()
+
+        print(f"subtype={subtype!r} device={device} iterations={iterations}")
+        # Warm up the pool and the snapshot
+        await legacy_path(db, subtype, relationship_type)
+        await snapshot_path(subtype, device)
+
+        legacy = await measure("legacy", lambda: legacy_path(db, subtype, relationship_type), iterations)
+        current = await measure("snapshot", lambda: snapshot_path(subtype, device), iterations)
+        print(f"speedup at p50: snapshot x{legacy / current:.2f}")
+    finally:
+        await db.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subtype", help="Subtype name to query (default: first subtype, upper-cased)")
+    parser.add_argument("--device", default="windows", choices=["android", "windows"])
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.subtype, args.device, args.iterations))
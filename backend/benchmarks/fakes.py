@@ -0,0 +1,366 @@
+"""
+Offline stand-ins for Neo4j and Ollama, used by the benchmark harness.
+
+FakeOllamaServer is a real HTTP server on 127.0.0.1 speaking the subset of
+the Ollama API the backend uses, so requests go through the pooled httpx
+client as in production. Embeddings are deterministic unit vectors derived
+from a hash of the input text.
+
+FakeNeo4jDatabase replaces Neo4jDatabase with an in-memory synthetic
+catalogue. Queries are dispatched on the ``name`` passed to
+the query methods, so the Cypher text itself is never parsed.
+"""
+import asyncio
+import hashlib
+import json
+import random
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from services.db import Neo4jDatabase
+from services.embedding_cache import text_hash
+from services.ollama import OLLAMA_EMBEDDING_MODEL, OLLAMA_GENERATE_MODEL
+
+DIMENSIONS = 384
+
+# Building blocks for synthetic catalogue text
+_WORDS = (
+    "browser history registry hive prefetch artifact timestamp account login session "
+    "cache cookie download message chat contact call log photo location wifi usb "
+    "device backup email attachment document shortcut recycle thumbnail database"
+).split()
+_DEVICES = ("android", "windows")
+
+
+def fake_embedding(text: str, dims: int = DIMENSIONS) -> List[float]:
+    """Deterministic unit vector for a text."""
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dims).astype(np.float32)
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class FakeOllamaServer:
+    """
+    Minimal Ollama HTTP API with configurable per-call latency.
+
+    Supports /api/embeddings, /api/embed, /api/generate (streaming and not)
+    and /api/tags.
+    """
+
+    def __init__(self, embed_latency: float = 0.01, generate_latency: float = 0.05,
+                 token_latency: float = 0.002, tokens: int = 20):
+        self.embed_latency = embed_latency
+        self.generate_latency = generate_latency
+        self.token_latency = token_latency
+        self.tokens = tokens
+        self.calls: Dict[str, int] = {}
+        self._server: Optional[uvicorn.Server] = None
+        self._task: Optional[asyncio.Task] = None
+        self.url = ""
+
+    def _count(self, path: str):
+        self.calls[path] = self.calls.get(path, 0) + 1
+
+    async def _embeddings(self, request: Request):
+        self._count("/api/embeddings")
+        body = await request.json()
+        await asyncio.sleep(self.embed_latency)
+        return JSONResponse({"embedding": fake_embedding(body["prompt"])})
+
+    async def _embed(self, request: Request):
+        self._count("/api/embed")
+        body = await request.json()
+        inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+        await asyncio.sleep(self.embed_latency)
+        return JSONResponse({"model": body.get("model"), "embeddings": [fake_embedding(text) for text in inputs]})
+
+    async def _generate(self, request: Request):
+        self._count("/api/generate")
+        body = await request.json()
+        words = [random.choice(_WORDS) + " " for _ in range(self.tokens)] if body.get("prompt") else []
+        if not body.get("stream", True):
+            await asyncio.sleep(self.generate_latency + self.token_latency * len(words))
+            return JSONResponse({"response": "".join(words), "done": True})
+
+        async def chunks():
+            await asyncio.sleep(self.generate_latency)
+            for word in words:
+                yield json.dumps({"response": word, "done": False}) + "\n"
+                await asyncio.sleep(self.token_latency)
+            yield json.dumps({"response": "", "done": True}) + "\n"
+
+        return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+    async def _tags(self, _request: Request):
+        self._count("/api/tags")
+        return JSONResponse({"models": [
+            {"name": f"{OLLAMA_EMBEDDING_MODEL}:latest"},
+            {"name": f"{OLLAMA_GENERATE_MODEL}:latest"},
+        ]})
+
+    async def start(self) -> str:
+        """Start serving on a free local port and return the base URL."""
+        app = Starlette(routes=[
+            Route("/api/embeddings", self._embeddings, methods=["POST"]),
+            Route("/api/embed", self._embed, methods=["POST"]),
+            Route("/api/generate", self._generate, methods=["POST"]),
+            Route("/api/tags", self._tags, methods=["GET"]),
+        ])
+        config = uvicorn.Config(app, host="127.0.0.1", port=0, log_level="warning", lifespan="off")
+        self._server = uvicorn.Server(config)
+        self._task = asyncio.create_task(self._server.serve())
+        while not self._server.started:
+            await asyncio.sleep(0.01)
+        port = self._server.servers[0].sockets[0].getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.should_exit = True
+            await self._task
+
+
+class FakeNeo4jDatabase:
+    """
+    In-memory Neo4jDatabase stand-in seeded with a synthetic catalogue.
+
+    The catalogue has ``subtypes`` CrimeSubtype nodes, each with
+    ``items_per_subtype`` EvidenceItem nodes, and each item has
+    ``locations_per_item`` PossibleLocation paths per device. Every call
+    sleeps ``latency`` seconds to model the network round-trip.
+    """
+
+    def __init__(self, subtypes: int = 50, items_per_subtype: int = 20, locations_per_item: int = 3,
+                 latency: float = 0.002, embedded: bool = True, seed: int = 42):
+        self.latency = latency
+        self.calls: Dict[str, int] = {}
+        self.catalog_version = 1
+        self.nodes: Dict[int, Dict[str, Any]] = {}
+        self.subtype_items: Dict[str, List[int]] = {}
+        self.subtype_ids: Dict[str, int] = {}
+        self.item_subtypes: Dict[int, str] = {}
+        rng = random.Random(seed)
+
+        node_id = 0
+        for s in range(subtypes):
+            subtype_name = f"{rng.choice(_WORDS).title()} {rng.choice(_WORDS).title()} Crime {s}"
+            self.nodes[node_id] = self._node(node_id, "CrimeSubtype", subtype_name, rng)
+            self.subtype_ids[subtype_name] = node_id
+            items = self.subtype_items.setdefault(subtype_name, [])
+            node_id += 1
+            for i in range(items_per_subtype):
+                node = self._node(node_id, "EvidenceItem", f"{rng.choice(_WORDS).title()} artifact {s}-{i}", rng)
+                node["locations"] = {
+                    device: [
+                        f"/data/{device}/{rng.choice(_WORDS)}/{rng.choice(_WORDS)}_{s}_{i}_{n}.db"
+                        for n in range(locations_per_item)
+                    ]
+                    for device in _DEVICES
+                }
+                self.nodes[node_id] = node
+                items.append(node_id)
+                self.item_subtypes[node_id] = subtype_name
+                node_id += 1
+
+        if embedded:
+            for node in self.nodes.values():
+                node["embedding"] = fake_embedding(node["description"])
+                node["embedding_hash"] = text_hash(node["description"])
+                node["embedding_model"] = OLLAMA_EMBEDDING_MODEL
+        self._matrix: Optional[np.ndarray] = None
+
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], List[Dict[str, Any]]]] = {
+            "health_ping": lambda _p: [{"n": 1}],
+            "catalog_version": lambda _p: [{"version": self.catalog_version}],
+            "catalog_version_bump": self._bump,
+            "catalog_export": self._export,
+            "catalog_snapshot": self._export,
+            "lexical_index_build": self._lexical_page,
+            "vector_index_build": self._vector_page,
+            "vector_index_check": lambda _p: [{"exists": True}],
+            "vector_index_create": lambda _p: [],
+            "vector_search": self._vector_search,
+            "vector_search_batch": self._vector_search_batch,
+            "vector_search_scoped": self._vector_search_scoped,
+            "neighbourhood": self._neighbourhood,
+            "embedding_candidates": self._candidates,
+            "embedding_write_batch": self._write_batch,
+        }
+
+    @staticmethod
+    def _node(node_id: int, label: str, name: str, rng: random.Random) -> Dict[str, Any]:
+        description = " ".join(rng.choice(_WORDS) for _ in range(12))
+        return {
+            "nodeId": node_id, "labels": [label], "name": name,
+            "description": f"{name}: {description}",
+            "significance": " ".join(rng.choice(_WORDS) for _ in range(8)),
+        }
+
+    @staticmethod
+    def _public(node: Dict[str, Any]) -> Dict[str, Any]:
+        return {field: node[field] for field in ("nodeId", "labels", "name", "description", "significance")}
+
+    def _page(self, after: int, limit: int, keep: Callable[[Dict[str, Any]], bool]):
+        page = []
+        for node_id in sorted(self.nodes):
+            if node_id > after and keep(self.nodes[node_id]):
+                page.append(self.nodes[node_id])
+                if len(page) == limit:
+                    break
+        return page
+
+    # Query handlers, keyed by query name
+
+    def _bump(self, _params):
+        self.catalog_version += 1
+        return [{"version": self.catalog_version}]
+
+    def _export(self, _params):
+        rows = []
+        for subtype in sorted(self.subtype_items):
+            items = sorted((self.nodes[node_id] for node_id in self.subtype_items[subtype]), key=lambda n: n["name"])
+            subtype_id = self.subtype_ids.get(subtype)
+            rows.extend(
+                {"subtype": subtype, "subtypeId": subtype_id, "name": node["name"], "nodeId": node["nodeId"],
+                 "significance": node["significance"], **node["locations"]}
+                for node in items
+            )
+            if not items:
+                rows.append({"subtype": subtype, "subtypeId": subtype_id, "name": None, "nodeId": None,
+                             "significance": None, "android": [], "windows": []})
+        return rows
+
+    def _lexical_page(self, params):
+        return [
+            {**self._public(node), "paths": [p for paths in node.get("locations", {}).values() for p in paths]}
+            for node in self._page(params["after"], params["limit"], lambda _n: True)
+        ]
+
+    def _vector_page(self, params):
+        return [
+            {**self._public(node), "embedding": node["embedding"]}
+            for node in self._page(params["after"], params["limit"], lambda n: "embedding" in n)
+        ]
+
+    def _vector_search(self, params):
+        if self._matrix is None:
+            self._ids = [node_id for node_id, node in self.nodes.items() if "embedding" in node]
+            self._matrix = np.asarray([self.nodes[node_id]["embedding"] for node_id in self._ids], dtype=np.float32)
+        if not len(self._ids):
+            return []
+        query = np.asarray(params["queryEmbedding"], dtype=np.float32)
+        scores = self._matrix @ (query / np.linalg.norm(query))
+        top = np.argsort(-scores)[:params["limit"]]
+        return [{**self._public(self.nodes[self._ids[i]]), "score": float((1 + scores[i]) / 2)} for i in top]
+
+    def _vector_search_batch(self, params):
+        return [
+            {"queryIndex": i, **row}
+            for i, embedding in enumerate(params["queryEmbeddings"])
+            for row in self._vector_search({"queryEmbedding": embedding, "limit": params["limit"]})
+        ]
+
+    def _vector_search_scoped(self, params):
+        ids = [node_id for node_id in params["nodeIds"] if "embedding" in self.nodes.get(node_id, {})]
+        if not ids:
+            return []
+        matrix = np.asarray([self.nodes[node_id]["embedding"] for node_id in ids], dtype=np.float32)
+        rows = []
+        for i, embedding in enumerate(params["queryEmbeddings"]):
+            query = np.asarray(embedding, dtype=np.float32)
+            scores = matrix @ (query / np.linalg.norm(query))
+            rows.extend(
+                {"queryIndex": i, **self._public(self.nodes[ids[j]]), "score": float((1 + scores[j]) / 2)}
+                for j in np.argsort(-scores)[:params["limit"]]
+            )
+        return rows
+
+    def _neighbourhood(self, params):
+        # One hop over HAS_EVIDENCE and the location relationships
+        rows = []
+        for source_id in params["nodeIds"]:
+            node = self.nodes.get(source_id)
+            if node is None:
+                continue
+            if node["labels"][0] == "CrimeSubtype":
+                neighbours = [
+                    {"nodeId": item_id, "labels": ["EvidenceItem"], "name": self.nodes[item_id]["name"],
+                     "path": None, "relationship": "HAS_EVIDENCE"}
+                    for item_id in self.subtype_items[node["name"]]
+                ]
+            else:
+                subtype = self.item_subtypes[source_id]
+                neighbours = [{"nodeId": self.subtype_ids[subtype], "labels": ["CrimeSubtype"], "name": subtype,
+                               "path": None, "relationship": "HAS_EVIDENCE"}]
+                neighbours.extend(
+                    {"nodeId": None, "labels": ["PossibleLocation"], "name": None, "path": path,
+                     "relationship": f"POSSIBLE_LOCATION_ON_{device.upper()}"}
+                    for device, paths in node["locations"].items() for path in paths
+                )
+            rows.extend({"sourceId": source_id, **row, "depth": 1} for row in neighbours[:params["perNodeLimit"]])
+        return rows
+
+    def _candidates(self, params):
+        return [
+            {**self._public(node), "text": node["description"],
+             "paths": [p for paths in node.get("locations", {}).values() for p in paths],
+             "embeddingHash": node.get("embedding_hash") if "embedding" in node else None,
+             "embeddingModel": node.get("embedding_model")}
+            for node in self._page(params["after"], params["limit"], lambda _n: True)
+        ]
+
+    def _write_batch(self, params):
+        for row in params["rows"]:
+            node = self.nodes[row["nodeId"]]
+            node["embedding"] = row["embedding"]
+            node["embedding_hash"] = row["contentHash"]
+            node["embedding_model"] = params["model"]
+        self._matrix = None
+        return [{"updated": len(params["rows"])}]
+
+    # Neo4jDatabase interface
+
+    async def execute_query(self, query, parameters=None, name=None, timeout=None):
+        self.calls[name] = self.calls.get(name, 0) + 1
+        await asyncio.sleep(self.latency)
+        handler = self._handlers.get(name)
+        if handler is None:
+            raise Exception(f"Query execution failed: fake database has no handler for query {name!r}")
+        return handler(parameters or {})
+
+    # A single in-memory store: every read already sees every write
+    execute_read = execute_query
+    execute_write = execute_query
+
+    async def stream_query(self, query, parameters=None, name=None, timeout=None):
+        for row in await self.execute_query(query, parameters, name):
+            yield row
+
+    async def bookmarks(self):
+        return set()
+
+    async def follow(self, bookmarks):
+        pass
+
+    # Builds the Cypher and groups rows as the real class does
+    expand_neighbourhoods = Neo4jDatabase.expand_neighbourhoods
+
+    async def verify_connectivity(self):
+        await asyncio.sleep(self.latency)
+
+    async def close(self):
+        pass
+
+    def clear_embeddings(self):
+        """Drop every stored embedding, so a refresh has the whole catalogue to do."""
+        for node in self.nodes.values():
+            for key in ("embedding", "embedding_hash", "embedding_model"):
+                node.pop(key, None)
+        self._matrix = None
@@ -0,0 +1,59 @@
+"""
+Import-time cost of the application, from ``python -X importtime``.
+
+Importing main should not touch the network or load heavy optional
+libraries; dependencies are connected and warmed up by the lifespan
+instead. This runs the import in a fresh interpreter, without Neo4j
+credentials, and lists the slowest modules by cumulative time.
+
+Usage (from backend/):
+    python -m benchmarks.import_time --top 20
+    python -m benchmarks.import_time --runs 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+def measure():
+    env = {key: value for key, value in os.environ.items() if not key.startswith("NEO4J_")}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), int(self_us), int(cumulative_us), depth))
+    return modules
+
+def main(args):
+    totals = []
+    for _ in range(args.runs):
+        modules = measure()
+        totals.append(next(cumulative for name, _self, cumulative, _depth in modules if name == "main") / 1000)
+    print(f"import main: median {statistics.median(totals):.1f} ms over {args.runs} run(s)")
+
+    # -X importtime prints children before their parent, so main's direct
+    # imports are the depth-1 lines just before the "main" line
+    direct, pending = [], []
+    for module in modules:
+        if module[3] == 1:
+            pending.append(module)
+        elif module[3] == 0:
+            if module[0] == "main":
+                direct = pending
+            pending = []
+    print("\nslowest direct imports (cumulative ms):")
+    for name, _self, cumulative, _depth in sorted(direct, key=lambda m: m[2], reverse=True)[:args.top]:
+        print(f"  {cumulative / 1000:8.1f}  {name}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    main(parser.parse_args())
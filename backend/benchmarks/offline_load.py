@@ -0,0 +1,208 @@
+"""
+Offline load test of the API against in-process Neo4j and Ollama stand-ins.
+
+Drives /crimesubtypes, /evidence, /ask, /ask/stream, /ask/batch (8
+questions per request) and /export (the whole catalogue) through the full
+ASGI app (middleware, caches, single-flight included) at each concurrency
+level, and reports p50/p95/p99 latency and throughput. The "embeddings"
+scenario runs the refresh pipeline over the whole synthetic catalogue,
+using each level as the pipeline's embed concurrency. No network access
+or running services are needed; see benchmarks/fakes.py.
+
+Usage (from backend/):
+    python -m benchmarks.offline_load --levels 1,8,32 --requests 400
+    python -m benchmarks.offline_load --scenarios ask,evidence --subtypes 200 --ollama-latency-ms 20
+
+    # Record a baseline, change something, then compare against it
+    python -m benchmarks.offline_load --save baseline.json
+    python -m benchmarks.offline_load --baseline baseline.json --tolerance 0.10
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import statistics
+import sys
+import time
+
+import httpx
+
+from benchmarks.fakes import FakeNeo4jDatabase, FakeOllamaServer
+from services import db as db_module
+from services import embedding_cache, embedding_pipeline, ollama
+from services.response_cache import get_response_cache
+
+SCENARIOS = ("crimesubtypes", "evidence", "ask", "ask_stream", "ask_batch", "export", "embeddings")
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, max(0, int(round(len(values) * fraction)) - 1))]
+
+def summarize(latencies, elapsed, errors, units):
+    return {
+        "p50_ms": statistics.median(latencies) * 1000 if latencies else None,
+        "p95_ms": percentile(latencies, 0.95) * 1000 if latencies else None,
+        "p99_ms": percentile(latencies, 0.99) * 1000 if latencies else None,
+        "throughput": units / elapsed if elapsed > 0 else 0.0,
+        "errors": errors,
+    }
+
+def make_requests(db, rng):
+    """Request factories per HTTP scenario, drawing parameters from the catalogue."""
+    subtypes = list(db.subtype_items)
+    items = [node for node in db.nodes.values() if node["labels"] == ["EvidenceItem"]]
+
+    def question():
+        node = rng.choice(items)
+        return {"question": f"Where is {node['name'].lower()} stored and why does {rng.choice(node['significance'].split())} matter?"}
+
+    return {
+        "crimesubtypes": lambda: ("GET", "/crimesubtypes/", None),
+        "evidence": lambda: ("GET", f"/evidence/{rng.choice(subtypes).lower()}?device={rng.choice(['android', 'windows'])}", None),
+        "ask": lambda: ("POST", "/ask/", question()),
+        "ask_stream": lambda: ("POST", "/ask/stream", question()),
+        "ask_batch": lambda: ("POST", "/ask/batch", {"questions": [question()["question"] for _ in range(8)]}),
+        "export": lambda: ("GET", "/export/", None),
+    }
+
+async def run_http(client, factory, concurrency, total):
+    latencies, errors = [], 0
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        nonlocal errors
+        method, path, body = factory()
+        async with semaphore:
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            # Reading the body also drains streamed responses
+            await response.aread()
+            if response.status_code >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    return summarize(latencies, time.perf_counter() - start, errors, total)
+
+async def run_embeddings(db, concurrency):
+    db.clear_embeddings()
+    embedding_cache._cache = embedding_cache.EmbeddingCache(path="")
+    start = time.perf_counter()
+    stats = await embedding_pipeline.run_embedding_refresh(concurrency=concurrency)
+    elapsed = time.perf_counter() - start
+    # One "latency" sample per node is meaningless here; report throughput only
+    result = summarize([], elapsed, stats.failed, stats.processed)
+    result["nodes"] = stats.processed
+    return result
+
+def print_row(scenario, level, result, baseline=None):
+    def fmt(key, width=9):
+        value = result.get(key)
+        text = "-" if value is None else f"{value:.2f}"
+        if baseline and baseline.get(key) and value is not None:
+            text += f" ({(value - baseline[key]) / baseline[key] * 100:+.0f}%)"
+        return f"{text:>{width + (8 if baseline else 0)}}"
+    print(f"{scenario:<14}{level:>6} {fmt('p50_ms')} {fmt('p95_ms')} {fmt('p99_ms')} {fmt('throughput', 10)} {result['errors']:>7}")
+
+def regressions(results, baseline, tolerance):
+    """Scenario/level pairs whose latency rose or throughput fell beyond tolerance."""
+    found = []
+    for scenario, levels in results.items():
+        for level, result in levels.items():
+            before = baseline.get("results", {}).get(scenario, {}).get(level)
+            if not before:
+                continue
+            for key in ("p50_ms", "p95_ms", "p99_ms"):
+                if result.get(key) and before.get(key) and result[key] > before[key] * (1 + tolerance):
+                    found.append(f"{scenario}@{level} {key} {before[key]:.2f} -> {result[key]:.2f}")
+            if before.get("throughput") and result["throughput"] < before["throughput"] * (1 - tolerance):
+                found.append(f"{scenario}@{level} throughput {before['throughput']:.1f} -> {result['throughput']:.1f}")
+    return found
+
+async def main(args):
+    logging.getLogger().setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+
+    server = FakeOllamaServer(
+        embed_latency=args.ollama_latency_ms / 1000,
+        generate_latency=args.generate_latency_ms / 1000,
+        token_latency=args.token_latency_ms / 1000,
+    )
+    await server.start()
+    db = FakeNeo4jDatabase(
+        subtypes=args.subtypes, items_per_subtype=args.items_per_subtype,
+        latency=args.neo4j_latency_ms / 1000, seed=args.seed,
+    )
+    db_module.database = db
+    ollama._client = ollama.OllamaClient(base_url=server.url)
+    embedding_cache._cache = embedding_cache.EmbeddingCache(path="")
+    if args.no_response_cache:
+        get_response_cache().max_entries = 0
+
+    # Imported after the stand-ins are installed
+    import main as app_module
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"catalogue: {len(db.nodes)} nodes, neo4j {args.neo4j_latency_ms} ms, ollama embed {args.ollama_latency_ms} ms")
+    print(f"{'scenario':<14}{'conc':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>10} {'errors':>7}")
+
+    results = {}
+    transport = httpx.ASGITransport(app=app_module.app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            requests = make_requests(db, rng)
+            for scenario in args.scenarios:
+                results[scenario] = {}
+                for level in args.levels:
+                    if scenario == "embeddings":
+                        result = await run_embeddings(db, level)
+                    else:
+                        # Warm lazily built indexes and pools before timing
+                        await run_http(client, requests[scenario], level, min(level, args.requests))
+                        result = await run_http(client, requests[scenario], level, args.requests)
+                    results[scenario][str(level)] = result
+                    before = (baseline or {}).get("results", {}).get(scenario, {}).get(str(level))
+                    print_row(scenario, level, result, before)
+    finally:
+        await ollama.close_client()
+        await server.stop()
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, indent=2)
+        print(f"saved results to {args.save}")
+
+    if baseline:
+        found = regressions(results, baseline, args.tolerance)
+        if found:
+            print(f"\n{len(found)} regression(s) beyond {args.tolerance:.0%}:")
+            for line in found:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"\nno regressions beyond {args.tolerance:.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", type=lambda s: s.split(","), default=list(SCENARIOS),
+                        help=f"Comma-separated subset of {','.join(SCENARIOS)}")
+    parser.add_argument("--levels", type=lambda s: [int(x) for x in s.split(",")], default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=400, help="Requests per scenario and level")
+    parser.add_argument("--subtypes", type=int, default=50)
+    parser.add_argument("--items-per-subtype", type=int, default=20)
+    parser.add_argument("--neo4j-latency-ms", type=float, default=2.0)
+    parser.add_argument("--ollama-latency-ms", type=float, default=10.0, help="Latency of each embedding call")
+    parser.add_argument("--generate-latency-ms", type=float, default=50.0, help="Latency before the first generated token")
+    parser.add_argument("--token-latency-ms", type=float, default=2.0)
+    parser.add_argument("--no-response-cache", action="store_true", help="Disable the response cache so every request hits the stand-ins")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--save", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Allowed relative regression in baseline mode")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,139 @@
+"""
+Recall and latency of the local NumPy vector index vs Neo4j's vector index,
+and of each embedding storage format.
+
+The local index is exact, so its results serve as ground truth: recall@k
+reported for Neo4j is the overlap of its top k with the exact top k.
+Queries are stored node embeddings with a little noise added, which
+mimics questions close to catalogue text.
+
+The format table compares float64 (what a Cypher list property holds),
+float32, int8 codes alone, and int8 with a float32 re-rank of the top
+k * --rerank-factor candidates: bytes per corpus, recall@k against the
+float64 top k, and single-query latency.
+
+Usage (from backend/):
+    # Against a live Neo4j with embeddings (NEO4J_* in .env)
+    python -m benchmarks.vector_search --queries 200 --k 5
+
+    # Local index only, on a synthetic corpus; no services needed
+    python -m benchmarks.vector_search --synthetic 50000 --queries 200 --k 5 --rerank-factor 4
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import numpy as np
+
+from services import embedding
+from services.vector_index import LocalVectorIndex
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)]
+
+def report(label, latencies_ms):
+    print(
+        f"{label:<24} p50 {statistics.median(latencies_ms):8.3f} ms   "
+        f"p95 {percentile(latencies_ms, 0.95):8.3f} ms"
+    )
+
+def make_queries(index, count, noise, rng):
+    rows = rng.integers(0, len(index), size=count)
+    base = np.asarray(index._state.matrix[rows])
+    return base + rng.normal(0, noise, size=base.shape).astype(np.float32)
+
+def time_local(index, queries, k, batch_size):
+    single = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k)
+        single.append((time.perf_counter() - start) * 1000)
+    report("local (single)", single)
+
+    start = time.perf_counter()
+    for i in range(0, len(queries), batch_size):
+        index.search_batch(queries[i:i + batch_size], k)
+    elapsed = time.perf_counter() - start
+    print(f"{'local (batched)':<24} {len(queries) / elapsed:10.0f} queries/sec at batch size {batch_size}")
+
+def compare_formats(vectors, queries, k, rerank_factor):
+    exact64 = vectors.astype(np.float64)
+    exact64 /= np.linalg.norm(exact64, axis=1, keepdims=True)
+    truth = []
+    float64_latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        q = query.astype(np.float64) / np.linalg.norm(query)
+        scores = exact64 @ q
+        top = np.argpartition(-scores, k - 1)[:k]
+        float64_latencies.append((time.perf_counter() - start) * 1000)
+        truth.append(set(top.tolist()))
+
+    rows = [("float64", exact64.nbytes, 1.0, float64_latencies)]
+    for label, quantization, factor in (
+        ("float32", "none", 1),
+        ("int8", "int8", 1),
+        (f"int8 + rerank x{rerank_factor}", "int8", rerank_factor),
+    ):
+        index = LocalVectorIndex(path="", quantization=quantization, rerank_factor=factor)
+        index.upsert([{"nodeId": i, "embedding": v} for i, v in enumerate(vectors)])
+        footprint = index.footprint()
+        latencies, overlaps = [], []
+        for query, expected in zip(queries, truth):
+            start = time.perf_counter()
+            hits = index.search(query, k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            overlaps.append(len(expected & {hit["nodeId"] for hit in hits}) / k)
+        rows.append((label, footprint["scanned_bytes_per_query"], statistics.fmean(overlaps), latencies))
+
+    print(f"\n{'format':<24} {'scanned MiB':>12} {'recall@' + str(k):>10} {'p50 ms':>9} {'p95 ms':>9}")
+    for label, nbytes, recall, latencies in rows:
+        print(
+            f"{label:<24} {nbytes / 2**20:12.2f} {recall:10.4f} "
+            f"{statistics.median(latencies):9.3f} {percentile(latencies, 0.95):9.3f}"
+        )
+
+async def main(args):
+    rng = np.random.default_rng(42)
+    index = LocalVectorIndex(path="", quantization="none")
+
+    if args.synthetic:
+        vectors = rng.normal(size=(args.synthetic, args.dims)).astype(np.float32)
+        index.upsert([{"nodeId": i, "embedding": v} for i, v in enumerate(vectors)])
+        print(f"synthetic corpus: {len(index)} x {index.dims}, {index._state.matrix.nbytes / 2**20:.1f} MiB")
+        queries = make_queries(index, args.queries, args.noise, rng)
+        time_local(index, queries, args.k, args.batch_size)
+        compare_formats(vectors, queries, args.k, args.rerank_factor)
+        return
+
+    await index.build_from_graph()
+    if not len(index):
+        raise SystemExit("No node embeddings found in Neo4j")
+    print(f"corpus: {len(index)} x {index.dims}, {index._state.matrix.nbytes / 2**20:.1f} MiB")
+    queries = make_queries(index, args.queries, args.noise, rng)
+
+    neo4j_latencies, overlaps = [], []
+    for query in queries:
+        exact = {hit["nodeId"] for hit in index.search(query, args.k)}
+        start = time.perf_counter()
+        hits = await embedding.neo4j_vector_search(query.tolist(), limit=args.k)
+        neo4j_latencies.append((time.perf_counter() - start) * 1000)
+        overlaps.append(len(exact & {hit["nodeId"] for hit in hits}) / len(exact))
+
+    report("neo4j", neo4j_latencies)
+    time_local(index, queries, args.k, args.batch_size)
+    print(f"neo4j recall@{args.k} vs exact: {statistics.fmean(overlaps):.4f} (local index is exact: 1.0000)")
+    compare_formats(np.asarray(index._state.matrix), queries, args.k, args.rerank_factor)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--synthetic", type=int, default=0, help="Benchmark a synthetic corpus of this size instead of Neo4j")
+    parser.add_argument("--dims", type=int, default=embedding.VECTOR_DIMENSIONS)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--rerank-factor", type=int, default=4, help="int8 candidates re-ranked per result")
+    parser.add_argument("--noise", type=float, default=0.02, help="Std-dev of noise added to query vectors")
+    asyncio.run(main(parser.parse_args()))
@@ -1,12 +1,49 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager, suppress
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routers import health, crimesubtypes, evidence, embeddings, ask  # Import all routers
+from routers import health, crimesubtypes, evidence, embeddings, ask, export, metrics  # Import all routers
+from services.db import close_db
+from services.ollama import close_client
+from services.embedding_cache import close_cache
+from services.embedding_jobs import get_job_manager
+from services.metrics import MetricsMiddleware
+from services.tracing import TracingMiddleware
+from services.lifecycle import warm_up
+from services.health_monitor import get_health_monitor
+
+logger = logging.getLogger(__name__)
+
+
+@asynccontextmanager
+async def lifespan(_app: FastAPI):
+    # Connect and warm up in the background: the server answers liveness
+    # probes at once and reports ready when warmup finishes
+    warmup = asyncio.create_task(warm_up())
+    # Dependency probes run in the background; health endpoints read their results
+    get_health_monitor().start()
+    yield
+    await get_health_monitor().stop()
+    warmup.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup
+    # Stop the embedding job at its checkpoint before closing what it uses
+    await asyncio.to_thread(get_job_manager().shutdown)
+    # Drain the Neo4j and Ollama connection pools
+    await close_db()
+    await close_client()
+    close_cache()
+    logger.info("Shutdown complete")
+
 
 # Initialize FastAPI
 app = FastAPI(
     title="Digital Crime Investigation Assistant API",
     description="API for processing queries about digital forensics",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 # Configure CORS
 app.add_middleware(
@@ -15,7 +52,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
+# Per-route latency histograms, exposed at /metrics
+app.add_middleware(MetricsMiddleware)
+# Request IDs, span trees and the slow-span log (outermost, so it times everything)
+app.add_middleware(TracingMiddleware)
 
 # Include routers
 app.include_router(health.router)
@@ -23,6 +65,8 @@ app.include_router(crimesubtypes.router)
 app.include_router(evidence.router)
 app.include_router(embeddings.router)
 app.include_router(ask.router)
+app.include_router(export.router)
+app.include_router(metrics.router)
 
 
 @app.get("/")
@@ -1,11 +1,18 @@
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import logging
-import requests
+import asyncio
 import json
-from typing import List, Dict, Any
+import logging
+import time
+from typing import List, Dict, Any, AsyncIterator, Optional, Tuple
 
 from services import embedding
+from services.db import get_db
+from services.ollama import get_client, OllamaError
+from services.lexical_index import get_lexical_index
+from services.singleflight import get_flight
+from services.metrics import STAGE_SECONDS, stage
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -14,82 +21,261 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/ask", tags=["ask"])
 
+# Rank offset for reciprocal-rank fusion (60 is the customary default)
+RRF_K = 60
+
+# Most questions accepted by /ask/batch, and answers generated at once
+ASK_BATCH_MAX_QUESTIONS = 64
+ASK_BATCH_CONCURRENCY = 4
+
+# Graph context added to each retrieved node: its parent subtypes or
+# evidence items and its locations, one hop away, capped per node
+ASK_CONTEXT_RELATIONSHIPS = ("HAS_EVIDENCE", "POSSIBLE_LOCATION_ON_ANDROID", "POSSIBLE_LOCATION_ON_WINDOWS")
+ASK_CONTEXT_DEPTH = 1
+ASK_CONTEXT_NEIGHBOURS = 10
+
+# Device named by each location relationship
+LOCATION_DEVICES = {
+    "POSSIBLE_LOCATION_ON_ANDROID": "android",
+    "POSSIBLE_LOCATION_ON_WINDOWS": "windows",
+}
+
+# Returned when retrieval finds nothing relevant
+NO_CONTEXT_ANSWER = "I don't have specific information about that in my knowledge base. Please try a different question related to digital forensics."
+
 # Request and response models
 class QuestionRequest(BaseModel):
     question: str
+    # Optional retrieval scope: node label, crime subtype and device
+    label: Optional[str] = None
+    subtype: Optional[str] = None
+    device: Optional[str] = None
 
 class QuestionResponse(BaseModel):
     answer: str
+    # name, type, relevance_score (vector similarity, 0-100, null for nodes
+    # found only by keyword search) and fused_score (0-100, hybrid rank)
     sources: List[Dict[str, Any]] = []
 
-@router.post("/", response_model=QuestionResponse)
-async def ask_question(request: QuestionRequest):
+class BatchQuestionRequest(BaseModel):
+    questions: List[str]
+    # Optional retrieval scope shared by every question
+    label: Optional[str] = None
+    subtype: Optional[str] = None
+    device: Optional[str] = None
+
+class BatchAnswer(BaseModel):
+    question: str
+    answer: Optional[str] = None
+    sources: List[Dict[str, Any]] = []
+    # Set instead of answer when this question failed
+    error: Optional[str] = None
+
+class BatchQuestionResponse(BaseModel):
+    results: List[BatchAnswer]
+
+def reciprocal_rank_fusion(ranked_lists: List[List[Dict[str, Any]]], limit: int) -> List[Dict[str, Any]]:
     """
-    Process a user question using semantic search and LLM integration.
+    Merge ranked node lists with reciprocal-rank fusion.
+    
+    Each node scores sum(1 / (RRF_K + rank)) over the lists it appears in.
+    The fused score is rescaled to 0..1 against a node ranked first in
+    every list and stored as "fused_score"; a vector similarity "score"
+    from any list is kept as-is.
     
     Args:
-        request (QuestionRequest): The user's question
+        ranked_lists (List[List[Dict]]): Node rows ordered best-first, each with "nodeId"
+        limit (int): Maximum number of nodes to return
         
     Returns:
-        QuestionResponse: The AI-generated answer with sources
+        List[Dict]: Fused node rows ordered best-first
+    """
+    fused: Dict[int, float] = {}
+    rows: Dict[int, Dict[str, Any]] = {}
+    for ranked in ranked_lists:
+        for rank, row in enumerate(ranked, start=1):
+            node_id = row["nodeId"]
+            fused[node_id] = fused.get(node_id, 0.0) + 1.0 / (RRF_K + rank)
+            kept = rows.setdefault(node_id, dict(row))
+            if row.get("score") is not None:
+                kept.setdefault("score", row["score"])
+
+    best_possible = len(ranked_lists) / (RRF_K + 1)
+    ordered = sorted(fused.items(), key=lambda item: item[1], reverse=True)[:limit]
+    return [{**rows[node_id], "fused_score": score / best_possible} for node_id, score in ordered]
+
+async def lexical_candidates(question: str, limit: int = 5,
+                             search_filter: Optional[embedding.SearchFilter] = None) -> Tuple[List[Dict[str, Any]], bool]:
+    """
+    Search the in-process BM25 index for a question.
+    
+    Args:
+        question (str): The user's question
+        limit (int): Maximum number of nodes to return
+        search_filter (SearchFilter, optional): Only rank nodes in this scope
+        
+    Returns:
+        Tuple[List[Dict], bool]: Node rows best-first, and whether the top
+        hit is confident enough to skip semantic search
+    """
+    index = get_lexical_index()
+    await index.ensure_loaded()
+    node_ids = await embedding.filter_node_ids(search_filter)
+    with stage("ask", "lexical_search"):
+        lexical = index.search(question, limit=limit, node_ids=node_ids)
+    return [{"nodeId": hit.node_id, **hit.meta} for hit in lexical.hits], lexical.confident
+
+async def retrieve(question: str, limit: int = 5,
+                   search_filter: Optional[embedding.SearchFilter] = None) -> List[Dict[str, Any]]:
+    """
+    Find the catalogue nodes most relevant to a question.
+    
+    Runs the in-process BM25 index first. If its top hit matches every
+    exact forensic term in the question (paths, file and package names)
+    by a clear margin, those hits are used as-is and the embedding call is
+    skipped. Otherwise lexical and vector hits are merged with
+    reciprocal-rank fusion. A filter scopes both searches, so a scoped
+    question still gets up to ``limit`` in-scope nodes.
+    
+    Args:
+        question (str): The user's question
+        limit (int): Maximum number of nodes to return
+        search_filter (SearchFilter, optional): Label, subtype and device scope
+        
+    Returns:
+        List[Dict]: Node rows with labels, name, description, significance,
+        fused_score and, for nodes found by vector search, score
         
     Raises:
-        HTTPException: If processing fails
+        HTTPException: If the question embedding cannot be generated
     """
-    question = request.question.strip()
+    lexical_nodes, confident = await lexical_candidates(question, limit, search_filter)
     
-    if not question:
+    if confident:
+        logger.debug("Answering from lexical hits without an embedding call")
+        return reciprocal_rank_fusion([lexical_nodes], limit)
+    
+    with stage("ask", "embed_question"):
+        query_embedding = await embedding.generate_embedding(question)
+    
+    if not query_embedding:
         raise HTTPException(
-            status_code=400,
-            detail="Question cannot be empty"
+            status_code=500,
+            detail="Failed to generate embedding for question"
         )
     
-    try:
-        # 1. Generate embedding for the question
-        query_embedding = embedding.generate_embedding(question)
+    with stage("ask", "vector_search"):
+        vector_nodes = await embedding.vector_search(query_embedding, limit=limit, search_filter=search_filter)
+    return reciprocal_rank_fusion([vector_nodes, lexical_nodes], limit)
+
+async def with_neighbours(node_lists: List[Optional[List[Dict[str, Any]]]], route: str) -> List[Optional[List[Dict[str, Any]]]]:
+    """
+    Attach the graph neighbourhood of every retrieved node, in one query.
+    
+    All hits of all lists are expanded together, so a request costs one
+    extra round-trip however many nodes or questions it has. Each node is
+    copied with a "neighbours" list (rows may be shared with other
+    requests through single-flight). Expansion is best effort: on failure
+    the nodes are returned without neighbours.
+    
+    Args:
+        node_lists (List[Optional[List[Dict]]]): Retrieved node rows per question; None entries are kept
+        route (str): Route name for the stage metric
         
-        if not query_embedding:
-            raise HTTPException(
-                status_code=500,
-                detail="Failed to generate embedding for question"
+    Returns:
+        List[Optional[List[Dict]]]: The lists with neighbours attached
+    """
+    node_ids = list(dict.fromkeys(
+        node["nodeId"] for nodes in node_lists if nodes for node in nodes if node.get("nodeId") is not None
+    ))
+    if not node_ids:
+        return node_lists
+    
+    try:
+        with stage(route, "expand_context"):
+            neighbourhoods = await get_db().expand_neighbourhoods(
+                node_ids,
+                relationship_types=ASK_CONTEXT_RELATIONSHIPS,
+                max_depth=ASK_CONTEXT_DEPTH,
+                per_node_limit=ASK_CONTEXT_NEIGHBOURS,
             )
+    except Exception as e:
+        logger.warning("Context expansion failed, answering without it: %s", e)
+        return node_lists
+    
+    return [
+        [{**node, "neighbours": neighbourhoods.get(node.get("nodeId"), [])} for node in nodes]
+        if nodes is not None else None
+        for nodes in node_lists
+    ]
+
+def neighbour_context(neighbours: List[Dict[str, Any]]) -> List[str]:
+    """Context lines describing a node's subtypes, evidence items and locations."""
+    subtypes = []
+    evidence = []
+    locations: Dict[str, List[str]] = {}
+    for neighbour in neighbours:
+        labels = neighbour.get("labels") or []
+        device = LOCATION_DEVICES.get(neighbour.get("relationship"))
+        if device and neighbour.get("path"):
+            locations.setdefault(device, []).append(neighbour["path"])
+        elif "CrimeSubtype" in labels and neighbour.get("name"):
+            subtypes.append(neighbour["name"])
+        elif "EvidenceItem" in labels and neighbour.get("name"):
+            evidence.append(neighbour["name"])
+    
+    lines = []
+    if subtypes:
+        lines.append(f"  Crime subtypes: {', '.join(subtypes)}")
+    if evidence:
+        lines.append(f"  Evidence: {', '.join(evidence)}")
+    for device, paths in sorted(locations.items()):
+        lines.append(f"  Locations on {device}: {'; '.join(paths)}")
+    return lines
+
+def build_prompt(question: str, nodes: List[Dict[str, Any]]) -> Tuple[str, List[Dict[str, Any]]]:
+    """
+    Assemble the LLM prompt and the source list from retrieved nodes.
+    
+    Args:
+        question (str): The user's question
+        nodes (List[Dict]): Retrieved node rows, optionally with "neighbours"
         
-        # 2. Perform vector similarity search
-        similar_nodes = embedding.vector_search(query_embedding, limit=5)
+    Returns:
+        Tuple[str, List[Dict]]: The prompt and the sources to return to the client
+    """
+    context = []
+    sources = []
+    
+    for node in nodes:
+        node_type = (node.get("labels") or ["Unknown"])[0]
+        name = node.get("name", "Unknown item")
+        description = node.get("description", "")
+        significance = node.get("significance", "")
+        related = neighbour_context(node.get("neighbours") or [])
         
-        if not similar_nodes:
-            # If no similar nodes found, provide a generic response
-            return QuestionResponse(
-                answer="I don't have specific information about that in my knowledge base. Please try a different question related to digital forensics.",
-                sources=[]
-            )
+        # Add to context for LLM
+        if description:
+            context.append(f"- {name}: {description}")
+        elif related:
+            context.append(f"- {name}")
         
-        # 3. Prepare context for LLM prompt
-        context = []
-        sources = []
-        
-        for node in similar_nodes:
-            node_type = node.get("labels", ["Unknown"])[0]
-            name = node.get("name", "Unknown item")
-            description = node.get("description", "")
-            significance = node.get("significance", "")
-            
-            # Add to context for LLM
-            if description:
-                context.append(f"- {name}: {description}")
-            
-            if significance:
-                context.append(f"  Significance: {significance}")
-            
-            # Add to sources for response
-            sources.append({
-                "name": name,
-                "type": node_type,
-                "relevance_score": round(node.get("score", 0) * 100, 2)
-            })
-        
-        # 4. Construct LLM prompt
-        prompt = f"""
+        if significance:
+            context.append(f"  Significance: {significance}")
+        context.extend(related)
+        
+        # Add to sources for response
+        # relevance_score keeps its vector-similarity scale; lexical-only
+        # hits have none, and every hit has its rank-based fused score
+        score = node.get("score")
+        sources.append({
+            "name": name,
+            "type": node_type,
+            "relevance_score": round(score * 100, 2) if score is not None else None,
+            "fused_score": round(node.get("fused_score", 0) * 100, 2),
+        })
+    
+    prompt = f"""
 Instruction: Use the following forensic knowledge to answer the question accurately. If the information doesn't contain an answer to the question, state that you don't have enough information rather than making up an answer.
 
 Context:
@@ -99,26 +285,131 @@ Question: {question}
 
 Answer:
 """
+    return prompt, sources
+
+def validate_question(request: QuestionRequest) -> str:
+    """Strip the question and reject empty input with a 400."""
+    question = request.question.strip()
+    
+    if not question:
+        raise HTTPException(
+            status_code=400,
+            detail="Question cannot be empty"
+        )
+    return question
+
+def question_key(question: str) -> str:
+    """Normalise a question for request coalescing (case, whitespace)."""
+    return " ".join(question.split()).casefold()
+
+async def validate_filter(request) -> Optional[embedding.SearchFilter]:
+    """
+    Build the retrieval scope from a request's label, subtype and device.
+    
+    Args:
+        request (QuestionRequest | BatchQuestionRequest): The request
+        
+    Returns:
+        Optional[SearchFilter]: The scope, or None if the request sets none
+        
+    Raises:
+        HTTPException: 400 for an unknown label, device or subtype
+    """
+    labels = {label.lower(): label for label in embedding.SEARCH_LABELS}
+    label = (request.label or "").strip()
+    search_filter = embedding.SearchFilter(
+        label=labels.get(label.lower(), label) or None,
+        subtype=(request.subtype or "").strip() or None,
+        device=(request.device or "").strip().lower() or None,
+    )
+    if not search_filter.active:
+        return None
+    
+    try:
+        await embedding.filter_node_ids(search_filter)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        error_message = f"Error processing question: {str(e)}"
+        logger.error(error_message)
+        raise HTTPException(
+            status_code=500,
+            detail=error_message
+        )
+    return search_filter
+
+async def answer_question(question: str, search_filter: Optional[embedding.SearchFilter] = None) -> QuestionResponse:
+    """
+    Retrieve context for a question and generate the answer.
+    
+    Args:
+        question (str): The validated question
+        search_filter (SearchFilter, optional): Retrieval scope
+        
+    Returns:
+        QuestionResponse: The AI-generated answer with sources
+    """
+    # 1. Retrieve relevant nodes (lexical + semantic, fused)
+    with stage("ask", "retrieve"):
+        similar_nodes = await retrieve(question, limit=5, search_filter=search_filter)
+    
+    # 2. Add locations and parent subtypes from the graph
+    [similar_nodes] = await with_neighbours([similar_nodes], "ask")
+    
+    return await answer_from_nodes(question, similar_nodes)
 
-        # 5. Send to Ollama for response
-        # In a production environment, you might use a different LLM provider
-        # This is a placeholder for demonstration
-        answer = "Based on the digital forensic evidence provided, " + \
-                 "I can answer your question with information from our knowledge base. " + \
-                 "This would typically be processed through an LLM, but for now this is a placeholder response."
-        
-        # In a real implementation, you would send the prompt to an LLM service
-        # and receive the generated answer.
-        # Example:
-        # llm_response = requests.post(
-        #     "http://localhost:11434/api/generate",
-        #     json={"model": "your-model", "prompt": prompt}
-        # )
-        # answer = llm_response.json().get("response", "")
+async def answer_from_nodes(question: str, similar_nodes: List[Dict[str, Any]]) -> QuestionResponse:
+    """
+    Generate the answer to a question from already retrieved nodes.
+    
+    Args:
+        question (str): The validated question
+        similar_nodes (List[Dict]): Retrieved node rows, best-first
         
+    Returns:
+        QuestionResponse: The AI-generated answer with sources
+    """
+    if not similar_nodes:
+        # If no similar nodes found, provide a generic response
         return QuestionResponse(
-            answer=answer,
-            sources=sources
+            answer=NO_CONTEXT_ANSWER,
+            sources=[]
+        )
+    
+    # 3. Construct LLM prompt
+    with stage("ask", "build_prompt"):
+        prompt, sources = build_prompt(question, similar_nodes)
+    
+    # 4. Send to Ollama for response
+    with stage("ask", "generate"):
+        answer = await get_client().generate(prompt)
+    
+    return QuestionResponse(
+        answer=answer,
+        sources=sources
+    )
+
+@router.post("/", response_model=QuestionResponse)
+async def ask_question(request: QuestionRequest):
+    """
+    Process a user question using semantic search and LLM integration.
+    
+    Args:
+        request (QuestionRequest): The user's question
+        
+    Returns:
+        QuestionResponse: The AI-generated answer with sources
+        
+    Raises:
+        HTTPException: If the question or its filter is invalid, or processing fails
+    """
+    question = validate_question(request)
+    search_filter = await validate_filter(request)
+    
+    try:
+        # Identical questions asked at the same time share one answer
+        return await get_flight("ask").do(
+            (question_key(question), search_filter), lambda: answer_question(question, search_filter)
         )
         
     except Exception as e:
@@ -128,3 +419,210 @@ Answer:
             status_code=500,
             detail=error_message
         )
+
+def sse_event(event: str, data: Dict[str, Any]) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+async def stream_answer(prompt: Optional[str], sources: List[Dict[str, Any]], started: float) -> AsyncIterator[str]:
+    """
+    Yield the SSE stream for one answer: sources, tokens, then done.
+    
+    When the client disconnects, Starlette cancels this generator; the
+    finally block closes the Ollama stream so the model stops generating.
+    """
+    yield sse_event("sources", {"sources": sources})
+    
+    if prompt is None:
+        yield sse_event("token", {"token": NO_CONTEXT_ANSWER})
+        yield sse_event("done", {"ttft_ms": None, "total_ms": round((time.perf_counter() - started) * 1000, 1)})
+        return
+    
+    ttft_ms = None
+    tokens = get_client().generate_stream(prompt)
+    try:
+        async for chunk in tokens:
+            token = chunk.get("response", "")
+            if token:
+                if ttft_ms is None:
+                    ttft_ms = round((time.perf_counter() - started) * 1000, 1)
+                    STAGE_SECONDS.labels("ask_stream", "first_token").observe(ttft_ms / 1000)
+                    logger.debug("Time to first token: %s ms", ttft_ms)
+                yield sse_event("token", {"token": token})
+            if chunk.get("done"):
+                break
+        yield sse_event("done", {"ttft_ms": ttft_ms, "total_ms": round((time.perf_counter() - started) * 1000, 1)})
+    except OllamaError as e:
+        logger.error("Error streaming answer: %s", e)
+        yield sse_event("error", {"detail": str(e)})
+    except asyncio.CancelledError:
+        logger.info("Client disconnected, cancelling answer generation")
+        raise
+    finally:
+        await tokens.aclose()
+
+@router.post("/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Answer a question as a Server-Sent Events stream.
+    
+    Retrieval runs before the response starts, so errors there still map
+    to HTTP status codes. The stream then sends a "sources" event at once,
+    one "token" event per generated chunk, and a final "done" event with
+    time-to-first-token, or an "error" event if generation fails.
+    
+    Args:
+        request (QuestionRequest): The user's question
+        
+    Returns:
+        StreamingResponse: text/event-stream of answer events
+        
+    Raises:
+        HTTPException: If the question is empty or retrieval fails
+    """
+    started = time.perf_counter()
+    question = validate_question(request)
+    search_filter = await validate_filter(request)
+    
+    try:
+        # Streams are per client, but concurrent retrievals can be shared
+        with stage("ask_stream", "retrieve"):
+            similar_nodes = await get_flight("ask_retrieve").do(
+                (question_key(question), search_filter), lambda: retrieve(question, limit=5, search_filter=search_filter)
+            )
+    except Exception as e:
+        error_message = f"Error processing question: {str(e)}"
+        logger.error(error_message)
+        raise HTTPException(
+            status_code=500,
+            detail=error_message
+        )
+    
+    if similar_nodes:
+        [similar_nodes] = await with_neighbours([similar_nodes], "ask_stream")
+        prompt, sources = build_prompt(question, similar_nodes)
+    else:
+        prompt, sources = None, []
+    
+    return StreamingResponse(
+        stream_answer(prompt, sources, started),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+async def retrieve_batch(questions: List[str], limit: int = 5,
+                         search_filter: Optional[embedding.SearchFilter] = None) -> List[Optional[List[Dict[str, Any]]]]:
+    """
+    Find relevant catalogue nodes for several questions at once.
+    
+    Questions with a confident lexical hit skip semantic search as in
+    retrieve(). The rest are embedded in one Ollama call and searched in
+    one batched vector query, then fused with their lexical hits.
+    
+    Args:
+        questions (List[str]): Validated questions
+        limit (int): Maximum number of nodes per question
+        search_filter (SearchFilter, optional): Retrieval scope for every question
+        
+    Returns:
+        List[Optional[List[Dict]]]: Node rows per question, or None for a
+        question whose embedding could not be generated
+    """
+    lexical = [await lexical_candidates(question, limit, search_filter) for question in questions]
+    results: List[Optional[List[Dict[str, Any]]]] = [
+        reciprocal_rank_fusion([nodes], limit) if confident else None
+        for nodes, confident in lexical
+    ]
+    
+    pending = [i for i, (_nodes, confident) in enumerate(lexical) if not confident]
+    if not pending:
+        return results
+    
+    with stage("ask_batch", "embed_questions"):
+        query_embeddings = await embedding.generate_embeddings([questions[i] for i in pending])
+    if query_embeddings is None:
+        return results
+    
+    with stage("ask_batch", "vector_search"):
+        vector_results = await embedding.vector_search_batch(query_embeddings, limit=limit, search_filter=search_filter)
+    for i, vector_nodes in zip(pending, vector_results):
+        results[i] = reciprocal_rank_fusion([vector_nodes, lexical[i][0]], limit)
+    return results
+
+@router.post("/batch", response_model=BatchQuestionResponse)
+async def ask_questions_batch(request: BatchQuestionRequest):
+    """
+    Answer several questions in one request.
+    
+    Retrieval is batched (one embedding call, one vector search, one
+    context expansion) and
+    answers are generated a few at a time. Each question succeeds or fails
+    on its own: a failed question gets an "error" instead of an answer.
+    Duplicate questions are answered once.
+    
+    Args:
+        request (BatchQuestionRequest): The questions, in order
+        
+    Returns:
+        BatchQuestionResponse: One result per question, in request order
+        
+    Raises:
+        HTTPException: If the batch is empty or too large, or retrieval fails
+    """
+    if not request.questions:
+        raise HTTPException(status_code=400, detail="Questions cannot be empty")
+    if len(request.questions) > ASK_BATCH_MAX_QUESTIONS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {ASK_BATCH_MAX_QUESTIONS} questions can be asked in one batch"
+        )
+    
+    search_filter = await validate_filter(request)
+    
+    # Distinct non-empty questions, keyed like request coalescing
+    unique: Dict[str, str] = {}
+    for raw in request.questions:
+        question = raw.strip()
+        if question:
+            unique.setdefault(question_key(question), question)
+    keys = list(unique)
+    
+    try:
+        with stage("ask_batch", "retrieve"):
+            retrieved = await retrieve_batch([unique[key] for key in keys], limit=5, search_filter=search_filter)
+    except Exception as e:
+        error_message = f"Error processing questions: {str(e)}"
+        logger.error(error_message)
+        raise HTTPException(
+            status_code=500,
+            detail=error_message
+        )
+    
+    # One expansion query for every question's hits
+    retrieved = await with_neighbours(retrieved, "ask_batch")
+    
+    semaphore = asyncio.Semaphore(ASK_BATCH_CONCURRENCY)
+    
+    async def answer(question: str, nodes: Optional[List[Dict[str, Any]]]) -> BatchAnswer:
+        if nodes is None:
+            return BatchAnswer(question=question, error="Failed to generate embedding for question")
+        try:
+            async with semaphore:
+                response = await answer_from_nodes(question, nodes)
+            return BatchAnswer(question=question, answer=response.answer, sources=response.sources)
+        except Exception as e:
+            logger.error("Error answering batch question: %s", e)
+            return BatchAnswer(question=question, error=f"Error processing question: {str(e)}")
+    
+    with stage("ask_batch", "generate"):
+        answers = await asyncio.gather(*(answer(unique[key], nodes) for key, nodes in zip(keys, retrieved)))
+    by_key = dict(zip(keys, answers))
+    
+    results = []
+    for raw in request.questions:
+        question = raw.strip()
+        if not question:
+            results.append(BatchAnswer(question=raw, error="Question cannot be empty"))
+        else:
+            results.append(by_key[question_key(question)].model_copy(update={"question": question}))
+    return BatchQuestionResponse(results=results)
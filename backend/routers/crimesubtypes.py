@@ -1,8 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import List
 import logging
 
-from services.db import get_db
+from services.catalog_snapshot import get_catalog_store
+from services.response_cache import cached_json_response
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -11,35 +12,37 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/crimesubtypes", tags=["crimesubtypes"])
 
+async def load_crime_subtypes() -> List[str]:
+    """
+    Get all crime subtype names from the in-memory catalogue snapshot.
+    
+    Returns:
+        List[str]: A list of crime subtype names
+    """
+    snapshot = await get_catalog_store().get()
+    crime_subtypes = list(snapshot.subtypes)
+    
+    logger.debug("Retrieved %d crime subtypes", len(crime_subtypes))
+    return crime_subtypes
+
 @router.get("/", response_model=List[str])
-async def get_crime_subtypes():
+async def get_crime_subtypes(request: Request):
     """
-    Get all crime subtypes from the Neo4j database.
+    Get all crime subtypes.
+    
+    Served from the catalogue snapshot, so Neo4j is not queried per
+    request and the list stays available through a Neo4j outage.
+    Responses are cached per catalogue version and carry an ETag, so
+    repeat requests with If-None-Match get a 304.
     
     Returns:
         List[str]: A list of crime subtype names
         
     Raises:
-        HTTPException: If the database query fails
+        HTTPException: If the catalogue cannot be loaded
     """
     try:
-        # Get database connection
-        db = get_db()
-        
-        # Query to get all crime subtypes
-        query = """
-        MATCH (n:CrimeSubtype)
-        RETURN n.name AS name
-        ORDER BY name
-        """
-        
-        results = db.execute_query(query)
-        
-        # Extract just the name from each result
-        crime_subtypes = [result.get("name") for result in results]
-        
-        logger.info(f"Retrieved {len(crime_subtypes)} crime subtypes")
-        return crime_subtypes
+        return await cached_json_response(request, ("crimesubtypes",), load_crime_subtypes)
         
     except Exception as e:
         error_message = f"Failed to retrieve crime subtypes: {str(e)}"
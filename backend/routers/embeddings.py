@@ -1,9 +1,10 @@
-from fastapi import APIRouter, HTTPException, BackgroundTasks
-from typing import Dict, Any
+from fastapi import APIRouter, HTTPException, Query
+from typing import Dict, List, Optional
 import logging
 from pydantic import BaseModel
 
 from services import embedding
+from services.embedding_jobs import get_job_manager
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -12,82 +13,99 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/refresh-embeddings", tags=["embeddings"])
 
-# Response model
+# Response models
 class EmbeddingJobResponse(BaseModel):
     message: str
     job_started: bool
+    job_id: Optional[str] = None
     nodes_to_process: int = 0
+    # Dirty nodes by reason: missing, text_changed, model_changed
+    breakdown: Dict[str, int] = {}
 
-async def refresh_embeddings_job():
-    """
-    Background job to refresh embeddings for nodes that don't have them.
-    This runs asynchronously after the API request returns.
-    """
-    try:
-        # Get nodes that need embeddings
-        nodes = embedding.get_nodes_without_embeddings()
-        
-        if not nodes:
-            logger.info("No nodes found that need embeddings")
-            return
-        
-        logger.info(f"Starting embedding refresh for {len(nodes)} nodes")
-        
-        # Process each node
-        for node in nodes:
-            node_id = node.get("nodeId")
-            text = node.get("text")
-            
-            if not text:
-                logger.warning(f"Node {node_id} has no text for embedding, skipping")
-                continue
-                
-            # Generate embedding for the node
-            embedding_vector = embedding.generate_embedding(text)
-            
-            if not embedding_vector:
-                logger.error(f"Failed to generate embedding for node {node_id}")
-                continue
-                
-            # Update the node with the embedding
-            success = embedding.update_node_embedding(node_id, embedding_vector)
-            
-            if not success:
-                logger.error(f"Failed to update embedding for node {node_id}")
-        
-        # Ensure vector index exists after updating embeddings
-        embedding.ensure_vector_index_exists()
-        
-        logger.info("Embedding refresh job completed")
-        
-    except Exception as e:
-        logger.error(f"Error in embedding refresh job: {str(e)}")
+class EmbeddingJobStatus(BaseModel):
+    job_id: str
+    status: str
+    processed: int
+    failed: int
+    skipped: int
+    total: Optional[int] = None
+    rate: float
+    eta_seconds: Optional[float] = None
+    elapsed_seconds: float
+    cursor: int
+    resumed: bool
+    error: Optional[str] = None
+    created_at: float
+    finished_at: Optional[float] = None
 
 @router.post("/", response_model=EmbeddingJobResponse)
-async def refresh_embeddings(background_tasks: BackgroundTasks):
+async def refresh_embeddings(
+    dry_run: bool = Query(False, description="Only report how many nodes are dirty")
+):
     """
-    Trigger a job to refresh embeddings for nodes in the database.
-    The job runs in the background after the request returns.
+    Start a job to refresh embeddings for nodes whose embedding is missing
+    or stale (text or model changed).
+
+    Only one job runs at a time: while a job is active, this returns it
+    instead of starting another. A job interrupted by a restart resumes
+    from its checkpoint.
     
+    Args:
+        dry_run (bool): Report dirty node counts without starting a job
+        
     Returns:
         EmbeddingJobResponse: Status of the job request
         
     Raises:
         HTTPException: If there's an error starting the job
     """
+    manager = get_job_manager()
+    active = manager.active_job
+    if active is not None and not dry_run:
+        return EmbeddingJobResponse(
+            message=f"Embedding refresh job {active.id} is already running",
+            job_started=False,
+            job_id=active.id,
+            nodes_to_process=max((active.total or 0) - active.done, 0)
+        )
+    
     try:
-        # Count nodes that need embeddings
-        nodes = embedding.get_nodes_without_embeddings()
-        count = len(nodes)
+        # Count nodes whose embedding is missing or stale
+        counts = await embedding.count_dirty_nodes()
+        count = counts.total
+        breakdown = {
+            "missing": counts.missing,
+            "text_changed": counts.text_changed,
+            "model_changed": counts.model_changed
+        }
         
-        # Add the job to background tasks
-        background_tasks.add_task(refresh_embeddings_job)
+        if dry_run:
+            return EmbeddingJobResponse(
+                message=f"{count} nodes need embedding (dry run, no job started)",
+                job_started=False,
+                job_id=active.id if active else None,
+                nodes_to_process=count,
+                breakdown=breakdown
+            )
         
-        # Prepare response
+        if count == 0:
+            return EmbeddingJobResponse(
+                message="No nodes need embedding",
+                job_started=False,
+                breakdown=breakdown
+            )
+        
+        job, started = manager.start(total=count)
+        message = (
+            f"Embedding refresh job started for {count} nodes" if started
+            else f"Embedding refresh job {job.id} is already running"
+        )
         return EmbeddingJobResponse(
-            message=f"Embedding refresh job started for {count} nodes",
-            job_started=True,
-            nodes_to_process=count
+            message=message,
+            job_started=started,
+            job_id=job.id,
+            nodes_to_process=count,
+            breakdown=breakdown
         )
         
     except Exception as e:
@@ -97,3 +115,55 @@ async def refresh_embeddings(background_tasks: BackgroundTasks):
             status_code=500,
             detail=error_message
         )
+
+@router.get("/jobs", response_model=List[EmbeddingJobStatus])
+async def list_embedding_jobs():
+    """
+    List recent embedding refresh jobs, newest first.
+    
+    Returns:
+        List[EmbeddingJobStatus]: Status and progress of each job
+    """
+    return [job.to_dict() for job in get_job_manager().list()]
+
+@router.get("/jobs/{job_id}", response_model=EmbeddingJobStatus)
+async def get_embedding_job(job_id: str):
+    """
+    Get the status and progress of an embedding refresh job.
+    
+    Args:
+        job_id (str): Job ID returned when the job was started
+        
+    Returns:
+        EmbeddingJobStatus: Processed/failed counts, rate and ETA
+        
+    Raises:
+        HTTPException: If the job is unknown
+    """
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Embedding job {job_id} not found")
+    return job.to_dict()
+
+@router.post("/jobs/{job_id}/cancel", response_model=EmbeddingJobStatus)
+async def cancel_embedding_job(job_id: str):
+    """
+    Cancel an embedding refresh job. Batches already in flight are
+    written before the job stops.
+    
+    Args:
+        job_id (str): Job to cancel
+        
+    Returns:
+        EmbeddingJobStatus: The job's status after the request
+        
+    Raises:
+        HTTPException: If the job is unknown or already finished
+    """
+    manager = get_job_manager()
+    job = manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Embedding job {job_id} not found")
+    if not job.active:
+        raise HTTPException(status_code=409, detail=f"Embedding job {job_id} already {job.status}")
+    return manager.cancel(job_id).to_dict()
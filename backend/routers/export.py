@@ -0,0 +1,168 @@
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, Optional
+import json
+import logging
+import zlib
+
+from services.db import get_db
+from services.catalog import get_catalog_version
+from services.catalog_snapshot import CATALOG_QUERY
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Create router
+router = APIRouter(prefix="/export", tags=["export"])
+
+EXPORT_DEVICES = ("android", "windows")
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "json.gz": "application/gzip",
+}
+
+# Bytes buffered before a chunk is sent, so the response isn't one write per record
+_CHUNK_BYTES = 64 * 1024
+
+async def export_rows() -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream the catalogue as one row per (subtype, evidence item), ordered by subtype.
+
+    Yields:
+        dict: subtype, name, significance and per-device locations
+    """
+    async for row in get_db().stream_query(CATALOG_QUERY, name="catalog_export"):
+        yield row
+
+def evidence_record(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "name": row["name"],
+        "significance": row.get("significance") or "",
+        "locations": {device: row.get(device) or [] for device in EXPORT_DEVICES},
+    }
+
+async def ndjson_lines(rows: AsyncIterator[Dict[str, Any]], version: int) -> AsyncIterator[bytes]:
+    """
+    Encode rows as NDJSON records.
+
+    The stream opens with a "catalog" record, has a "subtype" record
+    before each subtype's "evidence" records, and closes with an "end"
+    record carrying the counts, so a truncated download can be detected.
+    """
+    yield json.dumps({"type": "catalog", "version": version, "devices": list(EXPORT_DEVICES)}).encode("utf-8") + b"\n"
+    subtypes = items = 0
+    current = None
+    async for row in rows:
+        if row["subtype"] != current:
+            current = row["subtype"]
+            subtypes += 1
+            yield json.dumps({"type": "subtype", "name": current}).encode("utf-8") + b"\n"
+        if row.get("name") is not None:
+            items += 1
+            yield json.dumps({"type": "evidence", "subtype": current, **evidence_record(row)}).encode("utf-8") + b"\n"
+    yield json.dumps({"type": "end", "subtypes": subtypes, "evidence": items}).encode("utf-8") + b"\n"
+
+async def json_bundle(rows: AsyncIterator[Dict[str, Any]], version: int) -> AsyncIterator[bytes]:
+    """
+    Encode rows as a single JSON document, written incrementally.
+
+    The document is {"version", "devices", "subtypes": [{"name", "evidence": [...]}]}.
+    """
+    yield b'{"version": %d, "devices": %s, "subtypes": [' % (version, json.dumps(list(EXPORT_DEVICES)).encode("utf-8"))
+    current = None
+    first_item = True
+    async for row in rows:
+        if row["subtype"] != current:
+            prefix = b"" if current is None else b"]}, "
+            current = row["subtype"]
+            first_item = True
+            yield prefix + b'{"name": %s, "evidence": [' % json.dumps(current).encode("utf-8")
+        if row.get("name") is not None:
+            yield (b"" if first_item else b", ") + json.dumps(evidence_record(row)).encode("utf-8")
+            first_item = False
+    yield b"]}]}" if current is not None else b"]}"
+
+async def gzipped(pieces: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Gzip a byte stream incrementally."""
+    compressor = zlib.compressobj(wbits=31)
+    async for piece in pieces:
+        compressed = compressor.compress(piece)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+async def chunked(pieces: AsyncIterator[bytes], size: int = _CHUNK_BYTES) -> AsyncIterator[bytes]:
+    """Coalesce small pieces into chunks of roughly ``size`` bytes."""
+    buffer = bytearray()
+    async for piece in pieces:
+        buffer += piece
+        if len(buffer) >= size:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+async def _prepend(first: Dict[str, Any], rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[Dict[str, Any]]:
+    yield first
+    async for row in rows:
+        yield row
+
+@router.get("/")
+async def export_catalogue(
+    format: str = Query("ndjson", description="ndjson, or json.gz for a gzip-compressed JSON document"),
+    since: Optional[int] = Query(None, description="Catalogue version the client already has")
+):
+    """
+    Stream the whole evidence catalogue for every subtype and device.
+
+    The export is produced from a single query whose records are streamed
+    to the client as they arrive, so memory use doesn't grow with the
+    catalogue. The X-Catalog-Version header carries the version the export
+    was taken at; passing it back as ``since`` returns 204 until the
+    catalogue changes. The catalogue has no per-node versions, so a changed
+    catalogue is always exported in full.
+
+    Args:
+        format (str): "ndjson" or "json.gz"
+        since (int, optional): Catalogue version the client already has
+
+    Returns:
+        StreamingResponse: The export, or an empty 204 if nothing changed
+
+    Raises:
+        HTTPException: If the format is unknown or the query fails
+    """
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Format must be one of: {', '.join(EXPORT_FORMATS)}"
+        )
+
+    version = await get_catalog_version().current()
+    headers = {"X-Catalog-Version": str(version)}
+    if since is not None and since >= version:
+        return Response(status_code=204, headers=headers)
+
+    # Pull the first row before responding, so a failing query is a 500
+    # rather than a truncated 200
+    rows = export_rows()
+    try:
+        first = await rows.__anext__()
+        rows = _prepend(first, rows)
+    except StopAsyncIteration:
+        pass
+    except Exception as e:
+        error_message = f"Failed to export catalogue: {str(e)}"
+        logger.error(error_message)
+        raise HTTPException(
+            status_code=500,
+            detail=error_message
+        )
+
+    if format == "json.gz":
+        body = gzipped(json_bundle(rows, version))
+        headers["Content-Disposition"] = f'attachment; filename="dcia-catalogue-v{version}.json.gz"'
+    else:
+        body = ndjson_lines(rows, version)
+    return StreamingResponse(chunked(body), media_type=EXPORT_FORMATS[format], headers=headers)
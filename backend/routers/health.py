@@ -1,10 +1,14 @@
 ## Health check endpoints for the DCIA API.
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from typing import Dict, Any
 import logging
-import requests
 
-from services.db import get_db
+from services.embedding_cache import get_cache
+from services.catalog_snapshot import get_catalog_store
+from services.singleflight import flight_stats
+from services.lifecycle import get_startup_state
+from services.health_monitor import get_health_monitor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -13,79 +17,70 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter(prefix="/health", tags=["health"])
 
-# Ollama embedding service URL from the embedding service
-OLLAMA_EMBEDDING_URL = "http://localhost:11434/api/embeddings"
+@router.get("/live")
+async def liveness() -> Dict[str, Any]:
+    """
+    Liveness probe: the process is up and its event loop is responsive.
+
+    Never touches a dependency, so a Neo4j or Ollama outage doesn't get
+    the process restarted.
+
+    Returns:
+        A dictionary with status "alive"
+    """
+    return {"status": "alive"}
+
+@router.get("/ready")
+async def readiness():
+    """
+    Readiness probe: startup warmup has finished and every dependency
+    passed its latest background probe.
+
+    Served from cached probe results, so it costs no dependency calls.
+    Failed startup steps are listed under "errors".
+
+    Returns:
+        JSONResponse: 200 when ready, 503 otherwise, with per-dependency status
+    """
+    startup = get_startup_state()
+    monitor = get_health_monitor()
+    ready = startup.ready and monitor.healthy
+    dependencies = {
+        name: probe.last.to_dict() if probe.last else None
+        for name, probe in monitor.probes.items()
+    }
+    errors = {name: step["error"] for name, step in startup.steps.items() if not step["ok"]}
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "not_ready", "phase": startup.phase,
+                 "dependencies": dependencies, "errors": errors}
+    )
 
 @router.get("/")
-async def health_check() -> Dict[str, Any]:
+async def health_check():
     """
-    Check if the API and dependent services are running correctly.
-    
+    Detailed health report for operators.
+
+    Dependency status comes from the background probes (a trivial Cypher
+    query and Ollama's model list), with each dependency's latency history.
+
     Returns:
-        A dictionary with status information
-        
-    Raises:
-        HTTPException: If any of the dependent services are not available
+        JSONResponse: 200 when all dependencies are healthy, 503 otherwise
     """
-    # Check Neo4j database connection
-    db_status = True
-    ollama_status = True
-    errors = []
-    
-    try:
-        # Simple query to check database connection
-        db = get_db()
-        db.execute_query("RETURN 1 as n")
-    except Exception as e:
-        db_status = False
-        error_message = f"Neo4j database error: {str(e)}"
-        logger.error(f"Neo4j database is not available: {str(e)}")
-        errors.append(error_message)
-    
-    # Check Ollama embedding service
-    try:
-        # Simple request to check if Ollama is running
-        payload = {
-            "model": "all-minilm",
-            "prompt": "health check"  # Just a simple text to generate embeddings for
-        }
-        
-        # Set a reasonable timeout to avoid long waits if the service is down
-        response = requests.post(OLLAMA_EMBEDDING_URL, json=payload, timeout=5)
-        response.raise_for_status()
-        
-        # Verify response contains embeddings
-        embedding_data = response.json()
-        if not embedding_data.get("embedding"):
-            ollama_status = False
-            error_message = "Ollama service returned an invalid response format"
-            logger.error(error_message)
-            errors.append(error_message)
-            
-    except requests.exceptions.RequestException as e:
-        ollama_status = False
-        error_message = f"Ollama embedding service error: {str(e)}"
-        logger.error(f"Ollama service is not available: {str(e)}")
-        errors.append(error_message)
-    
-    # Check overall health status
-    if not db_status or not ollama_status:
-        status_details = {
-            "neo4j_status": "healthy" if db_status else "unhealthy",
-            "ollama_status": "healthy" if ollama_status else "unhealthy",
-            "errors": errors
+    monitor = get_health_monitor()
+    dependencies = monitor.status()
+    healthy = monitor.healthy
+
+    return JSONResponse(
+        status_code=200 if healthy else 503,
+        content={
+            "status": "healthy" if healthy else "unhealthy",
+            "neo4j_status": dependencies["neo4j"]["status"],
+            "ollama_status": dependencies["ollama"]["status"],
+            "dependencies": dependencies,
+            "embedding_cache": get_cache().stats(),
+            "catalog_snapshot": get_catalog_store().stats(),
+            "coalescing": flight_stats(),
+            "startup": get_startup_state().to_dict()
         }
-        
-        raise HTTPException(
-            status_code=503,
-            detail=f"One or more services are not available: {status_details}"
-        )
-    
-    # All services are available
-    logger.info("All services are running correctly.")
-    return {
-        "status": "healthy",
-        "message": "All services are running correctly.",
-        "neo4j_status": "healthy",
-        "ollama_status": "healthy"
-    }
+    )
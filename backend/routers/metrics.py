@@ -0,0 +1,17 @@
+## Prometheus metrics endpoint for the DCIA API.
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+# Create router
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+@router.get("")
+async def metrics() -> Response:
+    """
+    Expose latency histograms, pool gauges and cache counters in the
+    Prometheus text format.
+    
+    Returns:
+        Response: text/plain exposition of all registered metrics
+    """
+    return Response(content=generate_latest(), headers={"Content-Type": CONTENT_TYPE_LATEST})
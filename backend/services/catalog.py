@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Callable, List
+
+from dotenv import load_dotenv
+
+from services.db import get_db
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Seconds between checks of the stored version, so writes made by other
+# workers or ingestion scripts are noticed without a query per request
+CATALOG_VERSION_POLL_INTERVAL = float(os.getenv("CATALOG_VERSION_POLL_INTERVAL", "5"))
+# Seconds a poll may take before the cached version is served instead, so
+# a Neo4j outage doesn't stall the request that triggered the poll
+CATALOG_VERSION_TIMEOUT = float(os.getenv("CATALOG_VERSION_TIMEOUT", "2"))
+
+VERSION_QUERY = """
+MATCH (m:CatalogMeta {key: 'catalog'})
+RETURN m.version AS version
+"""
+
+
+class CatalogVersion:
+    """
+    Monotonic version number of the reference graph.
+
+    The version lives on a single (:CatalogMeta {key: "catalog"}) node.
+    Anything that writes to the catalogue calls bump(); readers call
+    current(), which re-reads the node at most once per poll interval.
+    Callbacks registered with on_change() run whenever a new version is
+    seen, so in-process caches can drop derived data.
+    """
+
+    def __init__(self, poll_interval: float = CATALOG_VERSION_POLL_INTERVAL,
+                 timeout: float = CATALOG_VERSION_TIMEOUT):
+        self.poll_interval = poll_interval
+        self.timeout = timeout
+        self.version = 0
+        self._checked_at = 0.0
+        self._listeners: List[Callable[[int], None]] = []
+        self._lock = asyncio.Lock()
+
+    def on_change(self, callback: Callable[[int], None]):
+        """Register a callback invoked with the new version after a change."""
+        self._listeners.append(callback)
+
+    def _set(self, version: int):
+        changed = version != self.version
+        self.version = version
+        self._checked_at = time.monotonic()
+        if changed:
+            logger.info("Catalog version is now %d", version)
+            for callback in self._listeners:
+                callback(version)
+
+    async def current(self) -> int:
+        """
+        Get the catalogue version, re-reading it if the poll interval passed.
+
+        Returns:
+            int: The current catalogue version
+        """
+        if time.monotonic() - self._checked_at < self.poll_interval:
+            return self.version
+        if self._lock.locked():
+            # Another request is already re-reading it; serve the cached value
+            return self.version
+
+        async with self._lock:
+            try:
+                # Auto-commit and bounded: a managed read would retry a
+                # lost connection for up to NEO4J_MAX_RETRY_TIME
+                result = await asyncio.wait_for(
+                    get_db().execute_query(VERSION_QUERY, name="catalog_version", timeout=self.timeout),
+                    self.timeout,
+                )
+                self._set((result[0].get("version") or 0) if result else 0)
+            except Exception as e:
+                # Keep serving the last known version rather than failing reads
+                logger.error("Failed to read catalog version: %r", e)
+                self._checked_at = time.monotonic()
+        return self.version
+
+    async def bump(self) -> int:
+        """
+        Increment the stored catalogue version after a write.
+
+        Returns:
+            int: The new catalogue version
+        """
+        query = """
+        MERGE (m:CatalogMeta {key: 'catalog'})
+        SET m.version = coalesce(m.version, 0) + 1
+        RETURN m.version AS version
+        """
+        result = await get_db().execute_write(query, name="catalog_version_bump")
+        self._set(result[0]["version"])
+        return self.version
+
+
+# Singleton instance
+catalog_version = CatalogVersion()
+
+def get_catalog_version() -> CatalogVersion:
+    """
+    Get the catalogue version tracker.
+
+    Returns:
+        CatalogVersion: Version tracker instance
+    """
+    return catalog_version
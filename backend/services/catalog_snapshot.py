@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+from dotenv import load_dotenv
+
+from services.db import get_db
+from services.catalog import get_catalog_version
+from services.response_cache import get_response_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Minimum seconds between reload attempts after a failed one, so an outage
+# doesn't turn every read into a Neo4j call
+CATALOG_SNAPSHOT_RETRY_INTERVAL = float(os.getenv("CATALOG_SNAPSHOT_RETRY_INTERVAL", "10"))
+
+SNAPSHOT_DEVICES = ("android", "windows")
+
+# Every subtype with its evidence items and their locations on each device,
+# in one pass. Subtypes without evidence come back as one row with a null item.
+CATALOG_QUERY = """
+MATCH (s:CrimeSubtype)
+OPTIONAL MATCH (s)-[:HAS_EVIDENCE]->(e:EvidenceItem)
+OPTIONAL MATCH (e)-[r:POSSIBLE_LOCATION_ON_ANDROID|POSSIBLE_LOCATION_ON_WINDOWS]->(p:PossibleLocation)
+WITH s, e,
+     collect(CASE type(r) WHEN 'POSSIBLE_LOCATION_ON_ANDROID' THEN p.path END) AS android,
+     collect(CASE type(r) WHEN 'POSSIBLE_LOCATION_ON_WINDOWS' THEN p.path END) AS windows
+RETURN s.name AS subtype, id(s) AS subtypeId, e.name AS name, id(e) AS nodeId,
+       e.significance AS significance, android, windows
+ORDER BY subtype, name
+"""
+
+
+def normalize_name(name: str) -> str:
+    """Case-fold a subtype name and collapse its whitespace."""
+    return " ".join(name.split()).casefold()
+
+
+class SnapshotItem(NamedTuple):
+    """One evidence item with its locations on one device."""
+    name: str
+    significance: str
+    locations: Tuple[str, ...]
+    node_id: Optional[int] = None
+
+
+class CatalogSnapshot:
+    """
+    Immutable read model of the whole evidence catalogue.
+
+    Evidence lists are precomputed per (subtype, device), and names,
+    significances and paths are interned, so text repeated across items
+    and devices is stored once. Node IDs are kept so searches can be
+    scoped to a subtype or device without a graph traversal.
+    """
+
+    def __init__(self, version: int, rows: List[Dict[str, Any]]):
+        self.version = version
+        self.loaded_at = time.time()
+        evidence: Dict[Tuple[str, str], List[SnapshotItem]] = {}
+        self._subtype_ids: Dict[str, int] = {}
+        unnamed = set()
+        for row in rows:
+            if row.get("subtype") is None:
+                # Can't be listed or looked up by name; skip rather than fail the load
+                unnamed.add(row.get("subtypeId"))
+                continue
+            subtype = sys.intern(row["subtype"])
+            if row.get("subtypeId") is not None:
+                self._subtype_ids[subtype] = row["subtypeId"]
+            for device in SNAPSHOT_DEVICES:
+                items = evidence.setdefault((subtype, device), [])
+                if row.get("name") is not None:
+                    items.append(SnapshotItem(
+                        sys.intern(row["name"]),
+                        sys.intern(row.get("significance") or ""),
+                        tuple(sys.intern(path) for path in row.get(device) or ()),
+                        row.get("nodeId"),
+                    ))
+        if unnamed:
+            logger.warning("Catalogue snapshot v%d skipped %d CrimeSubtype node(s) without a name: %s",
+                           version, len(unnamed), sorted(unnamed)[:20])
+        self._evidence: Dict[Tuple[str, str], Tuple[SnapshotItem, ...]] = {
+            key: tuple(items) for key, items in evidence.items()
+        }
+        self.subtypes: Tuple[str, ...] = tuple(sorted({subtype for subtype, _device in self._evidence}))
+        self._by_name = {normalize_name(name): name for name in self.subtypes}
+        self._scopes: Dict[Tuple[Optional[str], Optional[str], Optional[str]], FrozenSet[int]] = {}
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Stored subtype name for a user-supplied one (any case/spacing)."""
+        return self._by_name.get(normalize_name(name))
+
+    def evidence(self, subtype: str, device: str) -> Tuple[SnapshotItem, ...]:
+        """Evidence items of a stored subtype name on a device."""
+        return self._evidence.get((subtype, device), ())
+
+    def node_ids(self, label: Optional[str] = None, subtype: Optional[str] = None,
+                 device: Optional[str] = None) -> FrozenSet[int]:
+        """
+        IDs of the catalogue nodes within a scope; sets are memoised per scope.
+
+        Args:
+            label (str, optional): "CrimeSubtype" or "EvidenceItem"
+            subtype (str, optional): Stored subtype name; keeps that subtype
+                and its evidence items
+            device (str, optional): Keeps evidence items with at least one
+                location on the device; subtypes are not device-specific
+
+        Returns:
+            FrozenSet[int]: Matching node IDs
+        """
+        key = (label, subtype, device)
+        cached = self._scopes.get(key)
+        if cached is not None:
+            return cached
+
+        subtypes = [subtype] if subtype is not None else self.subtypes
+        ids: Set[int] = set()
+        if label in (None, "CrimeSubtype"):
+            ids.update(self._subtype_ids[name] for name in subtypes if name in self._subtype_ids)
+        if label in (None, "EvidenceItem"):
+            for name in subtypes:
+                for item_device in ([device] if device else SNAPSHOT_DEVICES):
+                    ids.update(
+                        item.node_id for item in self.evidence(name, item_device)
+                        if item.node_id is not None and (item.locations or not device)
+                    )
+        scope = frozenset(ids)
+        self._scopes[key] = scope
+        return scope
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "age_seconds": round(time.time() - self.loaded_at, 1),
+            "subtypes": len(self.subtypes),
+            "evidence_items": sum(len(self._evidence.get((subtype, SNAPSHOT_DEVICES[0]), ())) for subtype in self.subtypes),
+        }
+
+
+class CatalogStore:
+    """
+    Holds the current CatalogSnapshot and replaces it when the catalogue changes.
+
+    A new snapshot is built off to the side and swapped in with a single
+    assignment, so readers always see one complete version. Reads wait
+    for Neo4j only before the first snapshot exists; after that a changed
+    catalogue version (noticed by polling or a change event) triggers a
+    background reload while the current snapshot keeps being served,
+    including through a Neo4j outage.
+    """
+
+    def __init__(self, retry_interval: float = CATALOG_SNAPSHOT_RETRY_INTERVAL):
+        self.retry_interval = retry_interval
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.reloads = 0
+        self.failures = 0
+        self._failed_at = 0.0
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def refresh(self) -> CatalogSnapshot:
+        """Load the catalogue from Neo4j and swap the new snapshot in."""
+        async with self._lock:
+            version = await get_catalog_version().current()
+            if self.snapshot is not None and self.snapshot.version == version:
+                return self.snapshot
+            started = time.perf_counter()
+            try:
+                rows = [row async for row in get_db().stream_query(CATALOG_QUERY, name="catalog_snapshot")]
+            except Exception:
+                self.failures += 1
+                self._failed_at = time.monotonic()
+                raise
+            snapshot = CatalogSnapshot(version, rows)
+            self.snapshot = snapshot
+            self.reloads += 1
+            # Responses cached while the previous snapshot was served may
+            # already be labelled with the new version
+            get_response_cache().clear()
+            logger.info("Loaded catalogue snapshot v%d (%d subtypes) in %.1f ms",
+                        version, len(snapshot.subtypes), (time.perf_counter() - started) * 1000)
+            return snapshot
+
+    def refresh_in_background(self, _version: Optional[int] = None):
+        """Start a reload unless one is running (usable as a catalogue on_change callback)."""
+        if self._task is not None and not self._task.done():
+            return
+        try:
+            self._task = asyncio.get_running_loop().create_task(self._background_refresh())
+        except RuntimeError:
+            # No running loop (e.g. a version bump in a script); the next read reloads
+            pass
+
+    async def _background_refresh(self):
+        try:
+            await self.refresh()
+        except Exception as e:
+            logger.warning("Catalogue snapshot reload failed, serving v%s: %s",
+                           self.snapshot.version if self.snapshot else None, e)
+
+    async def get(self) -> CatalogSnapshot:
+        """
+        Get the current snapshot, loading the first one if needed.
+
+        Returns:
+            CatalogSnapshot: The newest loaded snapshot, possibly one version
+                behind while a reload is in flight
+
+        Raises:
+            Exception: If no snapshot has been loaded and Neo4j cannot be queried
+        """
+        if self.snapshot is None:
+            return await self.refresh()
+        version = await get_catalog_version().current()
+        if self.snapshot.version != version and time.monotonic() - self._failed_at >= self.retry_interval:
+            self.refresh_in_background()
+        return self.snapshot
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            **(self.snapshot.stats() if self.snapshot else {"version": None}),
+            "reloads": self.reloads,
+            "failures": self.failures,
+        }
+
+
+# Singleton instance; reloaded in the background whenever the catalogue version changes
+catalog_store = CatalogStore()
+get_catalog_version().on_change(catalog_store.refresh_in_background)
+
+def get_catalog_store() -> CatalogStore:
+    """
+    Get the catalogue snapshot store.
+
+    Returns:
+        CatalogStore: Store instance
+    """
+    return catalog_store
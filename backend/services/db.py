@@ -1,7 +1,16 @@
-from neo4j import GraphDatabase
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional
+
+from neo4j import READ_ACCESS, AsyncGraphDatabase, Query, unit_of_work
 from dotenv import load_dotenv
 import os
 import logging
+import re
+import time
+
+from services.metrics import NEO4J_POOL_MAX_SIZE, NEO4J_QUERY_SECONDS, NEO4J_SESSIONS_IN_USE
+from services.tracing import current_span, span
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -10,117 +19,494 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Connection pool settings (see .env.example)
+NEO4J_MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+NEO4J_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_ACQUISITION_TIMEOUT", "30"))
+NEO4J_FETCH_SIZE = int(os.getenv("NEO4J_FETCH_SIZE", "1000"))
+# Seconds a managed transaction keeps retrying transient errors (leader
+# switches, deadlocks, unavailable members) before giving up
+NEO4J_MAX_RETRY_TIME = float(os.getenv("NEO4J_MAX_RETRY_TIME", "30"))
+# Default transaction timeout in seconds; empty uses the server's setting
+NEO4J_QUERY_TIMEOUT = float(os.getenv("NEO4J_QUERY_TIMEOUT") or 0) or None
+
+# Relationship types are interpolated into Cypher, so only plain names pass
+_RELATIONSHIP_TYPE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+def _relationship_pattern(variable, relationship_types=None, direction="OUTGOING", max_depth=None):
+    """
+    Build a relationship pattern such as ``-[r:A|B]->`` or ``<-[r*1..2]-``.
+
+    Raises:
+        ValueError: If a relationship type is not a plain identifier
+    """
+    for relationship_type in relationship_types or []:
+        if not _RELATIONSHIP_TYPE.match(relationship_type):
+            raise ValueError(f"Invalid relationship type: {relationship_type!r}")
+    types = f":{'|'.join(relationship_types)}" if relationship_types else ""
+    length = f"*1..{int(max_depth)}" if max_depth else ""
+    left, right = {
+        "OUTGOING": ("-", "->"),
+        "INCOMING": ("<-", "-"),
+        "BOTH": ("-", "-"),
+    }.get(direction.upper(), ("-", "->"))
+    return f"{left}[{variable}{types}{length}]{right}"
+
+# Labels of nodes carrying an ``id`` property, matched when a lookup names no label
+NODE_LABELS = ("CrimeSubtype", "EvidenceItem", "PossibleLocation")
+
+def _lookup_by_id(variable):
+    """Subquery binding ``variable`` to the catalogue node whose id is $node_id."""
+    # One branch per label, so each plans as a seek on that label's id
+    # index; a label disjunction may plan as a union label scan instead
+    branches = "\n      UNION\n".join(
+        f"      MATCH ({variable}:{label}) WHERE {variable}.id = $node_id RETURN {variable}"
+        for label in NODE_LABELS
+    )
+    return f"CALL {{\n{branches}\n    }}"
+
+def node_by_id_query(labels=None):
+    """Cypher for get_node_by_id; also used for the schema's plan checks."""
+    # Labels given are all required; otherwise any catalogue label matches
+    if labels:
+        return f"""
+    MATCH (n:{":".join(labels)})
+    WHERE n.id = $node_id
+    RETURN n
+    """
+    return f"""
+    {_lookup_by_id("n")}
+    RETURN n
+    """
+
+def related_nodes_query(relationship_type=None, direction="OUTGOING"):
+    """Cypher for find_related_nodes."""
+    pattern = _relationship_pattern("r", [relationship_type] if relationship_type else None, direction)
+    return f"""
+    {_lookup_by_id("source")}
+    MATCH (source){pattern}(target)
+    RETURN target, type(r) AS relationship_type, properties(r) AS relationship_props
+    LIMIT $limit
+    """
+
+def neighbourhood_query(relationship_types=None, direction="BOTH", max_depth=1):
+    """Cypher for expand_neighbourhoods; also used for the schema's plan checks."""
+    pattern = _relationship_pattern("rels", relationship_types, direction, max_depth)
+    return f"""
+    UNWIND $nodeIds AS sourceId
+    MATCH (source)
+    WHERE id(source) = sourceId
+    CALL {{
+      WITH source
+      MATCH (source){pattern}(neighbour)
+      WHERE neighbour <> source
+      WITH neighbour, rels
+      ORDER BY size(rels)
+      WITH neighbour, head(collect(rels)) AS rels
+      ORDER BY size(rels)
+      LIMIT $perNodeLimit
+      RETURN neighbour, type(last(rels)) AS relationship, size(rels) AS depth
+    }}
+    RETURN sourceId, id(neighbour) AS nodeId, labels(neighbour) AS labels,
+           neighbour.name AS name, neighbour.path AS path, relationship, depth
+    """
+
 class Neo4jDatabase:
     """
-    Neo4j database service for handling graph database operations.
+    Async Neo4j database service for handling graph database operations.
+
+    All query methods are coroutines, so routers can await them without
+    blocking the event loop while a Cypher round-trip is in flight.
+
+    execute_read and execute_write run managed transactions: with a
+    neo4j:// URI reads are routed to any cluster member and writes to the
+    leader, and transient failures are retried. Every session shares one
+    bookmark manager, so a read issued after a write in this process sees
+    that write, even when served by a replica.
     """
-    
-    def __init__(self):
-        """Initialize Neo4j database connection using environment variables."""
+
+    def __init__(self, max_pool_size=None, acquisition_timeout=None, fetch_size=None, pool_name="default"):
+        """
+        Initialize the async Neo4j driver using environment variables.
+
+        Args:
+            max_pool_size (int, optional): Maximum number of pooled connections
+            acquisition_timeout (float, optional): Seconds to wait for a free connection
+            fetch_size (int, optional): Records fetched per batch from the server
+            pool_name (str): Label for this driver's pool metrics
+        """
         uri = os.getenv("NEO4J_URI")
         user = os.getenv("NEO4J_USER")
         password = os.getenv("NEO4J_PASSWORD")
-        
+
         if not uri or not user or not password:
             logger.error("Neo4j environment variables not properly set")
             raise ValueError("Neo4j environment variables not properly set")
-        
+
+        self.max_pool_size = max_pool_size or NEO4J_MAX_POOL_SIZE
+        self.acquisition_timeout = acquisition_timeout or NEO4J_ACQUISITION_TIMEOUT
+        self.fetch_size = fetch_size or NEO4J_FETCH_SIZE
+        self._sessions_in_use = NEO4J_SESSIONS_IN_USE.labels(pool_name)
+        NEO4J_POOL_MAX_SIZE.labels(pool_name).set(self.max_pool_size)
+
         try:
-            self.driver = GraphDatabase.driver(uri, auth=(user, password))
-            logger.info("Successfully connected to Neo4j database")
+            self.driver = AsyncGraphDatabase.driver(
+                uri,
+                auth=(user, password),
+                max_connection_pool_size=self.max_pool_size,
+                connection_acquisition_timeout=self.acquisition_timeout,
+                fetch_size=self.fetch_size,
+                max_transaction_retry_time=NEO4J_MAX_RETRY_TIME,
+            )
+            self.bookmark_manager = AsyncGraphDatabase.bookmark_manager()
+            logger.info("Successfully created Neo4j driver")
         except Exception as e:
-            logger.error(f"Failed to connect to Neo4j: {str(e)}")
+            logger.error("Failed to connect to Neo4j: %s", e)
             raise ConnectionError(f"Failed to connect to Neo4j: {str(e)}")
-    
-    def close(self):
-        """Close the database connection."""
+
+    async def verify_connectivity(self):
+        """
+        Check that the server is reachable and the credentials are accepted.
+
+        Raises:
+            ConnectionError: If no connection can be established
+        """
+        try:
+            await self.driver.verify_connectivity()
+        except Exception as e:
+            logger.error("Neo4j connectivity check failed: %s", e)
+            raise ConnectionError(f"Failed to connect to Neo4j: {str(e)}")
+
+    async def close(self):
+        """Close the database connection pool."""
         if hasattr(self, 'driver'):
-            self.driver.close()
+            await self.driver.close()
             logger.info("Neo4j connection closed")
-    
-    def execute_query(self, query, parameters=None):
+
+    def _session(self, **config):
+        # Sessions share the bookmark manager, so reads follow this process's writes
+        return self.driver.session(bookmark_manager=self.bookmark_manager, **config)
+
+    async def bookmarks(self):
+        """
+        Bookmarks of the transactions committed through this instance.
+
+        Returns:
+            set: Bookmark strings, to pass to follow() on another instance
+        """
+        return await self.bookmark_manager.get_bookmarks()
+
+    async def follow(self, bookmarks):
+        """
+        Make later transactions wait for ``bookmarks`` from another instance.
+
+        Args:
+            bookmarks (Collection[str]): Bookmarks returned by bookmarks()
+        """
+        await self.bookmark_manager.update_bookmarks((), bookmarks)
+
+    async def execute_read(self, query, parameters=None, name=None, timeout=None):
+        """
+        Run a read-only query in a managed transaction and return the results.
+
+        Args:
+            query (str): Cypher query string
+            parameters (dict, optional): Query parameters
+            name (str, optional): Short query name used to label latency metrics
+            timeout (float, optional): Transaction timeout in seconds;
+                NEO4J_QUERY_TIMEOUT if None
+
+        Returns:
+            list: Query results
+
+        Raises:
+            Exception: If the query fails; the driver's error is its __cause__
+        """
+        return await self._execute_managed("read", query, parameters, name, timeout)
+
+    async def execute_write(self, query, parameters=None, name=None, timeout=None):
+        """
+        Run a query that writes in a managed transaction and return the results.
+
+        The transaction may be retried, so the query must be safe to run
+        again after a failed attempt.
+
+        Args:
+            query (str): Cypher query string
+            parameters (dict, optional): Query parameters
+            name (str, optional): Short query name used to label latency metrics
+            timeout (float, optional): Transaction timeout in seconds;
+                NEO4J_QUERY_TIMEOUT if None
+
+        Returns:
+            list: Query results
+
+        Raises:
+            Exception: If the query fails; the driver's error is its __cause__
         """
-        Execute a Cypher query and return the results.
-        
+        return await self._execute_managed("write", query, parameters, name, timeout)
+
+    async def _execute_managed(self, access, query, parameters, name, timeout):
+        name = name or "unnamed"
+        started = time.perf_counter()
+        outcome = "error"
+        attempts = 0
+
+        @unit_of_work(timeout=timeout or NEO4J_QUERY_TIMEOUT)
+        async def work(tx):
+            nonlocal attempts
+            attempts += 1
+            result = await tx.run(query, parameters or {})
+            return [record.data() async for record in result]
+
+        self._sessions_in_use.inc()
+        try:
+            with span(f"neo4j:{name}", query=name, params=parameters, access=access) as query_span:
+                async with self._session() as session:
+                    if access == "read":
+                        records = await session.execute_read(work)
+                    else:
+                        records = await session.execute_write(work)
+                if query_span is not None:
+                    query_span.attrs["attempts"] = attempts
+            outcome = "ok"
+            return records
+        except Exception as e:
+            logger.error("Query %s failed after %d attempt(s): %s", name, attempts, e)
+            raise Exception(f"Query execution failed: {str(e)}") from e
+        finally:
+            self._sessions_in_use.dec()
+            NEO4J_QUERY_SECONDS.labels(name, outcome).observe(time.perf_counter() - started)
+
+    async def execute_query(self, query, parameters=None, name=None, timeout=None):
+        """
+        Execute a Cypher query in an auto-commit transaction and return the results.
+
+        Not retried and not routed by access mode; prefer execute_read or
+        execute_write. Used for health pings and statements that can't run
+        in a managed transaction.
+
         Args:
             query (str): Cypher query string
             parameters (dict, optional): Query parameters
-            
+            name (str, optional): Short query name used to label latency metrics
+            timeout (float, optional): Transaction timeout in seconds;
+                NEO4J_QUERY_TIMEOUT if None
+
         Returns:
             list: Query results
+
+        Raises:
+            Exception: If the query fails; the driver's error is its __cause__
         """
+        name = name or "unnamed"
+        started = time.perf_counter()
+        outcome = "error"
+        self._sessions_in_use.inc()
         try:
-            with self.driver.session() as session:
-                result = session.run(query, parameters or {})
-                return [record.data() for record in result]
+            with span(f"neo4j:{name}", query=name, params=parameters):
+                async with self._session() as session:
+                    result = await session.run(Query(query, timeout=timeout or NEO4J_QUERY_TIMEOUT), parameters or {})
+                    records = [record.data() async for record in result]
+            outcome = "ok"
+            return records
         except Exception as e:
-            logger.error(f"Query execution failed: {str(e)}")
-            raise Exception(f"Query execution failed: {str(e)}")
-    
-    def get_node_by_id(self, node_id, labels=None):
+            logger.error("Query %s failed: %s", name, e)
+            raise Exception(f"Query execution failed: {str(e)}") from e
+        finally:
+            self._sessions_in_use.dec()
+            NEO4J_QUERY_SECONDS.labels(name, outcome).observe(time.perf_counter() - started)
+
+    async def stream_query(self, query, parameters=None, name=None, timeout=None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute a read-only Cypher query and yield its records one at a time.
+
+        Records are pulled from the server in batches of the fetch size as
+        the consumer iterates, so memory stays constant however large the
+        result. The session is held until the iterator is exhausted or
+        closed. The query runs auto-commit in read mode (a managed
+        transaction can't outlive its function), so it is routed to a
+        reader but not retried.
+
+        Args:
+            query (str): Cypher query string
+            parameters (dict, optional): Query parameters
+            name (str, optional): Short query name used to label latency metrics
+            timeout (float, optional): Transaction timeout in seconds;
+                NEO4J_QUERY_TIMEOUT if None
+
+        Yields:
+            dict: One record
+        """
+        name = name or "unnamed"
+        started = time.perf_counter()
+        outcome = "error"
+        # Recorded without becoming the current span: the generator is
+        # resumed by its consumer, possibly from another context
+        parent = current_span()
+        stream_span = parent.child(f"neo4j:{name}", query=name, params=parameters) if parent else None
+        self._sessions_in_use.inc()
+        try:
+            async with self._session(default_access_mode=READ_ACCESS) as session:
+                result = await session.run(Query(query, timeout=timeout or NEO4J_QUERY_TIMEOUT), parameters or {})
+                async for record in result:
+                    yield record.data()
+            outcome = "ok"
+        except GeneratorExit:
+            # Closed early by the consumer (e.g. client disconnected)
+            outcome = "closed"
+            raise
+        except Exception as e:
+            logger.error("Query %s failed: %s", name, e)
+            raise Exception(f"Query execution failed: {str(e)}") from e
+        finally:
+            self._sessions_in_use.dec()
+            NEO4J_QUERY_SECONDS.labels(name, outcome).observe(time.perf_counter() - started)
+            if stream_span is not None:
+                stream_span.attrs["outcome"] = outcome
+                stream_span.finish()
+
+    async def explain(self, query, parameters=None, name=None):
+        """
+        Plan a Cypher query without running it.
+
+        Args:
+            query (str): Cypher query string
+            parameters (dict, optional): Query parameters
+            name (str, optional): Short query name used to label the span
+
+        Returns:
+            dict: The plan tree (operatorType, identifiers, arguments, children)
+        """
+        name = name or "unnamed"
+        with span(f"neo4j:explain:{name}", query=name):
+            async with self._session() as session:
+                result = await session.run(f"EXPLAIN {query}", parameters or {})
+                summary = await result.consume()
+        return summary.plan
+
+    async def get_node_by_id(self, node_id, labels=None):
         """
         Retrieve a node by its ID.
-        
+
         Args:
             node_id (str): The ID of the node
-            labels (list, optional): List of node labels to filter by
-            
+            labels (list, optional): Labels the node must all have; any of
+                NODE_LABELS if None
+
         Returns:
             dict: Node properties
         """
-        label_condition = ""
-        if labels:
-            label_condition = ":" + ":".join(labels)
-            
-        query = f"""
-        MATCH (n{label_condition})
-        WHERE n.id = $node_id
-        RETURN n
-        """
-        results = self.execute_query(query, {"node_id": node_id})
+        results = await self.execute_read(node_by_id_query(labels), {"node_id": node_id}, name="node_by_id")
         return results[0]["n"] if results else None
-    
-    def find_related_nodes(self, node_id, relationship_type=None, direction="OUTGOING", limit=10):
+
+    async def find_related_nodes(self, node_id, relationship_type=None, direction="OUTGOING", limit=10):
         """
         Find nodes related to a given node.
-        
+
         Args:
             node_id (str): The ID of the source node
             relationship_type (str, optional): Type of relationship to filter by
             direction (str): Direction of relationship ("OUTGOING", "INCOMING", or "BOTH")
             limit (int): Maximum number of results
-            
+
         Returns:
             list: Related nodes with their relationships
         """
-        rel_direction = {
-            "OUTGOING": "()-[r]->(target)",
-            "INCOMING": "(target)-[r]->()",
-            "BOTH": "()-[r]-(target)"
-        }.get(direction.upper(), "()-[r]->(target)")
-        
-        rel_type = f":{relationship_type}" if relationship_type else ""
-        
-        query = f"""
-        MATCH (source {{id: $node_id}}), (source){rel_direction}
-        WHERE r{rel_type}
-        RETURN target, type(r) AS relationship_type, r.properties AS relationship_props
-        LIMIT $limit
-        """
-        
-        return self.execute_query(query, {
+        return await self.execute_read(related_nodes_query(relationship_type, direction), {
             "node_id": node_id,
             "limit": limit
-        })
+        }, name="related_nodes")
+
+    async def expand_neighbourhoods(self, node_ids, relationship_types=None, direction="BOTH",
+                                    max_depth=1, per_node_limit=10):
+        """
+        Fetch the neighbourhoods of several nodes in one query.
+
+        Each source node is expanded separately, so one densely connected
+        node can't crowd out the others. Neighbours are returned nearest
+        first, at most ``per_node_limit`` per source node.
+
+        Args:
+            node_ids (list): Internal IDs (id(n)) of the nodes to expand
+            relationship_types (list, optional): Relationship types to follow; all if None
+            direction (str): "OUTGOING", "INCOMING" or "BOTH", seen from the source node
+            max_depth (int): Maximum hops from the source node (1-3)
+            per_node_limit (int): Maximum neighbours per source node
+
+        Returns:
+            dict: Source node ID -> neighbour rows with nodeId, labels, name,
+                path, relationship (type of the last hop) and depth
+        """
+        if not 1 <= max_depth <= 3:
+            raise ValueError("max_depth must be between 1 and 3")
+        if not node_ids:
+            return {}
 
-# Singleton instance
-database = Neo4jDatabase()
+        query = neighbourhood_query(relationship_types, direction, max_depth)
+        rows = await self.execute_read(query, {
+            "nodeIds": list(node_ids),
+            "perNodeLimit": per_node_limit
+        }, name="neighbourhood")
+
+        neighbourhoods = {node_id: [] for node_id in node_ids}
+        for row in rows:
+            neighbourhoods.setdefault(row.pop("sourceId"), []).append(row)
+        return neighbourhoods
+
+# Shared instance, created on first use so importing this module needs no
+# database; the application lifespan creates it eagerly via connect_db()
+database: Optional[Neo4jDatabase] = None
+
+# Per-context override for code running on another event loop (worker
+# threads), since the driver's connections are bound to the loop that made them
+_database_override: ContextVar[Optional[Neo4jDatabase]] = ContextVar("neo4j_database", default=None)
 
 def get_db():
     """
     Get the database instance.
-    
+
+    Returns:
+        Neo4jDatabase: Database service instance
+    """
+    override = _database_override.get()
+    if override is not None:
+        return override
+    global database
+    if database is None:
+        database = Neo4jDatabase()
+    return database
+
+async def connect_db() -> Neo4jDatabase:
+    """
+    Create the shared database instance and verify the server is reachable.
+
     Returns:
         Neo4jDatabase: Database service instance
+
+    Raises:
+        ConnectionError: If Neo4j cannot be reached
+    """
+    db = get_db()
+    await db.verify_connectivity()
+    return db
+
+async def close_db():
+    """Close the shared database instance if it was created."""
+    global database
+    if database is not None:
+        await database.close()
+        database = None
+
+@contextmanager
+def use_db(db: Neo4jDatabase):
+    """
+    Make get_db() return ``db`` within the current context.
+
+    Args:
+        db (Neo4jDatabase): Database bound to the current event loop
     """
-    return database
\ No newline at end of file
+    token = _database_override.set(db)
+    try:
+        yield db
+    finally:
+        _database_override.reset(token)
@@ -1,87 +1,275 @@
-import requests
 import logging
 import os
-from typing import List, Dict, Any, Tuple, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Any, Tuple, Optional, AsyncIterator, FrozenSet
+from neo4j.exceptions import CypherSyntaxError
 from services.db import get_db
+from services.catalog_snapshot import SNAPSHOT_DEVICES, get_catalog_store
+from services.ollama import get_client, OllamaError, OLLAMA_EMBEDDING_MODEL
+from services.embedding_cache import get_cache, text_hash
+from services.vector_index import get_vector_index, use_local_index
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Ollama embedding service URL
-OLLAMA_EMBEDDING_URL = "http://localhost:11434/api/embeddings"
 VECTOR_DIMENSIONS = 384  # Dimensions for all-minilm model
 
-def generate_embedding(text: str) -> Optional[List[float]]:
+# How vectors are written to nodes: "float32" stores them through
+# db.create.setNodeVectorProperty as packed 32-bit floats, half the size of
+# the 64-bit list a Cypher SET stores and still covered by the vector
+# index; "float64" keeps the plain SET for servers without the procedure
+EMBEDDING_STORAGE = os.getenv("EMBEDDING_STORAGE", "float32").lower()
+
+# Scoped searches over at most this many nodes score every node in scope
+# exactly; larger scopes over-fetch from the vector index and filter.
+# Exact scoring uses vector.similarity.cosine (Neo4j 5.18+); older servers
+# over-fetch for every scope.
+VECTOR_FILTER_EXACT_MAX = int(os.getenv("VECTOR_FILTER_EXACT_MAX", "2000"))
+# Index candidates fetched per requested result on the first over-fetch,
+# growing by this factor per retry up to VECTOR_FILTER_MAX_FETCH; at least
+# 2 so every retry fetches more
+VECTOR_FILTER_OVERFETCH = max(2, int(os.getenv("VECTOR_FILTER_OVERFETCH", "4")))
+VECTOR_FILTER_MAX_FETCH = int(os.getenv("VECTOR_FILTER_MAX_FETCH", "1000"))
+
+SEARCH_LABELS = ("CrimeSubtype", "EvidenceItem")
+
+@dataclass(frozen=True)
+class SearchFilter:
+    """Optional scope for retrieval; fields left as None don't restrict it."""
+    # "CrimeSubtype" or "EvidenceItem"
+    label: Optional[str] = None
+    # Crime subtype name in any case/spacing: the subtype and its evidence
+    subtype: Optional[str] = None
+    # "android" or "windows": evidence with a location on that device
+    device: Optional[str] = None
+
+    @property
+    def active(self) -> bool:
+        return any((self.label, self.subtype, self.device))
+
+async def filter_node_ids(search_filter: Optional[SearchFilter]) -> Optional[FrozenSet[int]]:
+    """
+    Resolve a search filter to the IDs of the nodes in scope.
+    
+    Scopes come from the in-memory catalogue snapshot, so this costs no
+    Neo4j round-trip once the snapshot is loaded.
+    
+    Args:
+        search_filter (SearchFilter, optional): The filter
+        
+    Returns:
+        Optional[FrozenSet[int]]: Node IDs in scope, or None if unfiltered
+        
+    Raises:
+        ValueError: If the label, device or subtype is unknown
+    """
+    if search_filter is None or not search_filter.active:
+        return None
+    if search_filter.label is not None and search_filter.label not in SEARCH_LABELS:
+        raise ValueError(f"Label must be one of: {', '.join(SEARCH_LABELS)}")
+    if search_filter.device is not None and search_filter.device not in SNAPSHOT_DEVICES:
+        raise ValueError(f"Device must be one of: {', '.join(SNAPSHOT_DEVICES)}")
+    
+    snapshot = await get_catalog_store().get()
+    subtype = None
+    if search_filter.subtype is not None:
+        subtype = snapshot.resolve(search_filter.subtype)
+        if subtype is None:
+            raise ValueError(f"Unknown crime subtype: {search_filter.subtype}")
+    return snapshot.node_ids(search_filter.label, subtype, search_filter.device)
+
+def _set_embedding(node: str, value: str) -> str:
+    """Cypher clause storing a vector on a node in the configured format."""
+    if EMBEDDING_STORAGE == "float64":
+        return f"SET {node}.embedding = {value}"
+    return f"CALL db.create.setNodeVectorProperty({node}, 'embedding', {value})"
+
+async def generate_embedding(text: str, timeout: Optional[float] = None) -> Optional[List[float]]:
     """
     Generate an embedding vector for the given text using Ollama.
+    Results are served from and stored in the shared embedding cache.
     
     Args:
         text (str): The text to generate embedding for
+        timeout (float, optional): Deadline in seconds, including retries
         
     Returns:
         Optional[List[float]]: The embedding vector or None if generation failed
     """
+    cache = get_cache()
+    cached = await cache.get(OLLAMA_EMBEDDING_MODEL, text)
+    if cached is not None:
+        return cached
+    
     try:
-        # Prepare the request payload
-        payload = {
-            "model": "all-minilm",
-            "prompt": text
-        }
-        
-        # Send request to Ollama
-        response = requests.post(OLLAMA_EMBEDDING_URL, json=payload)
-        response.raise_for_status()  # Raise exception for non-200 responses
-        
-        # Extract embedding from response
-        embedding_data = response.json()
-        embedding = embedding_data.get("embedding")
+        embedding = await get_client().embeddings(text, timeout=timeout)
         
         if not embedding:
-            logger.error(f"No embedding returned for text: {text[:50]}...")
+            logger.error("No embedding returned for text: %.50s...", text)
             return None
             
-        logger.info(f"Generated embedding for text: {text[:50]}... (vector dim: {len(embedding)})")
-        return embedding
+        logger.debug("Generated embedding for text: %.50s... (vector dim: %d)", text, len(embedding))
+        # Returned as stored, so a cache hit later gives the same vector
+        return await cache.put(OLLAMA_EMBEDDING_MODEL, text, embedding)
         
-    except Exception as e:
-        logger.error(f"Error generating embedding: {str(e)}")
+    except OllamaError as e:
+        logger.error("Error generating embedding: %s", e)
         return None
 
-def get_nodes_without_embeddings() -> List[Dict[str, Any]]:
+async def generate_embeddings(texts: List[str], timeout: Optional[float] = None) -> Optional[List[List[float]]]:
     """
-    Query Neo4j for nodes that don't have embeddings yet.
+    Generate embedding vectors for several texts in one Ollama call.
+    Only texts missing from the embedding cache are sent to Ollama.
     
+    Args:
+        texts (List[str]): The texts to generate embeddings for
+        timeout (float, optional): Deadline in seconds, including retries
+        
     Returns:
-        List[Dict]: List of node data with ID and text for embedding
+        Optional[List[List[float]]]: One vector per text, or None if generation failed
     """
+    cache = get_cache()
+    vectors = await cache.get_many(OLLAMA_EMBEDDING_MODEL, texts)
+    missing = [i for i, vector in enumerate(vectors) if vector is None]
+    if not missing:
+        return vectors
+    
     try:
-        db = get_db()
+        generated = await get_client().embed([texts[i] for i in missing], timeout=timeout)
+        generated = await cache.put_many(OLLAMA_EMBEDDING_MODEL, [(texts[i], vector) for i, vector in zip(missing, generated)])
+        for i, vector in zip(missing, generated):
+            vectors[i] = vector
+        return vectors
+    except OllamaError as e:
+        logger.error("Error generating %d embeddings: %s", len(texts), e)
+        return None
+
+@dataclass
+class DirtyCounts:
+    """How many catalogue nodes need (re-)embedding, and why."""
+    missing: int = 0
+    text_changed: int = 0
+    model_changed: int = 0
+
+    @property
+    def total(self) -> int:
+        return self.missing + self.text_changed + self.model_changed
+
+def embedding_state(node: Dict[str, Any]) -> Optional[str]:
+    """
+    Classify a candidate node by comparing its stored hash and model.
+    
+    Args:
+        node (Dict): Candidate row with text, embeddingHash and embeddingModel
         
-        # Query for nodes without embeddings
-        query = """
-        MATCH (n)
-        WHERE NOT EXISTS(n.embedding)
-          AND (n:EvidenceItem OR n:CrimeSubtype)
-          AND EXISTS(n.description)
-        RETURN id(n) AS nodeId, n.description AS text
-        """
+    Returns:
+        Optional[str]: "missing", "text_changed", "model_changed", or None if
+        the stored embedding is current
+    """
+    if node.get("embeddingHash") is None:
+        return "missing"
+    if node["embeddingHash"] != text_hash(node["text"]):
+        return "text_changed"
+    if node.get("embeddingModel") != OLLAMA_EMBEDDING_MODEL:
+        return "model_changed"
+    return None
+
+async def get_embedding_candidates(after: int = -1, limit: int = 500) -> List[Dict[str, Any]]:
+    """
+    Fetch one page of embeddable nodes with their stored embedding hash and model.
+    
+    Pages are ordered by node ID, so passing the last ``nodeId`` of a page
+    as ``after`` continues where it stopped without skipping or repeating
+    nodes, even while earlier pages are being written back. The embedding
+    vectors themselves are not transferred.
+    
+    Args:
+        after (int): Only return nodes with an ID greater than this cursor
+        limit (int): Maximum number of nodes in the page
         
-        results = db.execute_query(query)
-        logger.info(f"Found {len(results)} nodes without embeddings")
-        return results
+    Returns:
+        List[Dict]: List of node data with ID, text for embedding, stored
+        hash/model and the display properties kept by the local vector and
+        lexical indexes
+    """
+    db = get_db()
+    
+    # Nodes with a vector but no hash predate hash tracking and are re-embedded once
+    query = """
+    MATCH (n)
+    WHERE (n:EvidenceItem OR n:CrimeSubtype)
+      AND n.description IS NOT NULL
+      AND id(n) > $after
+    OPTIONAL MATCH (n)-[r]->(p:PossibleLocation)
+    WHERE type(r) STARTS WITH 'POSSIBLE_LOCATION_ON_'
+    WITH n, collect(DISTINCT p.path) AS paths
+    RETURN id(n) AS nodeId, n.description AS text, labels(n) AS labels,
+           n.name AS name, n.description AS description, n.significance AS significance,
+           paths,
+           CASE WHEN n.embedding IS NULL THEN null ELSE n.embedding_hash END AS embeddingHash,
+           n.embedding_model AS embeddingModel
+    ORDER BY nodeId
+    LIMIT $limit
+    """
+    
+    return await db.execute_read(query, {"after": after, "limit": limit}, name="embedding_candidates")
+
+async def iter_dirty_nodes(page_size: int = 500, after: int = -1) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Stream pages of nodes whose embedding is missing or stale.
+    
+    A node is stale when the hash of its current text or the configured
+    embedding model differs from what was stored with its vector.
+    
+    Args:
+        page_size (int): Nodes fetched per round-trip
+        after (int): Start after this node ID (a resume cursor)
         
-    except Exception as e:
-        logger.error(f"Error querying nodes without embeddings: {str(e)}")
-        return []
+    Yields:
+        Tuple[int, List[Dict]]: The page's cursor (its last node ID) and
+        the dirty nodes on it, each with a "contentHash" and "reason" added.
+        Pages without dirty nodes are still yielded so cursors advance.
+    """
+    while True:
+        page = await get_embedding_candidates(after=after, limit=page_size)
+        if not page:
+            return
+        after = page[-1]["nodeId"]
+        dirty = []
+        for node in page:
+            reason = embedding_state(node)
+            if reason is not None:
+                dirty.append({**node, "contentHash": text_hash(node["text"]), "reason": reason})
+        yield after, dirty
+        if len(page) < page_size:
+            return
+
+async def count_dirty_nodes(page_size: int = 2000, after: int = -1) -> DirtyCounts:
+    """
+    Count nodes needing (re-)embedding without embedding anything.
+    
+    Args:
+        page_size (int): Nodes fetched per round-trip
+        after (int): Only count nodes after this node ID
+        
+    Returns:
+        DirtyCounts: Counts broken down by reason
+    """
+    counts = DirtyCounts()
+    async for _cursor, page in iter_dirty_nodes(page_size=page_size, after=after):
+        for node in page:
+            setattr(counts, node["reason"], getattr(counts, node["reason"]) + 1)
+    return counts
 
-def update_node_embedding(node_id: int, embedding: List[float]) -> bool:
+async def update_node_embedding(node_id: int, embedding: List[float], content_hash: str) -> bool:
     """
     Update a Neo4j node with its embedding vector.
     
     Args:
         node_id (int): The Neo4j node ID
         embedding (List[float]): The embedding vector
+        content_hash (str): text_hash() of the text that was embedded
         
     Returns:
         bool: True if update successful, False otherwise
@@ -90,30 +278,60 @@ def update_node_embedding(node_id: int, embedding: List[float]) -> bool:
         db = get_db()
         
         # Update node with embedding
-        query = """
+        query = f"""
         MATCH (n)
         WHERE id(n) = $nodeId
-        SET n.embedding = $embedding
-        RETURN n
+        {_set_embedding("n", "$embedding")}
+        SET n.embedding_hash = $contentHash,
+            n.embedding_model = $model
+        RETURN id(n) AS nodeId
         """
         
-        result = db.execute_query(query, {
+        result = await db.execute_write(query, {
             "nodeId": node_id,
-            "embedding": embedding
-        })
+            "embedding": embedding,
+            "contentHash": content_hash,
+            "model": OLLAMA_EMBEDDING_MODEL
+        }, name="embedding_write")
         
         if result:
-            logger.info(f"Updated embedding for node ID {node_id}")
+            logger.debug("Updated embedding for node ID %s", node_id)
             return True
         else:
-            logger.warning(f"No node found with ID {node_id}")
+            logger.warning("No node found with ID %s", node_id)
             return False
             
     except Exception as e:
-        logger.error(f"Error updating node embedding: {str(e)}")
+        logger.error("Error updating node embedding: %s", e)
         return False
 
-def ensure_vector_index_exists() -> bool:
+async def update_node_embeddings(rows: List[Dict[str, Any]]) -> int:
+    """
+    Write a batch of embeddings back to Neo4j in a single transaction.
+    
+    Args:
+        rows (List[Dict]): Items of the form
+            {"nodeId": int, "embedding": List[float], "contentHash": str}
+        
+    Returns:
+        int: Number of nodes updated
+    """
+    db = get_db()
+    
+    query = f"""
+    UNWIND $rows AS row
+    MATCH (n)
+    WHERE id(n) = row.nodeId
+    {_set_embedding("n", "row.embedding")}
+    SET n.embedding_hash = row.contentHash,
+        n.embedding_model = $model
+    RETURN count(n) AS updated
+    """
+    
+    result = await db.execute_write(query, {"rows": rows, "model": OLLAMA_EMBEDDING_MODEL}, name="embedding_write_batch")
+    return result[0].get("updated", 0) if result else 0
+
+async def ensure_vector_index_exists() -> bool:
     """
     Create or update the vector index for embeddings in Neo4j.
     
@@ -131,7 +349,7 @@ def ensure_vector_index_exists() -> bool:
         RETURN count(*) > 0 AS exists
         """
         
-        result = db.execute_query(check_query)
+        result = await db.execute_read(check_query, name="vector_index_check")
         index_exists = result[0].get("exists", False) if result else False
         
         if index_exists:
@@ -149,25 +367,65 @@ def ensure_vector_index_exists() -> bool:
         }
         """
         
-        db.execute_query(create_query)
+        await db.execute_write(create_query, name="vector_index_create")
         logger.info("Created vector index 'node_embedding_index'")
         return True
         
     except Exception as e:
-        logger.error(f"Error ensuring vector index exists: {str(e)}")
+        logger.error("Error ensuring vector index exists: %s", e)
         return False
 
-def vector_search(query_embedding: List[float], limit: int = 5) -> List[Dict[str, Any]]:
+async def vector_search(query_embedding: List[float], limit: int = 5,
+                        search_filter: Optional[SearchFilter] = None) -> List[Dict[str, Any]]:
+    """
+    Perform vector similarity search.
+    
+    Uses the in-process LocalVectorIndex when VECTOR_SEARCH_BACKEND is
+    "local", otherwise Neo4j's vector index. With a filter, only nodes in
+    its scope are considered and a full top ``limit`` is returned when
+    the scope has that many embedded nodes.
+    
+    Args:
+        query_embedding (List[float]): The query embedding vector
+        limit (int): Maximum number of results to return
+        search_filter (SearchFilter, optional): Label, subtype and device scope
+        
+    Returns:
+        List[Dict]: List of similar nodes with their metadata
+        
+    Raises:
+        ValueError: If the filter names an unknown label, device or subtype
+    """
+    node_ids = await filter_node_ids(search_filter)
+    if use_local_index():
+        try:
+            index = get_vector_index()
+            await index.ensure_loaded()
+            results = index.search(query_embedding, limit, node_ids=node_ids)
+            logger.debug("Local vector search returned %d results", len(results))
+            return results
+        except Exception as e:
+            logger.error("Error performing local vector search: %s", e)
+            return []
+    
+    return await neo4j_vector_search(query_embedding, limit, node_ids=node_ids)
+
+async def neo4j_vector_search(query_embedding: List[float], limit: int = 5,
+                              node_ids: Optional[FrozenSet[int]] = None) -> List[Dict[str, Any]]:
     """
     Perform vector similarity search in Neo4j.
     
     Args:
         query_embedding (List[float]): The query embedding vector
         limit (int): Maximum number of results to return
+        node_ids (FrozenSet[int], optional): Only return these nodes
         
     Returns:
         List[Dict]: List of similar nodes with their metadata
     """
+    if node_ids is not None:
+        return (await neo4j_vector_search_batch([query_embedding], limit, node_ids=node_ids))[0]
+    
     try:
         db = get_db()
         
@@ -188,14 +446,175 @@ def vector_search(query_embedding: List[float], limit: int = 5) -> List[Dict[str
         ORDER BY score DESC
         """
         
-        results = db.execute_query(query, {
+        results = await db.execute_read(query, {
             "queryEmbedding": query_embedding,
             "limit": limit
-        })
+        }, name="vector_search")
         
-        logger.info(f"Vector search returned {len(results)} results")
+        logger.debug("Vector search returned %d results", len(results))
         return results
         
     except Exception as e:
-        logger.error(f"Error performing vector search: {str(e)}")
+        logger.error("Error performing vector search: %s", e)
+        return []
+
+async def vector_search_batch(query_embeddings: List[List[float]], limit: int = 5,
+                              search_filter: Optional[SearchFilter] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Perform vector similarity search for several queries at once.
+    
+    The local index scores all queries with one matrix multiply; Neo4j
+    runs every query in a single round-trip.
+    
+    Args:
+        query_embeddings (List[List[float]]): Query embedding vectors
+        limit (int): Maximum number of results per query
+        search_filter (SearchFilter, optional): Scope shared by all queries
+        
+    Returns:
+        List[List[Dict]]: Similar nodes per query, in query order
+        
+    Raises:
+        ValueError: If the filter names an unknown label, device or subtype
+    """
+    if not query_embeddings:
         return []
+    
+    node_ids = await filter_node_ids(search_filter)
+    if use_local_index():
+        try:
+            index = get_vector_index()
+            await index.ensure_loaded()
+            return index.search_batch(query_embeddings, limit, node_ids=node_ids)
+        except Exception as e:
+            logger.error("Error performing local batch vector search: %s", e)
+            return [[] for _ in query_embeddings]
+    
+    return await neo4j_vector_search_batch(query_embeddings, limit, node_ids=node_ids)
+
+async def neo4j_vector_search_batch(query_embeddings: List[List[float]], limit: int = 5,
+                                    node_ids: Optional[FrozenSet[int]] = None) -> List[List[Dict[str, Any]]]:
+    """
+    Perform vector similarity search in Neo4j for several queries in one query.
+
+    A scope of up to VECTOR_FILTER_EXACT_MAX nodes is scored exactly, so
+    nothing outside it is read. Larger scopes, and every scope on servers
+    without vector.similarity.cosine (before Neo4j 5.18), query the vector
+    index for VECTOR_FILTER_OVERFETCH times the results and drop
+    out-of-scope hits, fetching more for queries still short of ``limit``.
+
+    Args:
+        query_embeddings (List[List[float]]): Query embedding vectors
+        limit (int): Maximum number of results per query
+        node_ids (FrozenSet[int], optional): Only return these nodes
+
+    Returns:
+        List[List[Dict]]: Similar nodes per query, in query order
+    """
+    global _scoped_search_supported
+    results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+    try:
+        if node_ids is None:
+            return await _index_search_batch(query_embeddings, limit)
+        if _scoped_search_supported and len(node_ids) <= VECTOR_FILTER_EXACT_MAX:
+            try:
+                return await _scoped_search_batch(query_embeddings, limit, node_ids)
+            except Exception as e:
+                # The database wraps driver errors; only a server that
+                # predates vector.similarity.cosine falls back
+                if not isinstance(e.__cause__, CypherSyntaxError):
+                    raise
+                _scoped_search_supported = False
+                logger.warning("Exact scoped vector search unavailable, over-fetching instead: %s", e)
+
+        pending = list(range(len(query_embeddings)))
+        fetch = min(limit * VECTOR_FILTER_OVERFETCH, VECTOR_FILTER_MAX_FETCH)
+        while pending:
+            hits = await _index_search_batch([query_embeddings[i] for i in pending], fetch)
+            short = []
+            for i, query_hits in zip(pending, hits):
+                results[i] = [hit for hit in query_hits if hit["nodeId"] in node_ids][:limit]
+                # A full page means the index may hold more in-scope hits
+                if len(results[i]) < limit and len(query_hits) == fetch:
+                    short.append(i)
+            next_fetch = min(fetch * VECTOR_FILTER_OVERFETCH, VECTOR_FILTER_MAX_FETCH)
+            if next_fetch <= fetch:
+                break
+            pending, fetch = short, next_fetch
+        return results
+
+    except Exception as e:
+        logger.error("Error performing batch vector search: %s", e)
+        return results
+
+# Cleared the first time the server rejects SCOPED_SEARCH_QUERY
+_scoped_search_supported = True
+
+# Exact scoring of the embedded nodes in a scope, one subquery per question
+SCOPED_SEARCH_QUERY = """
+UNWIND range(0, size($queryEmbeddings) - 1) AS queryIndex
+CALL {
+  WITH queryIndex
+  MATCH (node)
+  WHERE id(node) IN $nodeIds AND node.embedding IS NOT NULL
+  WITH node, vector.similarity.cosine(node.embedding, $queryEmbeddings[queryIndex]) AS score
+  ORDER BY score DESC
+  LIMIT $limit
+  RETURN node, score
+}
+RETURN
+  queryIndex,
+  id(node) AS nodeId,
+  labels(node) AS labels,
+  node.name AS name,
+  node.description AS description,
+  node.significance AS significance,
+  score
+ORDER BY queryIndex, score DESC
+"""
+
+async def _scoped_search_batch(query_embeddings: List[List[float]], limit: int,
+                               node_ids: FrozenSet[int]) -> List[List[Dict[str, Any]]]:
+    """Score every embedded node in scope exactly, for each query."""
+    rows = await get_db().execute_read(SCOPED_SEARCH_QUERY, {
+        "queryEmbeddings": query_embeddings,
+        "nodeIds": list(node_ids),
+        "limit": limit
+    }, name="vector_search_scoped")
+
+    results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+    for row in rows:
+        results[row.pop("queryIndex")].append(row)
+    return results
+
+async def _index_search_batch(query_embeddings: List[List[float]], limit: int) -> List[List[Dict[str, Any]]]:
+    """Top ``limit`` hits per query from the vector index, in one round-trip."""
+    db = get_db()
+    
+    query = """
+    UNWIND range(0, size($queryEmbeddings) - 1) AS queryIndex
+    CALL db.index.vector.queryNodes(
+      "node_embedding_index",
+      $limit,
+      $queryEmbeddings[queryIndex]
+    ) YIELD node, score
+    RETURN
+      queryIndex,
+      id(node) AS nodeId,
+      labels(node) AS labels,
+      node.name AS name,
+      node.description AS description,
+      node.significance AS significance,
+      score
+    ORDER BY queryIndex, score DESC
+    """
+    
+    rows = await db.execute_read(query, {
+        "queryEmbeddings": query_embeddings,
+        "limit": limit
+    }, name="vector_search_batch")
+    
+    results: List[List[Dict[str, Any]]] = [[] for _ in query_embeddings]
+    for row in rows:
+        results[row.pop("queryIndex")].append(row)
+    return results
@@ -0,0 +1,262 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from dotenv import load_dotenv
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Cache settings (see .env.example)
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", "3600"))
+# Empty path disables the persistent tier
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "embedding_cache.sqlite3")
+# Seconds to wait for another process's SQLite write lock; a lookup that
+# times out counts as a miss and a store is skipped
+EMBEDDING_CACHE_BUSY_TIMEOUT = float(os.getenv("EMBEDDING_CACHE_BUSY_TIMEOUT", "0.2"))
+
+
+def normalize_text(text: str) -> str:
+    """Normalize text for cache keys: NFC form, collapsed whitespace."""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def text_hash(text: str) -> str:
+    """SHA-256 hex digest of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier cache of embedding vectors keyed by (model, normalized text hash).
+
+    The first tier is a bounded in-process LRU with a TTL. The second is a
+    SQLite database in WAL mode holding float32 blobs, which survives
+    restarts and can be shared by several worker processes on one host.
+    Disk hits are promoted into the LRU.
+
+    The LRU is consulted inline; the SQLite tier runs in a worker thread,
+    so a slow disk or another process holding the write lock never blocks
+    the event loop. Vectors are rounded to float32 when stored, so both
+    tiers return the same values for the same text.
+    """
+
+    def __init__(self, max_size: int = EMBEDDING_CACHE_SIZE, ttl: float = EMBEDDING_CACHE_TTL,
+                 path: Optional[str] = EMBEDDING_CACHE_PATH):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.path = path
+        self._lru: "OrderedDict[Tuple[str, str], Tuple[float, List[float]]]" = OrderedDict()
+        # _lock guards the LRU and counters; _disk_lock serialises use of the connection
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if path:
+            try:
+                self._conn = sqlite3.connect(path, timeout=EMBEDDING_CACHE_BUSY_TIMEOUT, check_same_thread=False, isolation_level=None)
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute("PRAGMA synchronous=NORMAL")
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS embeddings (
+                        model TEXT NOT NULL,
+                        hash TEXT NOT NULL,
+                        vector BLOB NOT NULL,
+                        created REAL NOT NULL,
+                        PRIMARY KEY (model, hash)
+                    ) WITHOUT ROWID
+                """)
+            except sqlite3.Error as e:
+                logger.error("Persistent embedding cache disabled, cannot open %s: %s", path, e)
+                self._conn = None
+
+    def close(self):
+        """Close the persistent tier."""
+        with self._disk_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _memory_get(self, key: Tuple[str, str]) -> Optional[List[float]]:
+        entry = self._lru.get(key)
+        if entry is None:
+            return None
+        stored_at, vector = entry
+        if self.ttl and time.monotonic() - stored_at > self.ttl:
+            del self._lru[key]
+            self.evictions += 1
+            return None
+        self._lru.move_to_end(key)
+        return vector
+
+    def _memory_put(self, key: Tuple[str, str], vector: List[float]):
+        self._lru[key] = (time.monotonic(), vector)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_get(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        with self._disk_lock:
+            if self._conn is None:
+                return {}
+            rows = []
+            try:
+                # Chunked to stay under SQLite's bound-variable limit
+                for start in range(0, len(hashes), 500):
+                    chunk = hashes[start:start + 500]
+                    rows += self._conn.execute(
+                        f"SELECT hash, vector FROM embeddings WHERE model = ? AND hash IN ({','.join('?' * len(chunk))})",
+                        [model, *chunk],
+                    ).fetchall()
+            except sqlite3.Error as e:
+                logger.warning("Embedding cache read failed, treating as misses: %s", e)
+                return {}
+        return {row_hash: array("f", blob).tolist() for row_hash, blob in rows}
+
+    def _disk_put(self, rows: List[Tuple[str, str, bytes, float]]):
+        with self._disk_lock:
+            if self._conn is None:
+                return
+            try:
+                # One transaction per batch rather than one commit per row
+                self._conn.execute("BEGIN")
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (model, hash, vector, created) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                self._conn.execute("COMMIT")
+            except sqlite3.Error as e:
+                logger.warning("Embedding cache write skipped: %s", e)
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+
+    async def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """
+        Look up cached embeddings for several texts.
+
+        Args:
+            model (str): Embedding model name
+            texts (Sequence[str]): Texts to look up
+
+        Returns:
+            List[Optional[List[float]]]: Vector per text, None where missing
+        """
+        keys = [(model, text_hash(text)) for text in texts]
+        found: List[Optional[List[float]]] = [None] * len(keys)
+        missing = []
+        with self._lock:
+            for i, key in enumerate(keys):
+                found[i] = self._memory_get(key)
+                if found[i] is None:
+                    missing.append(i)
+            self.memory_hits += len(keys) - len(missing)
+
+        if missing and self._conn is not None:
+            on_disk = await asyncio.to_thread(self._disk_get, model, list({keys[i][1] for i in missing}))
+            still_missing = []
+            with self._lock:
+                for i in missing:
+                    vector = on_disk.get(keys[i][1])
+                    if vector is None:
+                        still_missing.append(i)
+                    else:
+                        found[i] = vector
+                        self._memory_put(keys[i], vector)
+                self.disk_hits += len(missing) - len(still_missing)
+            missing = still_missing
+
+        with self._lock:
+            self.misses += len(missing)
+        return found
+
+    async def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Look up a single cached embedding."""
+        return (await self.get_many(model, [text]))[0]
+
+    async def put_many(self, model: str, items: Sequence[Tuple[str, List[float]]]) -> List[List[float]]:
+        """
+        Store embeddings in both tiers.
+
+        Args:
+            model (str): Embedding model name
+            items (Sequence[Tuple[str, List[float]]]): (text, vector) pairs
+
+        Returns:
+            List[List[float]]: The vectors as stored (float32-rounded), in item order
+        """
+        stored = []
+        rows = []
+        now = time.time()
+        with self._lock:
+            for text, vector in items:
+                key = (model, text_hash(text))
+                packed = array("f", vector)
+                # Same float32 values a later disk hit would return
+                stored.append(packed.tolist())
+                self._memory_put(key, stored[-1])
+                rows.append((model, key[1], packed.tobytes(), now))
+        if rows and self._conn is not None:
+            await asyncio.to_thread(self._disk_put, rows)
+        return stored
+
+    async def put(self, model: str, text: str, vector: List[float]) -> List[float]:
+        """Store a single embedding and return it as stored."""
+        return (await self.put_many(model, [(text, vector)]))[0]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Hit/miss counters for both tiers.
+
+        Returns:
+            dict: Counters plus the overall hit rate
+        """
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "memory_entries": len(self._lru),
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Shared instance, opened on first use
+_cache: Optional[EmbeddingCache] = None
+
+def get_cache() -> EmbeddingCache:
+    """
+    Get the shared embedding cache.
+
+    Returns:
+        EmbeddingCache: Cache instance
+    """
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache()
+    return _cache
+
+def close_cache():
+    """Close the shared embedding cache if it was opened."""
+    global _cache
+    if _cache is not None:
+        _cache.close()
+        _cache = None
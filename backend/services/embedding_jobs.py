@@ -0,0 +1,333 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from dotenv import load_dotenv
+
+from services import embedding, embedding_pipeline
+from services.catalog import get_catalog_version
+from services.db import Neo4jDatabase, get_db, use_db
+from services.lexical_index import get_lexical_index
+from services.ollama import OllamaClient, use_client
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Where the running job records how far it got (empty disables checkpointing)
+EMBEDDING_JOB_CHECKPOINT_PATH = os.getenv("EMBEDDING_JOB_CHECKPOINT_PATH", "embedding_job.json")
+# Finished jobs kept for the status endpoint
+EMBEDDING_JOB_HISTORY = int(os.getenv("EMBEDDING_JOB_HISTORY", "20"))
+
+# Job states; a job is active until it reaches one of FINISHED_STATES
+PENDING = "pending"
+RUNNING = "running"
+CANCELLING = "cancelling"
+COMPLETED = "completed"
+CANCELLED = "cancelled"
+INTERRUPTED = "interrupted"
+FAILED = "failed"
+FINISHED_STATES = frozenset({COMPLETED, CANCELLED, INTERRUPTED, FAILED})
+
+
+@dataclass
+class EmbeddingJob:
+    """State and progress of one embedding refresh job."""
+    id: str
+    status: str = PENDING
+    # Dirty nodes when the job started, including any done by a resumed run
+    total: Optional[int] = None
+    # Highest node ID up to which every dirty node has been handled
+    cursor: int = -1
+    resumed: bool = False
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+    stats: embedding_pipeline.RefreshStats = field(default_factory=embedding_pipeline.RefreshStats)
+    cancel_event: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def active(self) -> bool:
+        return self.status not in FINISHED_STATES
+
+    @property
+    def done(self) -> int:
+        return self.stats.processed + self.stats.failed + self.stats.skipped
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        """Estimated seconds to completion at the current rate, if known."""
+        if self.status != RUNNING or self.total is None or self.stats.rate <= 0:
+            return None
+        return max(self.total - self.done, 0) / self.stats.rate
+
+    def to_dict(self) -> Dict[str, Any]:
+        eta = self.eta_seconds
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "processed": self.stats.processed,
+            "failed": self.stats.failed,
+            "skipped": self.stats.skipped,
+            "total": self.total,
+            "rate": round(self.stats.rate, 2),
+            "eta_seconds": round(eta, 1) if eta is not None else None,
+            "elapsed_seconds": round(self.stats.elapsed, 1),
+            "cursor": self.cursor,
+            "resumed": self.resumed,
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class EmbeddingJobManager:
+    """
+    Runs embedding refresh jobs one at a time on a dedicated worker thread.
+
+    The worker runs the pipeline on its own event loop with its own Neo4j
+    driver and Ollama client, so a long refresh doesn't compete with
+    request handling on the server's loop. Starting a job while one is
+    active returns the active job instead of starting a second one.
+
+    Progress is checkpointed to a small JSON file as the pipeline commits
+    its node ID cursor. A job that is interrupted (shutdown, crash) or
+    fails leaves the checkpoint behind and the next job resumes from it;
+    completing or cancelling a job removes it.
+    """
+
+    def __init__(self, checkpoint_path: str = EMBEDDING_JOB_CHECKPOINT_PATH, history: int = EMBEDDING_JOB_HISTORY):
+        self.checkpoint_path = checkpoint_path
+        self.history = history
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embedding-job")
+        self._jobs: "OrderedDict[str, EmbeddingJob]" = OrderedDict()
+        self._active: Optional[EmbeddingJob] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._shutting_down = False
+
+    # Checkpoints
+
+    def load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """Read the checkpoint left by an unfinished job, if any."""
+        if not self.checkpoint_path or not os.path.exists(self.checkpoint_path):
+            return None
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable embedding job checkpoint: %s", e)
+            return None
+
+    def _save_checkpoint(self, job: EmbeddingJob):
+        if not self.checkpoint_path:
+            return
+        checkpoint = {
+            "job_id": job.id,
+            "cursor": job.cursor,
+            "processed": job.stats.processed,
+            "failed": job.stats.failed,
+            "skipped": job.stats.skipped,
+            "total": job.total,
+            "saved_at": time.time(),
+        }
+        tmp_path = f"{self.checkpoint_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def _clear_checkpoint(self):
+        if self.checkpoint_path and os.path.exists(self.checkpoint_path):
+            os.remove(self.checkpoint_path)
+
+    # Job lifecycle
+
+    def start(self, total: Optional[int] = None) -> Tuple[EmbeddingJob, bool]:
+        """
+        Start a refresh job unless one is already active.
+
+        Must be called from the server's event loop, which is used for
+        the catalogue version bump once the job has written embeddings.
+
+        Args:
+            total (int, optional): Dirty node count, if the caller already has it
+
+        Returns:
+            Tuple[EmbeddingJob, bool]: The job, and whether it was newly started
+        """
+        with self._lock:
+            if self._active is not None and self._active.active:
+                return self._active, False
+
+            job = EmbeddingJob(id=uuid.uuid4().hex, total=total)
+            checkpoint = self.load_checkpoint()
+            if checkpoint:
+                job.resumed = True
+                job.cursor = checkpoint.get("cursor", -1)
+                job.stats.processed = job.stats.resumed_processed = checkpoint.get("processed", 0)
+                job.stats.failed = checkpoint.get("failed", 0)
+                job.stats.skipped = checkpoint.get("skipped", 0)
+                # Recounted from the cursor in the worker
+                job.total = None
+                logger.info("Resuming embedding refresh from node ID %s", job.cursor)
+
+            self._active = job
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.history:
+                oldest = next(iter(self._jobs.values()))
+                if oldest.active:
+                    break
+                self._jobs.popitem(last=False)
+
+        self._loop = asyncio.get_running_loop()
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[EmbeddingJob]:
+        return self._jobs.get(job_id)
+
+    def list(self) -> List[EmbeddingJob]:
+        """Known jobs, newest first."""
+        return list(reversed(self._jobs.values()))
+
+    @property
+    def active_job(self) -> Optional[EmbeddingJob]:
+        job = self._active
+        return job if job is not None and job.active else None
+
+    def cancel(self, job_id: str) -> Optional[EmbeddingJob]:
+        """
+        Ask a job to stop. In-flight batches are drained first.
+
+        Args:
+            job_id (str): Job to cancel
+
+        Returns:
+            EmbeddingJob: The job, or None if it doesn't exist
+        """
+        job = self._jobs.get(job_id)
+        if job is not None and job.active:
+            job.cancel_event.set()
+            if job.status == RUNNING:
+                job.status = CANCELLING
+        return job
+
+    def shutdown(self):
+        """Stop the active job, keeping its checkpoint, and wait for the worker."""
+        self._shutting_down = True
+        if self.active_job is not None:
+            self.active_job.cancel_event.set()
+        self._executor.shutdown(wait=True)
+
+    # Worker
+
+    def _run(self, job: EmbeddingJob):
+        try:
+            asyncio.run(self._run_async(job))
+        except Exception as e:
+            logger.error("Embedding job %s failed: %s", job.id, e)
+            job.status = FAILED
+            job.error = str(e)
+        finally:
+            job.finished_at = time.time()
+            logger.info("Embedding job %s %s: %s", job.id, job.status, job.to_dict())
+
+    @staticmethod
+    async def _publish(bookmarks):
+        """Bump the catalogue version after the job's writes, on the server's loop."""
+        # The job wrote through its own driver; with its bookmarks the bump,
+        # and every read after it, see those embeddings on any cluster member
+        await get_db().follow(bookmarks)
+        # The pipeline already upserted the job's nodes into the lexical
+        # index, so this bump alone doesn't need a rebuild; a concurrent
+        # change (the version moving by more than one) still does
+        lexical = get_lexical_index()
+        in_sync = lexical.loaded and not lexical.stale
+        before = get_catalog_version().version
+        version = await get_catalog_version().bump()
+        if in_sync and version == before + 1:
+            lexical.stale = False
+
+    async def _run_async(self, job: EmbeddingJob):
+        if job.cancel_event.is_set():
+            job.status = INTERRUPTED if self._shutting_down else CANCELLED
+            return
+        job.status = RUNNING
+
+        def on_checkpoint(cursor: int, _stats: embedding_pipeline.RefreshStats):
+            job.cursor = cursor
+            self._save_checkpoint(job)
+
+        # Driver and client bound to this thread's loop; a few connections suffice
+        db = Neo4jDatabase(max_pool_size=embedding_pipeline.EMBEDDING_CONCURRENCY + 2, pool_name="embedding_job")
+        client = OllamaClient()
+        bookmarks = ()
+        try:
+            with use_db(db), use_client(client):
+                if job.total is None:
+                    counts = await embedding.count_dirty_nodes(after=job.cursor)
+                    job.total = job.done + counts.total
+
+                await embedding_pipeline.run_embedding_refresh(
+                    after=job.cursor,
+                    stats=job.stats,
+                    on_checkpoint=on_checkpoint,
+                    should_stop=job.cancel_event.is_set,
+                )
+                if job.stats.processed > job.stats.resumed_processed:
+                    await embedding.ensure_vector_index_exists()
+            bookmarks = await db.bookmarks()
+        finally:
+            await client.close()
+            await db.close()
+
+        if job.stats.processed > job.stats.resumed_processed:
+            # Listeners (response cache, indexes) live on the server's loop
+            await asyncio.wrap_future(
+                asyncio.run_coroutine_threadsafe(self._publish(bookmarks), self._loop)
+            )
+
+        if not job.cancel_event.is_set():
+            job.status = COMPLETED
+            self._clear_checkpoint()
+        elif self._shutting_down:
+            job.status = INTERRUPTED
+        else:
+            job.status = CANCELLED
+            self._clear_checkpoint()
+
+    async def resume_interrupted(self) -> Optional[EmbeddingJob]:
+        """
+        Resume a job left unfinished by a previous process.
+
+        Returns:
+            EmbeddingJob: The resumed job, or None if there was nothing to resume
+        """
+        if self.load_checkpoint() is None:
+            return None
+        job, _started = self.start()
+        return job
+
+
+# Singleton instance
+job_manager = EmbeddingJobManager()
+
+def get_job_manager() -> EmbeddingJobManager:
+    """
+    Get the embedding job manager instance.
+
+    Returns:
+        EmbeddingJobManager: Manager instance
+    """
+    return job_manager
@@ -0,0 +1,210 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services import embedding
+from services.lexical_index import get_lexical_index
+from services.vector_index import get_vector_index, use_local_index
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Pipeline tuning (see .env.example)
+EMBEDDING_PAGE_SIZE = int(os.getenv("EMBEDDING_PAGE_SIZE", "500"))
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "32"))
+EMBEDDING_CONCURRENCY = int(os.getenv("EMBEDDING_CONCURRENCY", "4"))
+EMBEDDING_WRITE_BATCH_SIZE = int(os.getenv("EMBEDDING_WRITE_BATCH_SIZE", "256"))
+
+# Sentinel telling a pipeline stage that its upstream has finished
+_DONE = object()
+
+
+@dataclass
+class RefreshStats:
+    """Counters for one embedding refresh run."""
+    processed: int = 0
+    failed: int = 0
+    skipped: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: float = 0.0
+    # Counts carried over from an interrupted run; excluded from the rate
+    resumed_processed: int = 0
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    @property
+    def rate(self) -> float:
+        """Nodes written per second in this run."""
+        done = self.processed - self.resumed_processed
+        return done / self.elapsed if self.elapsed > 0 else 0.0
+
+
+async def run_embedding_refresh(
+    page_size: int = EMBEDDING_PAGE_SIZE,
+    batch_size: int = EMBEDDING_BATCH_SIZE,
+    concurrency: int = EMBEDDING_CONCURRENCY,
+    write_batch_size: int = EMBEDDING_WRITE_BATCH_SIZE,
+    after: int = -1,
+    stats: Optional[RefreshStats] = None,
+    on_checkpoint: Optional[Callable[[int, RefreshStats], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> RefreshStats:
+    """
+    Embed every node whose embedding is missing or stale and write the vectors back.
+
+    Only nodes whose text hash or embedding model changed since their
+    vector was written are re-embedded, so small catalogue edits touch
+    only the edited nodes.
+
+    Three stages run concurrently, connected by bounded queues so a slow
+    stage applies back-pressure instead of buffering the corpus in memory:
+
+    1. a reader pages through nodes with an ID cursor and cuts each page
+       into embedding batches,
+    2. ``concurrency`` workers embed one batch per Ollama call,
+    3. a writer accumulates results and flushes them with one
+       ``UNWIND $rows`` transaction per ``write_batch_size`` rows.
+
+    Args:
+        page_size (int): Nodes read from Neo4j per round-trip
+        batch_size (int): Texts sent to Ollama per embed call
+        concurrency (int): Embed calls in flight at once
+        write_batch_size (int): Rows written to Neo4j per transaction
+        after (int): Resume cursor; only nodes with a greater ID are read
+        stats (RefreshStats, optional): Counters to update in place, so a
+            caller can watch progress or carry counts over from a resumed run
+        on_checkpoint (Callable, optional): Called with a cursor once every
+            node up to and including it has been written or given up on
+        should_stop (Callable, optional): Polled between pages and batches;
+            returning True stops reading and drains what is in flight
+
+    Returns:
+        RefreshStats: Processed/failed/skipped counts and throughput
+    """
+    stats = stats or RefreshStats()
+    stop = should_stop or (lambda: False)
+    index = get_vector_index() if use_local_index() and get_vector_index().loaded else None
+    lexical = get_lexical_index() if get_lexical_index().loaded else None
+    batches: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    results: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    # Checkpoint bookkeeping: nodes still outstanding per page, in read order.
+    # The committed cursor only moves past a page once it and every earlier
+    # page are fully settled, because batches finish out of order.
+    pages: "OrderedDict[int, int]" = OrderedDict()
+
+    def settle(page_cursor: int, count: int):
+        pages[page_cursor] -= count
+        committed = None
+        while pages and next(iter(pages.values())) == 0:
+            committed, _ = pages.popitem(last=False)
+        if committed is not None and on_checkpoint is not None:
+            on_checkpoint(committed, stats)
+
+    async def read():
+        async for cursor, page in embedding.iter_dirty_nodes(page_size=page_size, after=after):
+            nodes = []
+            for node in page:
+                if node.get("text"):
+                    nodes.append({**node, "pageCursor": cursor})
+                else:
+                    stats.skipped += 1
+            pages[cursor] = len(nodes)
+            if not nodes:
+                settle(cursor, 0)
+            for i in range(0, len(nodes), batch_size):
+                await batches.put(nodes[i:i + batch_size])
+            if stop():
+                logger.info("Embedding refresh stopping after cursor %d", cursor)
+                break
+        for _ in range(concurrency):
+            await batches.put(_DONE)
+
+    async def embed():
+        while (batch := await batches.get()) is not _DONE:
+            if stop():
+                # Left unsettled so the checkpoint stays before these nodes
+                continue
+            vectors = await embedding.generate_embeddings([node["text"] for node in batch])
+            if vectors is None:
+                # Still dirty, so the next refresh picks them up again
+                stats.failed += len(batch)
+                for node in batch:
+                    settle(node["pageCursor"], 1)
+                continue
+            await results.put([
+                {**node, "embedding": vector}
+                for node, vector in zip(batch, vectors)
+            ])
+        await results.put(_DONE)
+
+    async def flush(rows: List[Dict[str, Any]]):
+        try:
+            stats.processed += await embedding.update_node_embeddings(
+                [
+                    {"nodeId": row["nodeId"], "embedding": row["embedding"], "contentHash": row["contentHash"]}
+                    for row in rows
+                ]
+            )
+        except Exception as e:
+            logger.error("Failed to write %d embeddings: %s", len(rows), e)
+            stats.failed += len(rows)
+        else:
+            if index is not None:
+                # Keep the local index in step with what was just written
+                index.upsert(rows)
+            if lexical is not None:
+                # Re-index only the rewritten nodes; a full rebuild is kept
+                # for snapshot reloads and cold starts
+                lexical.upsert_nodes(rows)
+            logger.info(
+                "Embedding refresh progress: %d written, %d failed (%.1f nodes/sec)",
+                stats.processed, stats.failed, stats.rate,
+            )
+        for row in rows:
+            settle(row["pageCursor"], 1)
+
+    async def write():
+        pending: List[Dict[str, Any]] = []
+        workers_left = concurrency
+        while workers_left:
+            rows = await results.get()
+            if rows is _DONE:
+                workers_left -= 1
+                continue
+            pending.extend(rows)
+            while len(pending) >= write_batch_size:
+                await flush(pending[:write_batch_size])
+                pending = pending[write_batch_size:]
+        if pending:
+            await flush(pending)
+
+    tasks = [asyncio.create_task(read()), asyncio.create_task(write())]
+    tasks += [asyncio.create_task(embed()) for _ in range(concurrency)]
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+        stats.finished_at = time.monotonic()
+
+    if index is not None and index.dirty:
+        await asyncio.to_thread(index.save)
+
+    logger.info(
+        "Embedding refresh finished: %d written, %d failed, %d skipped in %.1fs (%.1f nodes/sec)",
+        stats.processed, stats.failed, stats.skipped, stats.elapsed, stats.rate,
+    )
+    return stats
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import os
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from services.db import get_db
+from services.ollama import OLLAMA_EMBEDDING_MODEL, get_client
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Seconds between background probe rounds
+HEALTH_PROBE_INTERVAL = float(os.getenv("HEALTH_PROBE_INTERVAL", "10"))
+# Deadline for a single dependency probe
+HEALTH_PROBE_TIMEOUT = float(os.getenv("HEALTH_PROBE_TIMEOUT", "2"))
+# Probe results kept per dependency for the latency history
+HEALTH_PROBE_HISTORY = int(os.getenv("HEALTH_PROBE_HISTORY", "30"))
+
+
+@dataclass
+class ProbeResult:
+    """Outcome of one dependency check."""
+    ok: bool
+    latency_ms: float
+    checked_at: float
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "ok": self.ok,
+            "latency_ms": self.latency_ms,
+            "checked_at": self.checked_at,
+            **({"error": self.error} if self.error else {}),
+        }
+
+
+class DependencyProbe:
+    """A named cheap check of one dependency, with its recent results."""
+
+    def __init__(self, name: str, check: Callable[[], Awaitable[None]], history: int = HEALTH_PROBE_HISTORY):
+        self.name = name
+        self.check = check
+        self.history: Deque[ProbeResult] = deque(maxlen=history)
+
+    @property
+    def last(self) -> Optional[ProbeResult]:
+        return self.history[-1] if self.history else None
+
+    async def run(self, timeout: float = HEALTH_PROBE_TIMEOUT) -> ProbeResult:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.check(), timeout=timeout)
+            ok, error = True, None
+        except asyncio.TimeoutError:
+            ok, error = False, f"timed out after {timeout}s"
+        except Exception as e:
+            ok, error = False, str(e) or type(e).__name__
+        result = ProbeResult(ok, round((time.perf_counter() - started) * 1000, 2), time.time(), error)
+        if self.last is not None and self.last.ok != ok:
+            logger.warning("Dependency %s is now %s%s", self.name, "healthy" if ok else "unhealthy",
+                           f": {error}" if error else "")
+        self.history.append(result)
+        return result
+
+    def status(self) -> Dict[str, Any]:
+        latencies = [result.latency_ms for result in self.history]
+        return {
+            "status": "unknown" if self.last is None else ("healthy" if self.last.ok else "unhealthy"),
+            "last": self.last.to_dict() if self.last else None,
+            "latency_ms": {
+                "p50": round(statistics.median(latencies), 2),
+                "max": max(latencies),
+            } if latencies else None,
+            "history": [result.to_dict() for result in self.history],
+        }
+
+
+async def check_neo4j():
+    """Round-trip a trivial query through the pool."""
+    await get_db().execute_query("RETURN 1 AS n", name="health_ping")
+
+
+async def check_ollama():
+    """List local models (no inference) and confirm the embedding model is pulled."""
+    models = await get_client().list_models(timeout=HEALTH_PROBE_TIMEOUT)
+    names = {model.get("name", "") for model in models}
+    if not any(name == OLLAMA_EMBEDDING_MODEL or name.startswith(f"{OLLAMA_EMBEDDING_MODEL}:") for name in names):
+        raise RuntimeError(f"Embedding model {OLLAMA_EMBEDDING_MODEL} is not available in Ollama")
+
+
+class HealthMonitor:
+    """
+    Probes dependencies concurrently in the background on an interval.
+
+    Health endpoints read the cached results instead of calling the
+    dependencies themselves, so orchestrator probes cost no Neo4j or
+    Ollama work however often they arrive.
+    """
+
+    def __init__(self, probes: List[DependencyProbe], interval: float = HEALTH_PROBE_INTERVAL):
+        self.probes = {probe.name: probe for probe in probes}
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe_all(self):
+        """Run one round of all probes concurrently."""
+        await asyncio.gather(*(probe.run() for probe in self.probes.values()))
+
+    async def _loop(self):
+        while True:
+            await self.probe_all()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        """Start probing in the background (idempotent)."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        """Stop the background probes."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    @property
+    def healthy(self) -> bool:
+        """Whether every dependency passed its latest probe."""
+        return all(probe.last is not None and probe.last.ok for probe in self.probes.values())
+
+    def status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: probe.status() for name, probe in self.probes.items()}
+
+
+# Singleton instance
+health_monitor = HealthMonitor([
+    DependencyProbe("neo4j", check_neo4j),
+    DependencyProbe("ollama", check_ollama),
+])
+
+def get_health_monitor() -> HealthMonitor:
+    """
+    Get the health monitor instance.
+
+    Returns:
+        HealthMonitor: Monitor instance
+    """
+    return health_monitor
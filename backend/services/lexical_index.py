@@ -0,0 +1,265 @@
+import asyncio
+import heapq
+import logging
+import math
+import os
+import re
+import threading
+from collections import Counter
+from functools import lru_cache
+from dataclasses import dataclass
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence
+
+from dotenv import load_dotenv
+
+from services.db import get_db
+from services.catalog import get_catalog_version
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# BM25 parameters
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+# Relative gap between the best and second-best score above which an
+# exact-term lexical hit is trusted without an embedding call
+LEXICAL_CONFIDENCE_MARGIN = float(os.getenv("LEXICAL_CONFIDENCE_MARGIN", "0.3"))
+LEXICAL_INDEX_PAGE_SIZE = int(os.getenv("LEXICAL_INDEX_PAGE_SIZE", "2000"))
+
+# Words, registry paths, file names and package names stay whole
+TOKEN_PATTERN = r"[\w$%~]+(?:[.\\/:\-][\w$%~]+)*"
+_compound_split = re.compile(r"[.\\/:\-_]+")
+STOPWORDS = frozenset("""
+a an and are as at be by can do does for from how i in is it of on or the this to
+was what when where which who why with on my me you your there their these those
+""".split())
+
+# Node properties kept alongside each document so hits need no extra lookup
+META_FIELDS = ("labels", "name", "description", "significance")
+
+
+@lru_cache(maxsize=None)
+def _get_tokenizer():
+    # nltk is slow to import, so load it on first use rather than at startup
+    from nltk.tokenize import RegexpTokenizer
+    return RegexpTokenizer(TOKEN_PATTERN)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lower-case tokens for indexing and querying.
+
+    Compound forensic terms such as ``NTUSER.DAT``, ``com.android.chrome``
+    or ``HKCU\\Software\\...`` are emitted whole and also split into their
+    parts, so both exact and partial mentions match.
+    """
+    tokens = []
+    for raw in _get_tokenizer().tokenize(text.lower()):
+        if raw in STOPWORDS:
+            continue
+        tokens.append(raw)
+        parts = [part for part in _compound_split.split(raw) if part]
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part not in STOPWORDS)
+    return tokens
+
+
+def is_exact_term(token: str) -> bool:
+    """Whether a token looks like an identifier rather than prose."""
+    return bool(_compound_split.search(token)) or any(c.isdigit() for c in token)
+
+
+@dataclass
+class LexicalHit:
+    node_id: int
+    score: float
+    meta: Dict[str, Any]
+
+
+@dataclass
+class LexicalResult:
+    hits: List[LexicalHit]
+    # True when the top hit can answer the query without semantic search
+    confident: bool
+
+
+class BM25Index:
+    """
+    Incrementally updatable BM25 inverted index over catalogue nodes.
+
+    Each EvidenceItem/CrimeSubtype is one document made of its name,
+    description, significance and PossibleLocation paths. Postings map
+    term -> {node_id: term frequency}, so a query only touches the
+    postings of its own terms. The embedding pipeline upserts the nodes it
+    rewrites; a full rebuild only runs on cold start or after other
+    catalogue changes.
+    """
+
+    def __init__(self, k1: float = BM25_K1, b: float = BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[int, int]] = {}
+        self._doc_terms: Dict[int, Counter] = {}
+        self._doc_len: Dict[int, int] = {}
+        self._meta: Dict[int, Dict[str, Any]] = {}
+        self._total_len = 0
+        self._lock = threading.Lock()
+        self._build_lock = asyncio.Lock()
+        self.loaded = False
+        self.stale = False
+
+    def __len__(self) -> int:
+        return len(self._doc_len)
+
+    def _remove_locked(self, node_id: int):
+        terms = self._doc_terms.pop(node_id, None)
+        if terms is None:
+            return
+        for term in terms:
+            postings = self._postings[term]
+            del postings[node_id]
+            if not postings:
+                del self._postings[term]
+        self._total_len -= self._doc_len.pop(node_id)
+        self._meta.pop(node_id, None)
+
+    def upsert(self, node_id: int, text: str, meta: Optional[Dict[str, Any]] = None):
+        """Index (or re-index) one document."""
+        terms = Counter(tokenize(text))
+        with self._lock:
+            self._remove_locked(node_id)
+            self._doc_terms[node_id] = terms
+            self._doc_len[node_id] = sum(terms.values())
+            self._total_len += self._doc_len[node_id]
+            self._meta[node_id] = meta or {}
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[node_id] = tf
+
+    def remove(self, node_id: int):
+        """Drop one document."""
+        with self._lock:
+            self._remove_locked(node_id)
+
+    def upsert_nodes(self, rows: Sequence[Dict[str, Any]]):
+        """Index catalogue rows as returned by the build or embedding candidates query."""
+        for row in rows:
+            self.upsert(row["nodeId"], document_text(row), {field: row.get(field) for field in META_FIELDS})
+
+    def search(self, query: str, limit: int = 5, node_ids: Optional[AbstractSet[int]] = None) -> LexicalResult:
+        """
+        Rank documents against a query with BM25.
+
+        Args:
+            query (str): Free-text query
+            limit (int): Maximum number of hits
+            node_ids (AbstractSet[int], optional): Only rank these documents
+
+        Returns:
+            LexicalResult: Ranked hits and whether the best one is confident
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        with self._lock:
+            n_docs = len(self._doc_len)
+            if not n_docs or not terms:
+                return LexicalResult(hits=[], confident=False)
+            avg_len = self._total_len / n_docs
+            scores: Dict[int, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n_docs - len(postings) + 0.5) / (len(postings) + 0.5))
+                for node_id, tf in postings.items():
+                    if node_ids is not None and node_id not in node_ids:
+                        continue
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._doc_len[node_id] / avg_len)
+                    scores[node_id] = scores.get(node_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+
+            ranked = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+            hits = [LexicalHit(node_id, score, self._meta.get(node_id, {})) for node_id, score in ranked]
+
+            confident = False
+            exact_terms = [term for term in terms if is_exact_term(term)]
+            if hits and exact_terms:
+                top_terms = self._doc_terms[hits[0].node_id]
+                second = hits[1].score if len(hits) > 1 else 0.0
+                margin = (hits[0].score - second) / hits[0].score
+                confident = all(term in top_terms for term in exact_terms) and margin >= LEXICAL_CONFIDENCE_MARGIN
+        return LexicalResult(hits=hits, confident=confident)
+
+    # Synchronisation with the graph
+
+    async def _build(self, page_size: int):
+        fresh = BM25Index(self.k1, self.b)
+        after = -1
+        while True:
+            page = await get_db().execute_read(BUILD_QUERY, {"after": after, "limit": page_size}, name="lexical_index_build")
+            fresh.upsert_nodes(page)
+            if len(page) < page_size:
+                break
+            after = page[-1]["nodeId"]
+        with self._lock:
+            self._postings, self._doc_terms = fresh._postings, fresh._doc_terms
+            self._doc_len, self._meta, self._total_len = fresh._doc_len, fresh._meta, fresh._total_len
+            self.loaded = True
+        logger.info("Built lexical index with %d documents", len(self))
+
+    async def build_from_graph(self, page_size: int = LEXICAL_INDEX_PAGE_SIZE):
+        """Rebuild the index from the catalogue in Neo4j and swap it in."""
+        async with self._build_lock:
+            self.stale = False
+            await self._build(page_size)
+
+    async def ensure_loaded(self):
+        """Build the index on first use; rebuild in the background when stale."""
+        if not self.loaded:
+            async with self._build_lock:
+                if not self.loaded:
+                    await self._build(LEXICAL_INDEX_PAGE_SIZE)
+        elif self.stale and not self._build_lock.locked():
+            self.stale = False
+            # Keep serving the current index while the new one is built
+            self._rebuild_task = asyncio.create_task(self.build_from_graph())
+
+
+def document_text(row: Dict[str, Any]) -> str:
+    """Concatenate the searchable fields of a catalogue row."""
+    parts = [row.get("name"), row.get("description"), row.get("significance"), *(row.get("paths") or [])]
+    return "\n".join(part for part in parts if part)
+
+
+# Catalogue nodes with the paths of all their possible locations
+BUILD_QUERY = """
+MATCH (n)
+WHERE (n:EvidenceItem OR n:CrimeSubtype) AND id(n) > $after
+OPTIONAL MATCH (n)-[r]->(p:PossibleLocation)
+WHERE type(r) STARTS WITH 'POSSIBLE_LOCATION_ON_'
+WITH n, collect(DISTINCT p.path) AS paths
+RETURN id(n) AS nodeId, labels(n) AS labels, n.name AS name,
+       n.description AS description, n.significance AS significance, paths
+ORDER BY nodeId
+LIMIT $limit
+"""
+
+
+# Singleton instance; rebuilt in the background after catalogue changes
+# that weren't already applied to it incrementally
+lexical_index = BM25Index()
+
+def _mark_stale(_version: int):
+    lexical_index.stale = True
+
+get_catalog_version().on_change(_mark_stale)
+
+def get_lexical_index() -> BM25Index:
+    """
+    Get the lexical index instance.
+
+    Returns:
+        BM25Index: Index instance
+    """
+    return lexical_index
@@ -0,0 +1,125 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from dotenv import load_dotenv
+
+from services.db import connect_db
+from services.ollama import OLLAMA_GENERATE_MODEL, get_client
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Deadline for each warmup step; loading a model into memory can be slow
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "120"))
+# Seconds between attempts to reach Neo4j during startup
+WARMUP_RETRY_INTERVAL = float(os.getenv("WARMUP_RETRY_INTERVAL", "5"))
+# Also load the generation model, so the first /ask doesn't pay for it
+WARMUP_GENERATE_MODEL = os.getenv("WARMUP_GENERATE_MODEL", "true").lower() == "true"
+
+
+@dataclass
+class StartupState:
+    """Progress of the startup sequence; ready flips once warmup finishes."""
+    phase: str = "starting"
+    ready: bool = False
+    started_at: float = field(default_factory=time.monotonic)
+    ready_after: Optional[float] = None
+    # Step name -> {"ok": bool, "ms": float, "error": str}
+    steps: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "phase": self.phase,
+            "ready": self.ready,
+            "ready_after_seconds": round(self.ready_after, 2) if self.ready_after is not None else None,
+            "steps": self.steps,
+        }
+
+
+async def _step(name: str, fn: Callable[[], Awaitable[Any]]) -> bool:
+    """Run one warmup step, recording its duration and outcome."""
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(fn(), timeout=WARMUP_TIMEOUT)
+        ok, error = True, None
+    except Exception as e:
+        ok, error = False, str(e) or type(e).__name__
+        logger.warning("Warmup step %s failed: %s", name, error)
+    state.steps[name] = {"ok": ok, "ms": round((time.perf_counter() - started) * 1000, 1), "error": error}
+    return ok
+
+
+async def warm_up():
+    """
+    Connect to dependencies and prime models, schema and caches.
+
+    Neo4j is required: connecting is retried until it succeeds. The other
+    steps run concurrently and are best effort, since a cold cache or
+    model only makes the first requests slower. The exception is the graph
+    schema: if it can't be created or a hot query would scan, startup ends
+    in the "failed" phase and the server never reports ready. Otherwise
+    the ready flag flips once every step has finished, and an interrupted
+    embedding job is resumed.
+    """
+    # Imported here so this module stays cheap to import from main
+    from services import embedding
+    from services.catalog import get_catalog_version
+    from services.catalog_snapshot import get_catalog_store
+    from services.embedding_jobs import get_job_manager
+    from services.lexical_index import get_lexical_index
+    from services.schema import bootstrap_schema
+    from services.vector_index import get_vector_index, use_local_index
+
+    state.phase = "connecting"
+    while not await _step("neo4j_connect", connect_db):
+        await asyncio.sleep(WARMUP_RETRY_INTERVAL)
+
+    state.phase = "warming"
+    steps = {
+        "embedding_model": lambda: get_client().embeddings("warmup", timeout=WARMUP_TIMEOUT),
+        "vector_schema": embedding.ensure_vector_index_exists,
+        "graph_schema": bootstrap_schema,
+        "catalog_version": get_catalog_version().current,
+        "catalog_snapshot": get_catalog_store().refresh,
+        "lexical_index": get_lexical_index().ensure_loaded,
+    }
+    if WARMUP_GENERATE_MODEL:
+        # An empty prompt makes Ollama load the model without generating
+        steps["generate_model"] = lambda: get_client().generate("", model=OLLAMA_GENERATE_MODEL, timeout=WARMUP_TIMEOUT)
+    if use_local_index():
+        steps["vector_index"] = get_vector_index().ensure_loaded
+    await asyncio.gather(*(_step(name, fn) for name, fn in steps.items()))
+
+    if not state.steps["graph_schema"]["ok"]:
+        # Unlike a cold cache, a wrong schema doesn't fix itself: stay unready
+        state.phase = "failed"
+        logger.error("Startup failed, not reporting ready: graph_schema: %s", state.steps["graph_schema"]["error"])
+        return
+
+    state.ready = True
+    state.ready_after = time.monotonic() - state.started_at
+    state.phase = "ready"
+    logger.info("Ready after %.2fs: %s", state.ready_after, state.steps)
+
+    await _step("resume_embedding_job", get_job_manager().resume_interrupted)
+
+
+# Singleton instance
+state = StartupState()
+
+def get_startup_state() -> StartupState:
+    """
+    Get the startup state.
+
+    Returns:
+        StartupState: Startup phase, ready flag and warmup step timings
+    """
+    return state
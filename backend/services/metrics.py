@@ -0,0 +1,162 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from prometheus_client import REGISTRY, Gauge, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from services.tracing import span
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Seconds; covers sub-millisecond cache hits up to slow LLM generations
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "dcia_http_request_seconds", "HTTP request latency by route template",
+    ["method", "route", "status"], buckets=LATENCY_BUCKETS,
+)
+STAGE_SECONDS = Histogram(
+    "dcia_stage_seconds", "Latency of individual stages within a route",
+    ["route", "stage"], buckets=LATENCY_BUCKETS,
+)
+NEO4J_QUERY_SECONDS = Histogram(
+    "dcia_neo4j_query_seconds", "Neo4j query latency by query name",
+    ["query", "outcome"], buckets=LATENCY_BUCKETS,
+)
+NEO4J_SESSIONS_IN_USE = Gauge(
+    "dcia_neo4j_sessions_in_use", "Neo4j queries holding or waiting for a pooled connection", ["pool"],
+)
+NEO4J_POOL_MAX_SIZE = Gauge(
+    "dcia_neo4j_pool_max_size", "Configured Neo4j connection pool size", ["pool"],
+)
+OLLAMA_REQUEST_SECONDS = Histogram(
+    "dcia_ollama_request_seconds", "Ollama call latency including retries, by API path",
+    ["path", "outcome"], buckets=LATENCY_BUCKETS,
+)
+OLLAMA_REQUESTS_IN_FLIGHT = Gauge(
+    "dcia_ollama_requests_in_flight", "Ollama calls currently waiting on a pooled connection or response",
+)
+OLLAMA_POOL_MAX_SIZE = Gauge(
+    "dcia_ollama_pool_max_size", "Configured Ollama HTTP connection pool size",
+)
+
+
+@contextmanager
+def stage(route: str, name: str):
+    """
+    Time one stage of a route into dcia_stage_seconds and the request trace.
+
+    Example::
+
+        with stage("ask", "vector_search"):
+            ...
+
+    Args:
+        route (str): Route name, e.g. "ask"
+        name (str): Stage name, e.g. "embed_question"
+    """
+    started = time.perf_counter()
+    try:
+        with span(f"{route}.{name}"):
+            yield
+    finally:
+        STAGE_SECONDS.labels(route, name).observe(time.perf_counter() - started)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency per route template.
+
+    Labels use the matched route's path (``/evidence/{subtype}``) rather
+    than the raw URL, so cardinality stays bounded. Streaming responses
+    are timed until their last chunk is sent.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope["method"], path, str(status)).observe(time.perf_counter() - started)
+
+
+class CacheCollector:
+    """
+    Exposes cache and coalescing counters at scrape time.
+
+    The caches keep plain integer counters on their hot paths; this reads
+    them only when /metrics is scraped.
+    """
+
+    def describe(self):
+        # Static descriptions, so registering doesn't trigger a collection
+        return [
+            CounterMetricFamily("dcia_cache_lookups", "Cache lookups by cache and result", labels=["cache", "result"]),
+            GaugeMetricFamily("dcia_cache_entries", "Entries held in memory", labels=["cache"]),
+            CounterMetricFamily("dcia_response_not_modified", "Responses answered with 304 Not Modified"),
+            CounterMetricFamily("dcia_singleflight_calls", "Single-flight calls by call site and whether they were coalesced",
+                                labels=["flight", "result"]),
+        ]
+
+    def collect(self):
+        # Imported here: these modules pull in the database layer, which
+        # itself records into this module
+        from services.embedding_cache import get_cache
+        from services.response_cache import get_response_cache
+        from services.singleflight import flight_stats
+
+        lookups = CounterMetricFamily(
+            "dcia_cache_lookups", "Cache lookups by cache and result", labels=["cache", "result"],
+        )
+        entries = GaugeMetricFamily("dcia_cache_entries", "Entries held in memory", labels=["cache"])
+
+        embedding_stats = get_cache().stats()
+        lookups.add_metric(["embedding", "memory_hit"], embedding_stats["memory_hits"])
+        lookups.add_metric(["embedding", "disk_hit"], embedding_stats["disk_hits"])
+        lookups.add_metric(["embedding", "miss"], embedding_stats["misses"])
+        entries.add_metric(["embedding"], embedding_stats["memory_entries"])
+
+        response_stats = get_response_cache().stats()
+        lookups.add_metric(["response", "hit"], response_stats["hits"])
+        lookups.add_metric(["response", "miss"], response_stats["misses"])
+        entries.add_metric(["response"], response_stats["entries"])
+        yield lookups
+        yield entries
+
+        not_modified = CounterMetricFamily(
+            "dcia_response_not_modified", "Responses answered with 304 Not Modified",
+        )
+        not_modified.add_metric([], response_stats["not_modified"])
+        yield not_modified
+
+        calls = CounterMetricFamily(
+            "dcia_singleflight_calls", "Single-flight calls by call site and whether they were coalesced",
+            labels=["flight", "result"],
+        )
+        for name, flight in flight_stats().items():
+            calls.add_metric([name, "executed"], flight["executions"])
+            calls.add_metric([name, "coalesced"], flight["coalesced"])
+        yield calls
+
+
+REGISTRY.register(CacheCollector())
@@ -0,0 +1,363 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import httpx
+from dotenv import load_dotenv
+
+from services.metrics import OLLAMA_POOL_MAX_SIZE, OLLAMA_REQUEST_SECONDS, OLLAMA_REQUESTS_IN_FLIGHT
+from services.tracing import current_span, span
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Ollama service settings (see .env.example)
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_EMBEDDING_MODEL = os.getenv("OLLAMA_EMBEDDING_MODEL", "all-minilm")
+OLLAMA_GENERATE_MODEL = os.getenv("OLLAMA_GENERATE_MODEL", "llama3")
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "30"))
+OLLAMA_CONNECT_TIMEOUT = float(os.getenv("OLLAMA_CONNECT_TIMEOUT", "3"))
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "20"))
+OLLAMA_MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "10"))
+OLLAMA_MAX_RETRIES = int(os.getenv("OLLAMA_MAX_RETRIES", "2"))
+OLLAMA_BACKOFF_BASE = float(os.getenv("OLLAMA_BACKOFF_BASE", "0.2"))
+OLLAMA_BACKOFF_MAX = float(os.getenv("OLLAMA_BACKOFF_MAX", "2"))
+OLLAMA_BREAKER_THRESHOLD = int(os.getenv("OLLAMA_BREAKER_THRESHOLD", "5"))
+OLLAMA_BREAKER_RESET = float(os.getenv("OLLAMA_BREAKER_RESET", "30"))
+
+# Status codes worth retrying; anything else in 4xx is a caller error
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+def counts_as_outage(error: Exception) -> bool:
+    """Whether a failed call says Ollama is down: transport errors, timeouts, 5xx and malformed bodies."""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500
+    return isinstance(error, (httpx.TransportError, asyncio.TimeoutError, ValueError))
+
+
+class OllamaError(Exception):
+    """Raised when an Ollama request fails after all retries."""
+
+
+class OllamaUnavailableError(OllamaError):
+    """Raised without contacting Ollama while the circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After `threshold` failed calls in a row the breaker opens and rejects
+    calls for `reset_timeout` seconds. After that window a single call is
+    let through as a trial while the others are still rejected; success
+    closes the breaker, failure re-opens it. Only outages count as
+    failures (see counts_as_outage), not caller errors such as an
+    unknown model.
+    """
+
+    def __init__(self, threshold: int = OLLAMA_BREAKER_THRESHOLD, reset_timeout: float = OLLAMA_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    @contextmanager
+    def guard(self):
+        """
+        Admit one call, or raise without calling Ollama.
+
+        Raises:
+            OllamaUnavailableError: If the breaker is open, or half-open
+                with its trial call still in flight
+        """
+        state = self.state
+        if state == "open" or (state == "half-open" and self._trial_in_flight):
+            raise OllamaUnavailableError("Ollama circuit breaker is open")
+        trial = state == "half-open"
+        if trial:
+            self._trial_in_flight = True
+        try:
+            yield
+        finally:
+            if trial:
+                self._trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold or self.opened_at is not None:
+            # Trip, or re-trip after a failed half-open trial
+            if self.opened_at is None:
+                logger.warning("Ollama circuit breaker opened after %d failures", self.failures)
+            self.opened_at = time.monotonic()
+
+
+class OllamaClient:
+    """
+    Shared async client for the Ollama HTTP API.
+
+    Keeps a pool of keep-alive connections, bounds every call with a
+    deadline that covers all retry attempts, retries transient failures
+    with jittered exponential backoff and stops calling Ollama altogether
+    while the circuit breaker is open.
+    """
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, timeout: float = OLLAMA_TIMEOUT,
+                 max_retries: int = OLLAMA_MAX_RETRIES):
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.breaker = CircuitBreaker()
+        OLLAMA_POOL_MAX_SIZE.set(OLLAMA_MAX_CONNECTIONS)
+        self._client = httpx.AsyncClient(
+            base_url=base_url,
+            timeout=httpx.Timeout(timeout, connect=OLLAMA_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_KEEPALIVE,
+            ),
+        )
+
+    async def close(self):
+        """Close pooled connections."""
+        await self._client.aclose()
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform in [0, min(cap, base * 2^attempt)]
+        return random.uniform(0, min(OLLAMA_BACKOFF_MAX, OLLAMA_BACKOFF_BASE * (2 ** attempt)))
+
+    async def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None,
+                      timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Send a request to Ollama and return the decoded JSON body.
+
+        Args:
+            method (str): HTTP method
+            path (str): API path, e.g. "/api/embeddings"
+            payload (dict, optional): JSON body
+            timeout (float, optional): Deadline in seconds for the whole call,
+                including retries. Defaults to OLLAMA_TIMEOUT.
+
+        Returns:
+            dict: Decoded response body
+
+        Raises:
+            OllamaUnavailableError: If the circuit breaker is open
+            OllamaError: If the call fails or the deadline expires
+        """
+        with self.breaker.guard():
+            started = time.perf_counter()
+            outcome = "error"
+            OLLAMA_REQUESTS_IN_FLIGHT.inc()
+            try:
+                with span(f"ollama:{path}", method=method, model=(payload or {}).get("model")):
+                    data = await self._send(method, path, payload, time.monotonic() + (timeout or self.timeout))
+                outcome = "ok"
+                return data
+            finally:
+                OLLAMA_REQUESTS_IN_FLIGHT.dec()
+                OLLAMA_REQUEST_SECONDS.labels(path, outcome).observe(time.perf_counter() - started)
+
+    async def _send(self, method: str, path: str, payload: Optional[Dict[str, Any]], deadline: float) -> Dict[str, Any]:
+        # One logical call: attempts with backoff until success or the deadline
+        attempt = 0
+        while True:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                response = await asyncio.wait_for(
+                    self._client.request(method, path, json=payload, timeout=remaining),
+                    timeout=remaining,
+                )
+                if response.status_code in RETRYABLE_STATUS:
+                    raise httpx.HTTPStatusError(
+                        f"Ollama returned {response.status_code}", request=response.request, response=response
+                    )
+                response.raise_for_status()
+                # A truncated or malformed body fails like a dropped connection
+                data = response.json()
+                self.breaker.record_success()
+                return data
+            except (httpx.TransportError, httpx.HTTPStatusError, asyncio.TimeoutError, ValueError) as e:
+                retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code in RETRYABLE_STATUS
+                delay = self._backoff(attempt)
+                if not retryable or attempt >= self.max_retries or time.monotonic() + delay >= deadline:
+                    if counts_as_outage(e):
+                        self.breaker.record_failure()
+                    raise OllamaError(f"Ollama {path} failed: {str(e) or type(e).__name__}") from e
+                logger.warning("Ollama %s attempt %d failed (%s), retrying in %.2fs", path, attempt + 1, e, delay)
+                attempt += 1
+                await asyncio.sleep(delay)
+
+    async def embeddings(self, prompt: str, model: Optional[str] = None,
+                         timeout: Optional[float] = None) -> List[float]:
+        """
+        Generate a single embedding via /api/embeddings.
+
+        Returns:
+            List[float]: The embedding vector (empty if Ollama returned none)
+        """
+        data = await self.request("POST", "/api/embeddings", {
+            "model": model or OLLAMA_EMBEDDING_MODEL,
+            "prompt": prompt,
+        }, timeout=timeout)
+        return data.get("embedding") or []
+
+    async def embed(self, inputs: List[str], model: Optional[str] = None,
+                    timeout: Optional[float] = None) -> List[List[float]]:
+        """
+        Generate embeddings for several inputs in one call via /api/embed.
+
+        Returns:
+            List[List[float]]: One vector per input, in input order
+        """
+        data = await self.request("POST", "/api/embed", {
+            "model": model or OLLAMA_EMBEDDING_MODEL,
+            "input": inputs,
+        }, timeout=timeout)
+        embeddings = data.get("embeddings") or []
+        if len(embeddings) != len(inputs):
+            raise OllamaError(f"Ollama /api/embed returned {len(embeddings)} vectors for {len(inputs)} inputs")
+        return embeddings
+
+    async def generate(self, prompt: str, model: Optional[str] = None,
+                       timeout: Optional[float] = None, **options) -> str:
+        """
+        Generate a completion via /api/generate (non-streaming).
+
+        Returns:
+            str: The generated text
+        """
+        payload = {"model": model or OLLAMA_GENERATE_MODEL, "prompt": prompt, "stream": False}
+        if options:
+            payload["options"] = options
+        data = await self.request("POST", "/api/generate", payload, timeout=timeout)
+        return data.get("response", "")
+
+    async def generate_stream(self, prompt: str, model: Optional[str] = None,
+                              timeout: Optional[float] = None, **options) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream a completion from /api/generate chunk by chunk.
+
+        The deadline bounds the wait for each chunk rather than the whole
+        generation. Closing the iterator early (e.g. when the client
+        disconnects) closes the HTTP response, which makes Ollama stop
+        generating.
+
+        Yields:
+            dict: Decoded NDJSON chunks with "response" and "done" keys
+
+        Raises:
+            OllamaUnavailableError: If the circuit breaker is open
+            OllamaError: If the request fails or a chunk times out
+        """
+        payload = {"model": model or OLLAMA_GENERATE_MODEL, "prompt": prompt, "stream": True}
+        if options:
+            payload["options"] = options
+        with self.breaker.guard():
+            started = time.perf_counter()
+            outcome = "error"
+            # Recorded without becoming the current span: the generator is
+            # resumed by its consumer, possibly from another context
+            parent = current_span()
+            stream_span = parent.child("ollama:/api/generate:stream", model=payload["model"]) if parent else None
+            OLLAMA_REQUESTS_IN_FLIGHT.inc()
+            try:
+                async with self._client.stream("POST", "/api/generate", json=payload,
+                                               timeout=timeout or self.timeout) as response:
+                    response.raise_for_status()
+                    self.breaker.record_success()
+                    async for line in response.aiter_lines():
+                        if line:
+                            yield json.loads(line)
+                outcome = "ok"
+            except (httpx.TransportError, httpx.HTTPStatusError, ValueError) as e:
+                if counts_as_outage(e):
+                    self.breaker.record_failure()
+                raise OllamaError(f"Ollama /api/generate stream failed: {str(e) or type(e).__name__}") from e
+            except GeneratorExit:
+                # Closed early by the consumer (e.g. client disconnected)
+                outcome = "closed"
+                raise
+            finally:
+                OLLAMA_REQUESTS_IN_FLIGHT.dec()
+                OLLAMA_REQUEST_SECONDS.labels("/api/generate:stream", outcome).observe(time.perf_counter() - started)
+                if stream_span is not None:
+                    stream_span.attrs["outcome"] = outcome
+                    stream_span.finish()
+
+    async def list_models(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        List locally available models via /api/tags.
+
+        Returns:
+            List[dict]: Model descriptors
+        """
+        data = await self.request("GET", "/api/tags", timeout=timeout)
+        return data.get("models", [])
+
+
+# Shared instance, created on first use so it binds to the running loop
+_client: Optional[OllamaClient] = None
+# Per-context override for code running on another event loop (worker threads)
+_client_override: ContextVar[Optional[OllamaClient]] = ContextVar("ollama_client", default=None)
+
+def get_client() -> OllamaClient:
+    """
+    Get the shared Ollama client.
+
+    Returns:
+        OllamaClient: Client instance
+    """
+    override = _client_override.get()
+    if override is not None:
+        return override
+    global _client
+    if _client is None:
+        _client = OllamaClient()
+    return _client
+
+@contextmanager
+def use_client(client: OllamaClient):
+    """
+    Make get_client() return ``client`` within the current context.
+
+    Args:
+        client (OllamaClient): Client bound to the current event loop
+    """
+    token = _client_override.set(client)
+    try:
+        yield client
+    finally:
+        _client_override.reset(token)
+
+async def close_client():
+    """Close the shared Ollama client if it was created."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
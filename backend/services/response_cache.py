@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from dotenv import load_dotenv
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+from services.catalog import get_catalog_version
+from services.singleflight import get_flight
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Maximum number of cached (route, parameters) responses
+RESPONSE_CACHE_SIZE = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+
+
+@dataclass
+class CachedResponse:
+    """A serialised JSON body and its strong ETag, valid for one catalogue version."""
+    version: int
+    etag: str
+    body: bytes
+
+
+class ResponseCache:
+    """
+    LRU of serialised responses keyed by route and parameters.
+
+    Entries are tagged with the catalogue version they were built from and
+    are ignored once the version moves on, so a catalogue write
+    invalidates every cached response at once.
+    """
+
+    def __init__(self, max_entries: int = RESPONSE_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key: Hashable, version: int) -> Optional[CachedResponse]:
+        entry = self._entries.get(key)
+        if entry is None or entry.version != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, version: int, body: bytes) -> CachedResponse:
+        etag = f'"{version}-{hashlib.sha256(body).hexdigest()[:32]}"'
+        entry = CachedResponse(version=version, etag=etag, body=body)
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def clear(self, _version: Optional[int] = None):
+        """Drop all entries (usable as a catalogue on_change callback)."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "entries": len(self._entries),
+        }
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag (RFC 9110)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+# Singleton instance; emptied whenever the catalogue version changes
+response_cache = ResponseCache()
+get_catalog_version().on_change(response_cache.clear)
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the response cache instance.
+
+    Returns:
+        ResponseCache: Cache instance
+    """
+    return response_cache
+
+async def cached_json_response(request: Request, key: Tuple[Hashable, ...], build: Callable[[], Awaitable[Any]]) -> Response:
+    """
+    Serve a JSON response from the cache, building it on a miss.
+
+    The response carries a strong ETag and ``Cache-Control: no-cache`` so
+    browsers revalidate; a matching ``If-None-Match`` gets a bodyless 304.
+
+    Args:
+        request (Request): Incoming request (for If-None-Match)
+        key (Tuple): Route name followed by normalised parameters
+        build (Callable): Coroutine function returning the JSON-able payload
+
+    Returns:
+        Response: 200 with the cached body, or 304
+    """
+    version = await get_catalog_version().current()
+    entry = response_cache.get(key, version)
+    if entry is None:
+        async def build_entry() -> CachedResponse:
+            payload = await build()
+            body = json.dumps(jsonable_encoder(payload), separators=(",", ":")).encode("utf-8")
+            return response_cache.put(key, version, body)
+
+        # Concurrent misses for the same key share one build
+        entry = await get_flight(key[0]).do((key, version), build_entry)
+
+    headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+    return Response(content=entry.body, media_type="application/json", headers=headers)
@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import os
+import sys
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from dotenv import load_dotenv
+from neo4j.exceptions import CypherSyntaxError
+
+from services.db import get_db, neighbourhood_query, node_by_id_query
+from services.catalog import VERSION_QUERY
+from services.catalog_snapshot import CATALOG_QUERY
+from services.embedding import SCOPED_SEARCH_QUERY
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# Seconds to wait for new indexes to come online before checking plans
+SCHEMA_INDEX_TIMEOUT = int(os.getenv("SCHEMA_INDEX_TIMEOUT", "60"))
+# Fail the schema step when a hot query plans more scans than it allows
+SCHEMA_PLAN_CHECK = os.getenv("SCHEMA_PLAN_CHECK", "true").lower() == "true"
+
+
+class SchemaObject(NamedTuple):
+    """A constraint or index, created with IF NOT EXISTS so reruns are no-ops."""
+    name: str
+    statement: str
+    # Lists existing (value, nodes) pairs that would violate a uniqueness
+    # constraint; if it returns any, the constraint is skipped with a warning
+    duplicates_query: Optional[str] = None
+
+
+class HotQuery(NamedTuple):
+    """A query run while serving requests, with example parameters for EXPLAIN."""
+    query: str
+    parameters: Dict[str, Any]
+    # Label or all-nodes scans the plan may contain (a catalogue-wide read
+    # has to start from one); any more means a lookup lost its index
+    allowed_scans: int = 0
+    # Skipped when the server can't plan it; the caller has a fallback
+    optional: bool = False
+
+
+class SchemaError(Exception):
+    """Raised when the schema can't be created or a hot query would scan."""
+
+
+# Uniqueness constraints; each also provides a range index on its property
+CONSTRAINTS: Tuple[SchemaObject, ...] = (
+    SchemaObject(
+        "crime_subtype_name_unique",
+        "CREATE CONSTRAINT crime_subtype_name_unique IF NOT EXISTS "
+        "FOR (s:CrimeSubtype) REQUIRE s.name IS UNIQUE",
+        """
+        MATCH (s:CrimeSubtype)
+        WHERE s.name IS NOT NULL
+        WITH s.name AS value, count(*) AS nodes
+        WHERE nodes > 1
+        RETURN value, nodes
+        ORDER BY nodes DESC, value
+        LIMIT 20
+        """,
+    ),
+    SchemaObject(
+        "catalog_meta_key_unique",
+        "CREATE CONSTRAINT catalog_meta_key_unique IF NOT EXISTS "
+        "FOR (m:CatalogMeta) REQUIRE m.key IS UNIQUE",
+    ),
+)
+
+# Range indexes for id lookups on every NODE_LABELS label
+INDEXES: Tuple[SchemaObject, ...] = (
+    SchemaObject("crime_subtype_id", "CREATE INDEX crime_subtype_id IF NOT EXISTS FOR (n:CrimeSubtype) ON (n.id)"),
+    SchemaObject("evidence_item_id", "CREATE INDEX evidence_item_id IF NOT EXISTS FOR (n:EvidenceItem) ON (n.id)"),
+    SchemaObject("possible_location_id", "CREATE INDEX possible_location_id IF NOT EXISTS FOR (n:PossibleLocation) ON (n.id)"),
+)
+
+# Queries on request paths. Lookups must plan as index or id seeks; the
+# catalogue load may scan CrimeSubtype once and must expand from there.
+HOT_QUERIES: Dict[str, HotQuery] = {
+    "catalog_version": HotQuery(VERSION_QUERY, {}),
+    "catalog_snapshot": HotQuery(CATALOG_QUERY, {}, allowed_scans=1),
+    "node_by_id": HotQuery(node_by_id_query(), {"node_id": ""}),
+    # The relationship types followed don't change the plan's shape
+    "neighbourhood": HotQuery(neighbourhood_query(), {"nodeIds": [0], "perNodeLimit": 10}),
+    # Needs vector.similarity.cosine (Neo4j 5.18+); older servers over-fetch
+    "vector_search_scoped": HotQuery(SCOPED_SEARCH_QUERY, {"queryEmbeddings": [[0.0]], "nodeIds": [0], "limit": 5},
+                                     optional=True),
+}
+
+# Plan operators that read every node, or every node with a label
+SCAN_OPERATORS = frozenset({
+    "AllNodesScan",
+    "NodeByLabelScan",
+    "UnionNodeByLabelsScan",
+    "IntersectionNodeByLabelsScan",
+    "PartitionedAllNodesScan",
+    "PartitionedNodeByLabelScan",
+    "PartitionedUnionNodeByLabelsScan",
+    "PartitionedIntersectionNodeByLabelsScan",
+})
+
+async def ensure_schema() -> List[str]:
+    """
+    Create every declared constraint and index that doesn't exist yet.
+
+    Each statement is tried on its own, so one failure doesn't stop the
+    rest from being created. A uniqueness constraint the existing data
+    already violates is skipped with a warning naming the duplicate
+    values, since it can't be created until they are cleaned up and the
+    service still works without it.
+
+    Returns:
+        List[str]: Names of the constraints and indexes that failed
+    """
+    db = get_db()
+    failed = []
+    for item in CONSTRAINTS + INDEXES:
+        try:
+            if item.duplicates_query:
+                duplicates = await db.execute_read(item.duplicates_query, name="schema_duplicates")
+                if duplicates:
+                    logger.warning(
+                        "Not creating %s until these duplicates are merged or renamed: %s", item.name,
+                        ", ".join(f"{row['value']!r} ({row['nodes']} nodes)" for row in duplicates),
+                    )
+                    continue
+            await db.execute_write(item.statement, name="schema_create")
+        except Exception as e:
+            logger.error("Failed to create %s: %s", item.name, e)
+            failed.append(item.name)
+    logger.info("Schema ensured: %d constraints, %d indexes, %d failed",
+                len(CONSTRAINTS), len(INDEXES), len(failed))
+    return failed
+
+def scan_operators(plan: Optional[Dict[str, Any]]) -> List[str]:
+    """Scan operators anywhere in a plan tree, without their runtime suffix."""
+    if not plan:
+        return []
+    operator = plan.get("operatorType", "").split("@", 1)[0]
+    found = [operator] if operator in SCAN_OPERATORS else []
+    for child in plan.get("children") or []:
+        found.extend(scan_operators(child))
+    return found
+
+async def check_query_plans():
+    """
+    EXPLAIN every hot query once the indexes are online.
+
+    Raises:
+        SchemaError: If any hot query plans a scan
+    """
+    db = get_db()
+    # Auto-commit, so it runs on the member that created the indexes
+    await db.execute_query("CALL db.awaitIndexes($timeout)", {"timeout": SCHEMA_INDEX_TIMEOUT}, name="schema_await_indexes")
+
+    scans = {}
+    for name, hot_query in HOT_QUERIES.items():
+        try:
+            plan = await db.explain(hot_query.query, hot_query.parameters, name=name)
+        except CypherSyntaxError as e:
+            if not hot_query.optional:
+                raise SchemaError(f"Hot query {name} does not plan: {e}") from e
+            logger.warning("Skipping plan check for %s, unsupported by this server: %s", name, e)
+            continue
+        operators = scan_operators(plan)
+        if len(operators) > hot_query.allowed_scans:
+            scans[name] = operators
+
+    if scans:
+        details = "; ".join(f"{name}: {', '.join(operators)}" for name, operators in scans.items())
+        logger.error("Hot queries plan unexpected scans: %s", details)
+        raise SchemaError(f"Hot queries plan unexpected scans: {details}")
+    logger.info("All %d hot queries plan without unexpected scans", len(HOT_QUERIES))
+
+async def bootstrap_schema(check_plans: bool = SCHEMA_PLAN_CHECK):
+    """
+    Create the schema and verify hot query plans.
+
+    Run at startup; every step is idempotent.
+
+    Args:
+        check_plans (bool): Also EXPLAIN the hot queries
+
+    Raises:
+        SchemaError: If a constraint or index could not be created, or a
+            hot query plans a scan
+    """
+    failed = await ensure_schema()
+    if failed:
+        raise SchemaError(f"Failed to create: {', '.join(failed)}")
+    if check_plans:
+        await check_query_plans()
+
+async def _main() -> int:
+    try:
+        await bootstrap_schema(check_plans=True)
+        return 0
+    except SchemaError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        await get_db().close()
+
+if __name__ == "__main__":
+    # Usage (from backend/, with NEO4J_* set in .env): python -m services.schema
+    sys.exit(asyncio.run(_main()))
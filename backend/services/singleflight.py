@@ -0,0 +1,88 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, TypeVar
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls that share a key into one execution.
+
+    The first caller for a key starts the computation as a task; callers
+    arriving while it is in flight await the same task instead of
+    starting their own. The task is shielded, so one caller giving up
+    (e.g. a disconnected client) doesn't cancel it for the others. The key
+    is released as soon as the task finishes, so results are never served
+    stale; caching is left to the layers above.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def _release(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every caller went away
+            task.exception()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run fn() once for all concurrent callers with the same key.
+
+        Args:
+            key (Hashable): Normalised request key
+            fn (Callable): Coroutine function computing the result
+
+        Returns:
+            The shared result; exceptions propagate to every caller
+        """
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "in_flight": len(self._inflight),
+        }
+
+
+# Named groups, so each call site gets its own counters
+_flights: Dict[str, SingleFlight] = {}
+
+def get_flight(name: str) -> SingleFlight:
+    """
+    Get (or create) the single-flight group for a call site.
+
+    Args:
+        name (str): Call-site name, e.g. "ask"
+
+    Returns:
+        SingleFlight: The group instance
+    """
+    if name not in _flights:
+        _flights[name] = SingleFlight(name)
+    return _flights[name]
+
+def flight_stats() -> Dict[str, Dict[str, Any]]:
+    """Counters for every single-flight group."""
+    return {name: flight.stats() for name, flight in _flights.items()}
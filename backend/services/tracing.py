@@ -0,0 +1,192 @@
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+# Traces and slow spans get their own loggers so they can be routed separately
+trace_logger = logging.getLogger("dcia.trace")
+slow_logger = logging.getLogger("dcia.slow")
+
+# Load environment variables
+load_dotenv()
+
+# Fraction of requests whose full span tree is logged
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+# Spans slower than this are logged with their attributes; requests slower
+# than this always have their trace logged
+TRACE_SLOW_THRESHOLD_MS = float(os.getenv("TRACE_SLOW_THRESHOLD_MS", "500"))
+
+REQUEST_ID_HEADER = "x-request-id"
+
+# Longest string and list kept in span attributes (e.g. query parameters)
+_MAX_ATTR_STRING = 200
+_MAX_ATTR_LIST = 8
+
+
+def _summarize(value: Any) -> Any:
+    """Shrink attribute values (embeddings, long texts) for logging."""
+    if isinstance(value, str):
+        return value if len(value) <= _MAX_ATTR_STRING else value[:_MAX_ATTR_STRING] + "..."
+    if isinstance(value, (list, tuple)):
+        if len(value) > _MAX_ATTR_LIST:
+            return f"<{type(value).__name__} of {len(value)}>"
+        return [_summarize(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _summarize(item) for key, item in value.items()}
+    if isinstance(value, (int, float, bool)) or value is None:
+        return value
+    return repr(value)
+
+
+class Span:
+    """One timed operation within a request, with its child operations."""
+
+    __slots__ = ("name", "attrs", "start", "end", "children", "trace")
+
+    def __init__(self, name: str, trace: "Trace", attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.attrs = attrs or {}
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.children: List["Span"] = []
+        self.trace = trace
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end or time.perf_counter()) - self.start) * 1000
+
+    def child(self, name: str, **attrs) -> "Span":
+        """Start a child span without making it current."""
+        span = Span(name, self.trace, attrs)
+        self.children.append(span)
+        return span
+
+    def finish(self):
+        """Stop the clock and report the span if it was slow."""
+        self.end = time.perf_counter()
+        duration_ms = self.duration_ms
+        if duration_ms >= TRACE_SLOW_THRESHOLD_MS and self.trace.root is not self:
+            slow_logger.warning(
+                "Slow span %s took %.1f ms (request %s): %s",
+                self.name, duration_ms, self.trace.request_id,
+                json.dumps(_summarize(self.attrs), default=repr),
+            )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "offset_ms": round((self.start - self.trace.root.start) * 1000, 3),
+            "duration_ms": round(self.duration_ms, 3),
+            **({"attrs": _summarize(self.attrs)} if self.attrs else {}),
+            **({"children": [child.to_dict() for child in self.children]} if self.children else {}),
+        }
+
+
+class Trace:
+    """The span tree of one request."""
+
+    __slots__ = ("request_id", "root", "sampled")
+
+    def __init__(self, request_id: str, name: str, sampled: bool):
+        self.request_id = request_id
+        self.sampled = sampled
+        self.root = Span(name, self)
+
+    def emit(self):
+        """Log the whole tree as one structured line."""
+        trace_logger.info(json.dumps({"request_id": self.request_id, **self.root.to_dict()}, default=repr))
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("trace_span", default=None)
+
+
+def current_span() -> Optional[Span]:
+    """The innermost open span of the current request, if it is traced."""
+    return _current_span.get()
+
+
+def current_request_id() -> Optional[str]:
+    """ID of the request being handled, if any."""
+    span = _current_span.get()
+    return span.trace.request_id if span is not None else None
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """
+    Record an operation as a child of the current span.
+
+    Outside a traced request this does nothing beyond one context lookup.
+
+    Args:
+        name (str): Span name, e.g. "neo4j:catalog_snapshot"
+        **attrs: Details logged with slow spans and sampled traces
+    """
+    parent = _current_span.get()
+    if parent is None:
+        yield None
+        return
+    child = parent.child(name, **attrs)
+    token = _current_span.set(child)
+    try:
+        yield child
+    finally:
+        _current_span.reset(token)
+        child.finish()
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware giving each request an ID and a span tree.
+
+    The ID is taken from an incoming ``X-Request-ID`` header or generated,
+    and echoed on the response. The root span covers the whole request,
+    including streamed bodies. The tree is logged for a sampled fraction of
+    requests and for every request slower than the slow threshold.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for key, value in scope.get("headers", ()):
+            if key == b"x-request-id":
+                request_id = value.decode("latin-1")[:64]
+                break
+        request_id = request_id or uuid.uuid4().hex[:16]
+
+        trace = Trace(request_id, f"{scope['method']} {scope['path']}", random.random() < TRACE_SAMPLE_RATE)
+        token = _current_span.set(trace.root)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", [])
+                message["headers"] = [*message["headers"], (REQUEST_ID_HEADER.encode(), request_id.encode())]
+                trace.root.attrs["status"] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_span.reset(token)
+            trace.root.finish()
+            route = scope.get("route")
+            if route is not None:
+                trace.root.attrs["route"] = getattr(route, "path", None)
+            if trace.sampled or trace.root.duration_ms >= TRACE_SLOW_THRESHOLD_MS:
+                trace.emit()
@@ -0,0 +1,423 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import AbstractSet, Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from dotenv import load_dotenv
+
+from services.db import get_db
+from services.ollama import OLLAMA_EMBEDDING_MODEL
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+# "neo4j" queries db.index.vector.queryNodes; "local" uses LocalVectorIndex
+VECTOR_SEARCH_BACKEND = os.getenv("VECTOR_SEARCH_BACKEND", "neo4j").lower()
+# Directory holding the memory-mapped matrix and its sidecar files
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "vector_index")
+VECTOR_INDEX_PAGE_SIZE = int(os.getenv("VECTOR_INDEX_PAGE_SIZE", "2000"))
+# "none" scans the float32 matrix; "int8" scans per-vector scaled int8 codes
+# and re-ranks the best candidates against the float32 rows
+VECTOR_INDEX_QUANTIZATION = os.getenv("VECTOR_INDEX_QUANTIZATION", "none").lower()
+# Candidates re-ranked at full precision per result requested (int8 only)
+VECTOR_INDEX_RERANK_FACTOR = int(os.getenv("VECTOR_INDEX_RERANK_FACTOR", "4"))
+
+# Node properties kept alongside each vector so hits need no extra lookup
+META_FIELDS = ("labels", "name", "description", "significance")
+
+# Rows of int8 codes widened to float32 at a time during a scan, bounding
+# the scan's scratch memory to about 24 MiB at 384 dimensions
+_SCAN_CHUNK_ROWS = 16384
+
+
+def _normalise(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return (matrix / norms).astype(np.float32, copy=False)
+
+
+def quantize(matrix: np.ndarray):
+    """
+    Symmetric int8 quantization with one scale per vector.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: int8 codes and float32 scales, such
+            that codes * scales[:, None] approximates the matrix
+    """
+    scales = np.abs(matrix).max(axis=1) / 127.0 if len(matrix) else np.zeros(0, dtype=np.float32)
+    scales = np.asarray(scales, dtype=np.float32)
+    safe = np.where(scales == 0, 1.0, scales)[:, None]
+    codes = np.clip(np.rint(matrix / safe), -127, 127).astype(np.int8)
+    return codes, scales
+
+
+@dataclass(frozen=True)
+class _IndexState:
+    """
+    One version of the index; searches read it as a whole.
+
+    Upserts share storage with earlier states: appended rows land past an
+    earlier state's length, where it never looks, and a changed vector is
+    overwritten in place, so a concurrent search may score either version
+    of that one row but never mixes up which node a row belongs to.
+    """
+    matrix: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.float32))
+    ids: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=np.int64))
+    meta: List[Dict[str, Any]] = field(default_factory=list)
+    row_of: Dict[int, int] = field(default_factory=dict)
+    codes: Optional[np.ndarray] = None
+    scales: Optional[np.ndarray] = None
+
+
+class LocalVectorIndex:
+    """
+    Exact in-process cosine index over node embeddings.
+
+    Vectors are stored L2-normalised in one contiguous float32 matrix, so
+    a query is a single matrix-vector product followed by argpartition
+    for the top k. The matrix is persisted as a raw float32 file and
+    memory-mapped on load; node IDs and display properties live in
+    sidecar files (copy-on-write, so updates never touch the saved file).
+    Searches read one ``_IndexState``; updates write only the rows that
+    changed, quantized codes included, into buffers that grow
+    geometrically, then replace the single reference to the state.
+
+    With int8 quantization the scan reads a quarter of the bytes: scores
+    are computed against int8 codes, and the top ``limit * rerank_factor``
+    candidates are re-scored against their float32 rows, which stay
+    memory-mapped so only those rows are paged in.
+
+    Scores use the same (1 + cosine) / 2 scale as Neo4j's vector index.
+    """
+
+    def __init__(self, path: str = VECTOR_INDEX_PATH, model: str = OLLAMA_EMBEDDING_MODEL,
+                 quantization: str = VECTOR_INDEX_QUANTIZATION, rerank_factor: int = VECTOR_INDEX_RERANK_FACTOR):
+        if quantization not in ("none", "int8"):
+            raise ValueError(f"Unknown vector index quantization: {quantization}")
+        self.path = path
+        self.model = model
+        self.quantization = quantization
+        self.rerank_factor = max(1, rerank_factor)
+        self._lock = threading.Lock()
+        self._build_lock = asyncio.Lock()
+        self._state = _IndexState()
+        # Storage behind the current state, with room to append
+        self._buffers = (self._state.matrix, self._state.ids, None, None)
+        self.loaded = False
+        self.dirty = False
+
+    def __len__(self) -> int:
+        return len(self._state.ids)
+
+    @property
+    def dims(self) -> int:
+        matrix = self._state.matrix
+        return matrix.shape[1] if matrix.ndim == 2 else 0
+
+    def _new_state(self, matrix: np.ndarray, ids: np.ndarray, meta: List[Dict[str, Any]]) -> _IndexState:
+        codes, scales = quantize(matrix) if self.quantization == "int8" and matrix.ndim == 2 else (None, None)
+        row_of = {int(node_id): row for row, node_id in enumerate(ids)}
+        return _IndexState(matrix, ids, meta, row_of, codes, scales)
+
+    def _swap(self, state: _IndexState):
+        self._state = state
+        self._buffers = (state.matrix, state.ids, state.codes, state.scales)
+        self.loaded = True
+
+    def _reserve(self, size: int, dims: int):
+        """Grow the buffers to hold at least ``size`` rows, doubling capacity."""
+        matrix, ids, codes, scales = self._buffers
+        if len(ids) >= size and matrix.ndim == 2 and matrix.shape[1] == dims:
+            return
+        used = len(self._state.ids)
+        capacity = max(size, 2 * len(ids))
+        grown = np.empty((capacity, dims), dtype=np.float32)
+        grown_ids = np.empty(capacity, dtype=np.int64)
+        if used:
+            grown[:used], grown_ids[:used] = matrix[:used], ids[:used]
+        if self.quantization == "int8":
+            grown_codes = np.empty((capacity, dims), dtype=np.int8)
+            grown_scales = np.empty(capacity, dtype=np.float32)
+            if used and codes is not None:
+                grown_codes[:used], grown_scales[:used] = codes[:used], scales[:used]
+            codes, scales = grown_codes, grown_scales
+        self._buffers = (grown, grown_ids, codes, scales)
+
+    def footprint(self) -> Dict[str, Any]:
+        """Bytes held per representation, and how many each query scans."""
+        state = self._state
+        full = int(state.matrix.nbytes)
+        quantized = int(state.codes.nbytes + state.scales.nbytes) if state.codes is not None else None
+        return {
+            "vectors": len(self),
+            "dims": self.dims,
+            "quantization": self.quantization,
+            "float32_bytes": full,
+            "int8_bytes": quantized,
+            "scanned_bytes_per_query": quantized if quantized is not None else full,
+        }
+
+    # Persistence
+
+    def _files(self):
+        return (
+            os.path.join(self.path, "vectors.f32"),
+            os.path.join(self.path, "ids.npy"),
+            os.path.join(self.path, "meta.json"),
+        )
+
+    def load(self) -> bool:
+        """
+        Memory-map a previously saved index.
+
+        Returns:
+            bool: True if an index for the current model was loaded
+        """
+        vectors_file, ids_file, meta_file = self._files()
+        if not all(os.path.exists(f) for f in self._files()):
+            return False
+        try:
+            with open(meta_file, "r", encoding="utf-8") as f:
+                header = json.load(f)
+            if header.get("model") != self.model:
+                logger.info("Ignoring vector index on disk built for model %s", header.get("model"))
+                return False
+            ids = np.load(ids_file)
+            dims = header["dims"]
+            matrix = (
+                np.memmap(vectors_file, dtype=np.float32, mode="c", shape=(len(ids), dims))
+                if len(ids) else np.zeros((0, dims), dtype=np.float32)
+            )
+            state = self._new_state(matrix, ids, header["meta"])
+            with self._lock:
+                self._swap(state)
+                self.dirty = False
+            logger.info("Loaded local vector index with %d vectors from %s", len(ids), self.path)
+            return True
+        except (OSError, ValueError, KeyError) as e:
+            logger.error("Failed to load local vector index: %s", e)
+            return False
+
+    def save(self):
+        """Write the index to disk atomically and re-map it."""
+        state = self._state
+        matrix, ids, meta = state.matrix, state.ids, state.meta
+        os.makedirs(self.path, exist_ok=True)
+        vectors_file, ids_file, meta_file = self._files()
+        np.ascontiguousarray(matrix, dtype=np.float32).tofile(vectors_file + ".tmp")
+        with open(ids_file + ".tmp", "wb") as f:
+            np.save(f, ids)
+        with open(meta_file + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"model": self.model, "dims": matrix.shape[1], "meta": meta}, f)
+        for name in (vectors_file, ids_file, meta_file):
+            os.replace(name + ".tmp", name)
+        self.dirty = False
+        logger.info("Saved local vector index with %d vectors to %s", len(ids), self.path)
+
+    # Synchronisation with the graph
+
+    async def build_from_graph(self, page_size: int = VECTOR_INDEX_PAGE_SIZE):
+        """Rebuild the whole index from node embeddings stored in Neo4j."""
+        async with self._build_lock:
+            query = """
+            MATCH (n)
+            WHERE n.embedding IS NOT NULL AND id(n) > $after
+            RETURN id(n) AS nodeId, n.embedding AS embedding, labels(n) AS labels,
+                   n.name AS name, n.description AS description, n.significance AS significance
+            ORDER BY nodeId
+            LIMIT $limit
+            """
+            rows: List[Dict[str, Any]] = []
+            after = -1
+            while True:
+                page = await get_db().execute_read(query, {"after": after, "limit": page_size}, name="vector_index_build")
+                rows.extend(page)
+                if len(page) < page_size:
+                    break
+                after = page[-1]["nodeId"]
+
+            if rows:
+                matrix = _normalise(np.asarray([row["embedding"] for row in rows], dtype=np.float32))
+            else:
+                matrix = np.zeros((0, 0), dtype=np.float32)
+            ids = np.asarray([row["nodeId"] for row in rows], dtype=np.int64)
+            meta = [{field: row.get(field) for field in META_FIELDS} for row in rows]
+            state = self._new_state(matrix, ids, meta)
+            with self._lock:
+                self._swap(state)
+                self.dirty = True
+            logger.info("Built local vector index with %d vectors from Neo4j", len(ids))
+
+    async def ensure_loaded(self):
+        """Load the index from disk, or build it from the graph if absent."""
+        if self.loaded:
+            return
+        if not await asyncio.to_thread(self.load):
+            await self.build_from_graph()
+            await asyncio.to_thread(self.save)
+
+    def upsert(self, rows: Sequence[Dict[str, Any]]):
+        """
+        Insert or replace vectors after their embeddings changed.
+
+        Args:
+            rows (Sequence[Dict]): Items with "nodeId", "embedding" and
+                optionally the META_FIELDS properties
+        """
+        if not rows:
+            return
+        vectors = _normalise(np.asarray([row["embedding"] for row in rows], dtype=np.float32))
+        with self._lock:
+            current = self._state
+            if len(current.ids) and vectors.shape[1] != self.dims:
+                raise ValueError(f"Expected {self.dims}-dim vectors, got {vectors.shape[1]}")
+            meta, row_of = current.meta, current.row_of
+            used = len(current.ids)
+            positions = []
+            appended: Dict[int, int] = {}
+            for row in rows:
+                node_id = int(row["nodeId"])
+                position = row_of.get(node_id, appended.get(node_id))
+                if position is None:
+                    position = appended[node_id] = used + len(appended)
+                positions.append(position)
+            size = used + len(appended)
+            self._reserve(size, vectors.shape[1])
+            matrix, ids, codes, scales = self._buffers
+            positions = np.asarray(positions, dtype=np.int64)
+            matrix[positions] = vectors
+            if codes is not None:
+                # Only the written rows are re-quantized
+                codes[positions], scales[positions] = quantize(vectors)
+            for node_id, position in appended.items():
+                ids[position] = node_id
+            for row, position in zip(rows, positions.tolist()):
+                props = {field: row.get(field) for field in META_FIELDS}
+                if position < len(meta):
+                    # Keep known properties if the update row only carries the vector
+                    meta[position] = {k: v if v is not None else meta[position].get(k) for k, v in props.items()}
+                else:
+                    meta.append(props)
+            # New ids last, so a search on an earlier state never finds a
+            # row it can't see
+            row_of.update(appended)
+            self._state = _IndexState(
+                matrix[:size], ids[:size], meta, row_of,
+                codes[:size] if codes is not None else None,
+                scales[:size] if scales is not None else None,
+            )
+            self.loaded = True
+            self.dirty = True
+
+    def remove(self, node_ids: Sequence[int]):
+        """Drop vectors for nodes whose embeddings were removed."""
+        with self._lock:
+            current = self._state
+            rows = [current.row_of[int(n)] for n in node_ids if int(n) in current.row_of]
+            if not rows:
+                return
+            keep = np.ones(len(current.ids), dtype=bool)
+            keep[rows] = False
+            meta = [m for m, k in zip(current.meta, keep) if k]
+            self._swap(self._new_state(np.asarray(current.matrix[keep]), current.ids[keep], meta))
+            self.dirty = True
+
+    # Search
+
+    def search_batch(self, queries: Sequence[Sequence[float]], limit: int = 5,
+                     node_ids: Optional[AbstractSet[int]] = None) -> List[List[Dict[str, Any]]]:
+        """
+        Top-k cosine search for several query vectors at once.
+
+        Args:
+            queries (Sequence[Sequence[float]]): Query embeddings
+            limit (int): Results per query
+            node_ids (AbstractSet[int], optional): Only score these nodes
+
+        Returns:
+            List[List[Dict]]: Per-query hits shaped like vector_search rows
+        """
+        # Read the state once so a concurrent swap can't mix two versions
+        state = self._state
+        matrix, ids, meta, row_of = state.matrix, state.ids, state.meta, state.row_of
+        codes, scales = state.codes, state.scales
+        if node_ids is not None:
+            # Score only the rows in scope, so out-of-scope nodes never
+            # compete for the top k
+            # Rows appended after this state was taken are past its end
+            rows = np.fromiter(sorted(row for row in (row_of.get(n) for n in node_ids)
+                                      if row is not None and row < len(ids)), dtype=np.int64)
+            matrix, ids = np.asarray(matrix[rows]), ids[rows]
+            meta = [meta[row] for row in rows]
+            if codes is not None:
+                codes, scales = codes[rows], scales[rows]
+        if limit <= 0 or not len(ids) or not len(queries):
+            return [[] for _ in queries]
+
+        q = _normalise(np.asarray(queries, dtype=np.float32).reshape(len(queries), -1))
+        k = min(limit, len(ids))
+        if codes is None:
+            scores = q @ matrix.T
+        else:
+            scores = self._approximate_scores(q, codes, scales)
+            # Widen the first pass; the exact re-rank below picks the final k
+            k = min(limit * self.rerank_factor, len(ids))
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+
+        results = []
+        for query, query_scores, candidates in zip(q, scores, top):
+            if codes is None:
+                candidate_scores = query_scores[candidates]
+            else:
+                # Sorted rows read the memory-mapped matrix sequentially
+                candidates = np.sort(candidates)
+                candidate_scores = np.asarray(matrix[candidates]) @ query
+            order = np.argsort(-candidate_scores)[:limit]
+            results.append([
+                {
+                    "nodeId": int(ids[candidates[i]]),
+                    **meta[candidates[i]],
+                    "score": float((1.0 + candidate_scores[i]) / 2.0),
+                }
+                for i in order
+            ])
+        return results
+
+    @staticmethod
+    def _approximate_scores(q: np.ndarray, codes: np.ndarray, scales: np.ndarray) -> np.ndarray:
+        """Cosine scores against the int8 codes, widened chunk by chunk."""
+        scores = np.empty((len(q), len(codes)), dtype=np.float32)
+        for start in range(0, len(codes), _SCAN_CHUNK_ROWS):
+            block = codes[start:start + _SCAN_CHUNK_ROWS]
+            scores[:, start:start + len(block)] = (q @ block.astype(np.float32).T) * scales[start:start + len(block)]
+        return scores
+
+    def search(self, query: Sequence[float], limit: int = 5,
+               node_ids: Optional[AbstractSet[int]] = None) -> List[Dict[str, Any]]:
+        """Top-k cosine search for a single query vector."""
+        return self.search_batch([query], limit, node_ids)[0]
+
+
+# Singleton instance
+vector_index = LocalVectorIndex()
+
+def get_vector_index() -> LocalVectorIndex:
+    """
+    Get the local vector index instance.
+
+    Returns:
+        LocalVectorIndex: Index instance
+    """
+    return vector_index
+
+def use_local_index() -> bool:
+    """Whether vector search is configured to use the local index."""
+    return VECTOR_SEARCH_BACKEND == "local"
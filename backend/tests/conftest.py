@@ -0,0 +1,26 @@
+import pytest
+
+from benchmarks.fakes import FakeNeo4jDatabase
+from services import db as db_module
+from services.embedding_cache import text_hash
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    """A small synthetic catalogue installed as the process-wide database."""
+    db = FakeNeo4jDatabase(subtypes=3, items_per_subtype=4, latency=0)
+    monkeypatch.setattr(db_module, "database", db)
+    return db
+
+
+@pytest.fixture
+def large_fake_db(monkeypatch):
+    """A catalogue of 100 nodes without embeddings, so a refresh has pages to do."""
+    db = FakeNeo4jDatabase(subtypes=10, items_per_subtype=9, latency=0, embedded=False)
+    monkeypatch.setattr(db_module, "database", db)
+    return db
+
+
+def is_embedded(node):
+    """Whether a fake node has a vector for its current text and model."""
+    return "embedding" in node and node.get("embedding_hash") == text_hash(node["description"])
@@ -0,0 +1,21 @@
+from routers.ask import build_prompt, reciprocal_rank_fusion
+
+
+def test_fusion_keeps_vector_similarity_and_adds_fused_score():
+    vector = [{"nodeId": 1, "name": "a", "score": 0.8}, {"nodeId": 2, "name": "b", "score": 0.7}]
+    lexical = [{"nodeId": 3, "name": "c"}, {"nodeId": 2, "name": "b"}]
+
+    fused = reciprocal_rank_fusion([vector, lexical], 3)
+
+    by_id = {node["nodeId"]: node for node in fused}
+    assert fused[0]["nodeId"] == 2
+    assert by_id[1]["score"] == 0.8 and by_id[2]["score"] == 0.7
+    assert "score" not in by_id[3]
+    assert all(0 < node["fused_score"] <= 1 for node in fused)
+
+
+def test_sources_report_similarity_only_for_vector_hits():
+    nodes = reciprocal_rank_fusion([[{"nodeId": 3, "name": "NTUSER.DAT"}]], 5)
+    _prompt, sources = build_prompt("where is NTUSER.DAT", nodes)
+    assert sources[0]["relevance_score"] is None
+    assert sources[0]["fused_score"] == 100.0
@@ -0,0 +1,30 @@
+import asyncio
+import time
+
+from services.catalog import CatalogVersion
+
+
+def test_version_poll_serves_cached_version_when_neo4j_hangs(fake_db, monkeypatch):
+    version = CatalogVersion(poll_interval=0, timeout=0.05)
+    asyncio.run(version.current())
+    assert version.version == fake_db.catalog_version
+
+    async def unreachable(query, parameters=None, name=None, timeout=None):
+        await asyncio.sleep(30)
+
+    # A managed read would retry a lost connection; the poll must not use one
+    monkeypatch.setattr(fake_db, "execute_read", unreachable)
+    monkeypatch.setattr(fake_db, "execute_query", unreachable)
+    started = time.monotonic()
+    assert asyncio.run(version.current()) == fake_db.catalog_version
+    assert time.monotonic() - started < 1
+
+
+def test_version_poll_notifies_listeners_of_changes(fake_db):
+    version = CatalogVersion(poll_interval=0)
+    seen = []
+    version.on_change(seen.append)
+    asyncio.run(version.current())
+    fake_db.catalog_version += 1
+    asyncio.run(version.current())
+    assert seen == [fake_db.catalog_version - 1, fake_db.catalog_version]
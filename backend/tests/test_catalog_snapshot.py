@@ -0,0 +1,20 @@
+from services.catalog_snapshot import CatalogSnapshot
+
+
+def _row(subtype, subtype_id, name=None, node_id=None):
+    return {"subtype": subtype, "subtypeId": subtype_id, "name": name, "nodeId": node_id,
+            "significance": None, "android": ["/data/a.db"], "windows": []}
+
+
+def test_unnamed_subtypes_are_skipped(caplog):
+    snapshot = CatalogSnapshot(3, [
+        _row(None, 7, "Orphan artifact", 8),
+        _row("Phishing", 1, "Browser history", 2),
+        _row("Stalking", 4),
+    ])
+
+    assert snapshot.subtypes == ("Phishing", "Stalking")
+    assert [item.name for item in snapshot.evidence("Phishing", "android")] == ["Browser history"]
+    assert snapshot.evidence("Stalking", "android") == ()
+    assert snapshot.resolve(" phishing ") == "Phishing"
+    assert "without a name: [7]" in caplog.text
@@ -0,0 +1,101 @@
+import asyncio
+import functools
+import os
+import threading
+
+from benchmarks.fakes import fake_embedding
+from conftest import is_embedded
+from services import embedding, embedding_jobs, embedding_pipeline
+from services.embedding_jobs import COMPLETED, INTERRUPTED, EmbeddingJobManager
+
+
+def _install(monkeypatch, db, calls_before_halfway=None, hold_until=None):
+    """
+    Run jobs against the fake database with small pages and fake vectors.
+
+    Once ``calls_before_halfway`` embed calls have started, the returned
+    event is set and later calls wait for ``hold_until()``, so the job
+    can't finish before the test stops it.
+    """
+    halfway = threading.Event()
+    calls = []
+
+    async def generate_embeddings(texts, timeout=None):
+        calls.append(len(texts))
+        if calls_before_halfway is not None and len(calls) >= calls_before_halfway:
+            halfway.set()
+            while hold_until is not None and not hold_until():
+                await asyncio.sleep(0.001)
+        await asyncio.sleep(0.002)
+        return [fake_embedding(text) for text in texts]
+
+    monkeypatch.setattr(embedding, "generate_embeddings", generate_embeddings)
+    monkeypatch.setattr(embedding_jobs, "Neo4jDatabase", lambda **_kwargs: db)
+    monkeypatch.setattr(embedding_pipeline, "run_embedding_refresh", functools.partial(
+        embedding_pipeline.run_embedding_refresh, page_size=10, batch_size=2, concurrency=2, write_batch_size=4,
+    ))
+    return halfway
+
+
+async def _wait(job):
+    # The server's loop must keep running: the job publishes its bump on it
+    while job.active:
+        await asyncio.sleep(0.01)
+    return job
+
+
+def test_completed_job_clears_its_checkpoint_and_bumps_the_version(large_fake_db, monkeypatch, tmp_path):
+    _install(monkeypatch, large_fake_db)
+    manager = EmbeddingJobManager(checkpoint_path=str(tmp_path / "job.json"))
+    version = large_fake_db.catalog_version
+
+    async def scenario():
+        job, started = manager.start()
+        again, started_again = manager.start()
+        assert started and not started_again and again is job
+        return await _wait(job)
+
+    job = asyncio.run(scenario())
+    manager.shutdown()
+
+    assert job.status == COMPLETED, job.error
+    assert job.stats.processed == job.total == len(large_fake_db.nodes)
+    assert all(is_embedded(node) for node in large_fake_db.nodes.values())
+    assert not os.path.exists(manager.checkpoint_path)
+    assert large_fake_db.catalog_version == version + 1
+
+
+def test_interrupted_job_resumes_from_its_checkpoint(large_fake_db, monkeypatch, tmp_path):
+    checkpoint_path = str(tmp_path / "job.json")
+    first = EmbeddingJobManager(checkpoint_path=checkpoint_path)
+    halfway = _install(monkeypatch, large_fake_db, calls_before_halfway=15,
+                       hold_until=lambda: first._shutting_down)
+
+    async def interrupt():
+        job, _started = first.start()
+        await asyncio.to_thread(halfway.wait)
+        # As on server shutdown: off the loop, which the job still needs
+        await asyncio.to_thread(first.shutdown)
+        return job
+
+    interrupted = asyncio.run(interrupt())
+    assert interrupted.status == INTERRUPTED
+    checkpoint = first.load_checkpoint()
+    cursor = checkpoint["cursor"]
+    assert -1 < cursor < max(large_fake_db.nodes)
+    assert all(is_embedded(node) for node_id, node in large_fake_db.nodes.items() if node_id <= cursor)
+
+    second = EmbeddingJobManager(checkpoint_path=checkpoint_path)
+
+    async def resume():
+        job = await second.resume_interrupted()
+        assert job is not None and job.resumed and job.cursor == cursor
+        return await _wait(job)
+
+    resumed = asyncio.run(resume())
+    second.shutdown()
+
+    assert resumed.status == COMPLETED, resumed.error
+    assert all(is_embedded(node) for node in large_fake_db.nodes.values())
+    assert resumed.stats.processed >= checkpoint["processed"]
+    assert not os.path.exists(checkpoint_path)
@@ -0,0 +1,75 @@
+import asyncio
+import random
+
+from benchmarks.fakes import fake_embedding
+from conftest import is_embedded
+from services import embedding
+from services.embedding_pipeline import run_embedding_refresh
+
+
+def _embedder(monkeypatch, fail_node_text=None, seed=0):
+    """
+    Replace the Ollama call with fake vectors, finishing batches out of order.
+
+    Returns:
+        set: Texts of the batches that failed
+    """
+    rng = random.Random(seed)
+    failed = set()
+
+    async def generate_embeddings(texts, timeout=None):
+        await asyncio.sleep(rng.random() * 0.01)
+        if fail_node_text in texts:
+            failed.update(texts)
+            return None
+        return [fake_embedding(text) for text in texts]
+
+    monkeypatch.setattr(embedding, "generate_embeddings", generate_embeddings)
+    return failed
+
+
+def test_checkpoint_only_passes_settled_nodes(large_fake_db, monkeypatch):
+    failing = large_fake_db.nodes[37]["description"]
+    failed = _embedder(monkeypatch, fail_node_text=failing)
+    checkpoints = []
+
+    def on_checkpoint(cursor, stats):
+        # Every node up to the cursor was written, or given up on
+        unsettled = [node_id for node_id, node in large_fake_db.nodes.items()
+                     if node_id <= cursor and not is_embedded(node) and node["description"] not in failed]
+        assert not unsettled, f"checkpoint {cursor} passed unsettled nodes {unsettled}"
+        checkpoints.append(cursor)
+
+    stats = asyncio.run(run_embedding_refresh(
+        page_size=10, batch_size=3, concurrency=4, write_batch_size=4, on_checkpoint=on_checkpoint,
+    ))
+
+    assert checkpoints == sorted(set(checkpoints))
+    assert checkpoints[-1] == max(large_fake_db.nodes)
+    assert stats.processed + stats.failed == len(large_fake_db.nodes)
+    assert stats.failed == len(failed) > 0
+    # Failed nodes stay dirty, so the next refresh retries them
+    assert not is_embedded(large_fake_db.nodes[37])
+
+
+def test_resume_from_checkpoint_finishes_the_catalogue(large_fake_db, monkeypatch):
+    _embedder(monkeypatch)
+    checkpoints = []
+    stop_after = 3
+
+    first = asyncio.run(run_embedding_refresh(
+        page_size=10, batch_size=3, concurrency=2, write_batch_size=4,
+        on_checkpoint=lambda cursor, _stats: checkpoints.append(cursor),
+        should_stop=lambda: len(checkpoints) >= stop_after,
+    ))
+    cursor = checkpoints[-1]
+    assert cursor < max(large_fake_db.nodes)
+    assert all(is_embedded(node) for node_id, node in large_fake_db.nodes.items() if node_id <= cursor)
+
+    second = asyncio.run(run_embedding_refresh(page_size=10, batch_size=3, concurrency=2,
+                                               write_batch_size=4, after=cursor))
+
+    assert all(is_embedded(node) for node in large_fake_db.nodes.values())
+    # Nothing up to the checkpoint is embedded twice
+    assert second.processed <= len(large_fake_db.nodes) - (cursor + 1)
+    assert first.processed + second.processed >= len(large_fake_db.nodes)
@@ -0,0 +1,60 @@
+import asyncio
+
+import httpx
+import pytest
+
+from services.ollama import CircuitBreaker, OllamaClient, OllamaError, OllamaUnavailableError
+
+
+def _client(handler, max_retries=0, threshold=2):
+    client = OllamaClient(base_url="http://ollama.test", timeout=1, max_retries=max_retries)
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    client.breaker = CircuitBreaker(threshold=threshold, reset_timeout=60)
+    return client
+
+
+def test_malformed_body_raises_ollama_error_and_counts_as_failure():
+    client = _client(lambda request: httpx.Response(200, content=b'{"embedding": [0.1,'))
+
+    for _ in range(2):
+        with pytest.raises(OllamaError):
+            asyncio.run(client.embeddings("text"))
+    assert client.breaker.state == "open"
+
+
+def test_malformed_body_is_retried():
+    bodies = iter([b"not json", b'{"embedding": [0.5]}'])
+    client = _client(lambda request: httpx.Response(200, content=next(bodies)), max_retries=1)
+    assert asyncio.run(client.embeddings("text")) == [0.5]
+    assert client.breaker.failures == 0
+
+
+def test_caller_errors_do_not_trip_the_breaker():
+    client = _client(lambda request: httpx.Response(404, json={"error": "model not found"}))
+    for _ in range(5):
+        with pytest.raises(OllamaError):
+            asyncio.run(client.embeddings("text"))
+    assert client.breaker.state == "closed"
+
+
+def test_half_open_breaker_admits_a_single_trial():
+    calls = []
+
+    async def handler(request):
+        calls.append(request.url.path)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"embedding": [1.0]})
+
+    client = _client(handler)
+    # Opened long enough ago that the reset window has passed
+    client.breaker.failures = client.breaker.threshold
+    client.breaker.opened_at = -client.breaker.reset_timeout
+
+    async def burst():
+        return await asyncio.gather(*(client.embeddings("text") for _ in range(5)), return_exceptions=True)
+
+    results = asyncio.run(burst())
+    assert len(calls) == 1
+    assert results.count([1.0]) == 1
+    assert sum(isinstance(r, OllamaUnavailableError) for r in results) == 4
+    assert client.breaker.state == "closed"
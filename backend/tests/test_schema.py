@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from services import schema
+from services.db import NODE_LABELS
+
+
+class _SchemaDb:
+    """Records schema statements; CrimeSubtype names may be duplicated."""
+
+    def __init__(self, duplicates=()):
+        self.duplicates = list(duplicates)
+        self.created = []
+
+    async def execute_read(self, query, parameters=None, name=None, timeout=None):
+        assert name == "schema_duplicates"
+        return self.duplicates
+
+    async def execute_write(self, query, parameters=None, name=None, timeout=None):
+        self.created.append(query)
+        return []
+
+
+def test_duplicate_names_skip_the_constraint_without_failing(monkeypatch, caplog):
+    db = _SchemaDb([{"value": "Phishing", "nodes": 2}])
+    monkeypatch.setattr(schema, "get_db", lambda: db)
+
+    asyncio.run(schema.bootstrap_schema(check_plans=False))
+
+    assert not any("crime_subtype_name_unique" in statement for statement in db.created)
+    assert len(db.created) == len(schema.CONSTRAINTS) + len(schema.INDEXES) - 1
+    assert "'Phishing' (2 nodes)" in caplog.text
+
+
+def test_other_create_failures_are_fatal(monkeypatch):
+    db = _SchemaDb()
+
+    async def execute_write(query, parameters=None, name=None, timeout=None):
+        raise Exception("Query execution failed: permission denied")
+
+    monkeypatch.setattr(db, "execute_write", execute_write)
+    monkeypatch.setattr(schema, "get_db", lambda: db)
+
+    with pytest.raises(schema.SchemaError):
+        asyncio.run(schema.bootstrap_schema(check_plans=False))
+
+
+def test_id_lookups_seek_each_label_index():
+    # A label disjunction can plan as a union label scan; each UNION
+    # branch matches a single label, which its id index serves
+    query = schema.HOT_QUERIES["node_by_id"].query
+    assert "|" not in query
+    assert query.count("UNION") == len(NODE_LABELS) - 1
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from services.vector_index import LocalVectorIndex
+
+
+def _rows(rng, node_ids, dims=16):
+    return [{"nodeId": n, "embedding": rng.normal(size=dims).tolist(), "name": f"node {n}"} for n in node_ids]
+
+
+@pytest.mark.parametrize("quantization", ["none", "int8"])
+def test_incremental_upserts_match_a_fresh_index(tmp_path, quantization):
+    rng = np.random.default_rng(0)
+    incremental = LocalVectorIndex(path=str(tmp_path), quantization=quantization)
+    latest = {}
+    # Appends that outgrow the buffers, replacements, and a node twice in one batch
+    for batch in (range(0, 50), range(40, 130), [5, 5, 200], range(100, 300)):
+        rows = _rows(rng, list(batch))
+        incremental.upsert(rows)
+        latest.update({row["nodeId"]: row for row in rows})
+
+    fresh = LocalVectorIndex(path=str(tmp_path), quantization=quantization)
+    fresh.upsert(list(latest.values()))
+
+    assert len(incremental) == len(fresh) == len(latest)
+    queries = rng.normal(size=(4, 16))
+    for got, expected in zip(incremental.search_batch(queries, 5), fresh.search_batch(queries, 5)):
+        assert [hit["nodeId"] for hit in got] == [hit["nodeId"] for hit in expected]
+        assert [hit["name"] for hit in got] == [f"node {hit['nodeId']}" for hit in got]
+
+
+def test_earlier_state_ignores_rows_appended_after_it(tmp_path):
+    rng = np.random.default_rng(1)
+    index = LocalVectorIndex(path=str(tmp_path))
+    index.upsert(_rows(rng, range(10)))
+    before = index._state
+    index.upsert(_rows(rng, range(10, 20)))
+
+    index._state, after = before, index._state
+    hits = index.search(rng.normal(size=16), 5, node_ids={3, 15})
+    assert [hit["nodeId"] for hit in hits] == [3]
+    index._state = after
+    assert len(index.search(rng.normal(size=16), 5, node_ids={3, 15})) == 2
+
+
+def test_upsert_leaves_the_saved_file_untouched(tmp_path):
+    rng = np.random.default_rng(2)
+    index = LocalVectorIndex(path=str(tmp_path))
+    index.upsert(_rows(rng, range(10)))
+    index.save()
+    saved = (tmp_path / "vectors.f32").read_bytes()
+
+    loaded = LocalVectorIndex(path=str(tmp_path))
+    assert loaded.load()
+    loaded.upsert(_rows(rng, [3]))
+    assert (tmp_path / "vectors.f32").read_bytes() == saved
+    assert loaded.dirty
+
+
+def test_non_positive_limit_returns_no_hits(tmp_path):
+    index = LocalVectorIndex(path=str(tmp_path))
+    index.upsert(_rows(np.random.default_rng(3), range(5)))
+    assert index.search_batch([[1.0] * 16], 0) == [[]]
+    assert index.search_batch([[1.0] * 16], -2, node_ids={1}) == [[]]
@@ -0,0 +1,84 @@
+import asyncio
+
+from neo4j.exceptions import CypherSyntaxError
+
+from benchmarks.fakes import fake_embedding
+from services import embedding
+from services.db import NEO4J_SESSIONS_IN_USE, Neo4jDatabase
+
+
+class _RejectingSession:
+    """Driver session whose server doesn't know a function in the query."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute_read(self, work):
+        raise CypherSyntaxError("Unknown function 'vector.similarity.cosine'")
+
+
+class _RejectingDriver:
+    def session(self, **config):
+        return _RejectingSession()
+
+
+def _old_server_db():
+    """A real Neo4jDatabase, without connecting, whose queries all fail to parse."""
+    db = Neo4jDatabase.__new__(Neo4jDatabase)
+    db.driver = _RejectingDriver()
+    db.bookmark_manager = None
+    db._sessions_in_use = NEO4J_SESSIONS_IN_USE.labels("test")
+    return db
+
+
+def test_driver_error_is_kept_as_cause():
+    db = _old_server_db()
+    try:
+        asyncio.run(db.execute_read(embedding.SCOPED_SEARCH_QUERY, {}, name="vector_search_scoped"))
+    except Exception as e:
+        assert isinstance(e.__cause__, CypherSyntaxError)
+    else:
+        raise AssertionError("query should have failed")
+
+
+def test_scoped_search_falls_back_to_over_fetch(fake_db, monkeypatch):
+    monkeypatch.setattr(embedding, "_scoped_search_supported", True)
+    old_server = _old_server_db()
+
+    async def execute_read(query, parameters=None, name=None, timeout=None):
+        # Only the exact scoped query uses vector.similarity.cosine
+        if name == "vector_search_scoped":
+            return await old_server.execute_read(query, parameters, name)
+        return await fake_db.execute_query(query, parameters, name)
+
+    monkeypatch.setattr(fake_db, "execute_read", execute_read)
+    items = fake_db.subtype_items[next(iter(fake_db.subtype_items))]
+    query = fake_embedding(fake_db.nodes[items[0]]["description"])
+
+    results = asyncio.run(embedding.neo4j_vector_search_batch([query], 3, node_ids=frozenset(items)))
+
+    assert embedding._scoped_search_supported is False
+    assert fake_db.calls.get("vector_search_batch", 0) >= 1
+    assert results[0] and all(hit["nodeId"] in items for hit in results[0])
+    assert results[0][0]["nodeId"] == items[0]
+
+
+def test_over_fetch_stops_when_fetch_stops_growing(monkeypatch):
+    fetches = []
+
+    async def index_search_batch(query_embeddings, limit):
+        fetches.append(limit)
+        # Full pages of out-of-scope hits, so every query stays short
+        return [[{"nodeId": -1 - n} for n in range(limit)] for _ in query_embeddings]
+
+    monkeypatch.setattr(embedding, "_index_search_batch", index_search_batch)
+    monkeypatch.setattr(embedding, "_scoped_search_supported", False)
+
+    results = asyncio.run(embedding.neo4j_vector_search_batch([[1.0]], 5, node_ids=frozenset({1})))
+
+    assert results == [[]]
+    assert fetches == sorted(set(fetches))
+    assert fetches[-1] == embedding.VECTOR_FILTER_MAX_FETCH
@@ -1,6 +1,6 @@
 import React, { useState, useRef, useEffect } from 'react';
 import { useParams } from 'react-router-dom';
-import { askQuestion, QuestionResponse } from '../services/api';
+import { askQuestionStream, QuestionResponse } from '../services/api';
 import Navbar from '../components/Navbar';
 import Sidebar from '../components/Sidebar';
 import ChatBox from '../components/ChatBox';
@@ -18,6 +18,10 @@ const ChatPage: React.FC = () => {
     { type: 'assistant', content: `Welcome to the Digital Crime Investigation Assistant chat. How can I help you with your ${crimeType} investigation on ${deviceType} devices?` }
   ]);
   const messagesEndRef = useRef<HTMLDivElement>(null);
+  const streamAbortRef = useRef<AbortController | null>(null);
+
+  // Stop any in-flight answer stream when leaving the page
+  useEffect(() => () => streamAbortRef.current?.abort(), []);
 
   const toggleSidebar = () => {
     setSidebarOpen(!sidebarOpen);
@@ -36,39 +40,71 @@ const ChatPage: React.FC = () => {
     // Show loading indicator
     setIsLoading(true);
     
+    // Abort any answer still streaming for a previous question
+    streamAbortRef.current?.abort();
+    const controller = new AbortController();
+    streamAbortRef.current = controller;
+    let streamStarted = false;
+
     try {
-      // Call API for semantic search and LLM response
-      const response: QuestionResponse = await askQuestion(message);
-      
-      // Format the answer with source information if available
-      let formattedAnswer = response.answer;
-      
-      // Add sources information if available
-      if (response.sources && response.sources.length > 0) {
-        formattedAnswer += '\n\nSources:\n';
-        response.sources.forEach((source, index) => {
-          formattedAnswer += `${index + 1}. ${source.name} (${Math.round(source.relevance_score)}% relevance)\n`;
-        });
-      }
-      
-      // Add response to chat history
-      setChatHistory(prev => [
-        ...prev,
-        { type: 'assistant', content: formattedAnswer }
-      ]);
+      // Stream the answer into a new assistant message as tokens arrive
+      let answer = '';
+      let sources: QuestionResponse['sources'] = [];
+
+      const render = () => {
+        let formattedAnswer = answer;
+
+        // Add sources information if available
+        if (sources.length > 0) {
+          formattedAnswer += '\n\nSources:\n';
+          sources.forEach((source, index) => {
+            const relevance = source.relevance_score === null
+              ? 'keyword match'
+              : `${Math.round(source.relevance_score)}% relevance`;
+            formattedAnswer += `${index + 1}. ${source.name} (${relevance})\n`;
+          });
+        }
+        return formattedAnswer;
+      };
+
+      const updateLastMessage = () => {
+        setChatHistory(prev => [
+          ...prev.slice(0, -1),
+          { type: 'assistant', content: render() }
+        ]);
+      };
+
+      await askQuestionStream(message, {
+        onSources: (received) => {
+          // Sources arrive before the first token: open the assistant message
+          sources = received;
+          streamStarted = true;
+          setIsLoading(false);
+          setChatHistory(prev => [...prev, { type: 'assistant', content: render() }]);
+        },
+        onToken: (token) => {
+          answer += token;
+          updateLastMessage();
+        },
+      }, controller.signal);
     } catch (error) {
+      if (controller.signal.aborted) return;
       console.error('Error getting answer:', error);
       
-      // Add error message to chat
-      setChatHistory(prev => [
-        ...prev,
-        { 
-          type: 'assistant', 
-          content: 'I encountered an error while processing your question. Please try again later.'
-        }
-      ]);
+      // Add error message to chat, replacing a partially streamed answer
+      const errorMessage = { 
+        type: 'assistant' as const, 
+        content: 'I encountered an error while processing your question. Please try again later.'
+      };
+      setChatHistory(prev => streamStarted
+        ? [...prev.slice(0, -1), errorMessage]
+        : [...prev, errorMessage]
+      );
     } finally {
-      setIsLoading(false);
+      // An aborted stream must not clear the indicator of the question that replaced it
+      if (streamAbortRef.current === controller) {
+        setIsLoading(false);
+      }
     }
   };
 
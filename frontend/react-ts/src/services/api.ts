@@ -62,11 +62,12 @@ export const fetchEvidenceItems = async (
 
 /**
  * Trigger an embedding refresh job
- * @returns {Promise<{message: string, job_started: boolean, nodes_to_process: number}>}
+ * @returns {Promise<{message: string, job_started: boolean, job_id: string | null, nodes_to_process: number}>}
  */
 export const refreshEmbeddings = async (): Promise<{
   message: string;
   job_started: boolean;
+  job_id: string | null;
   nodes_to_process: number;
 }> => {
   try {
@@ -97,7 +98,10 @@ export interface QuestionResponse {
   sources: Array<{
     name: string;
     type: string;
-    relevance_score: number;
+    // Vector similarity (0-100); null for keyword-only matches
+    relevance_score: number | null;
+    // Hybrid keyword + vector rank (0-100)
+    fused_score: number;
   }>;
 }
 
@@ -127,3 +131,74 @@ export const askQuestion = async (question: string): Promise<QuestionResponse> =
     throw error;
   }
 };
+
+/**
+ * Callbacks for a streamed answer
+ */
+export interface AnswerStreamHandlers {
+  onSources?: (sources: QuestionResponse['sources']) => void;
+  onToken: (token: string) => void;
+  onDone?: (timing: { ttft_ms: number | null; total_ms: number }) => void;
+}
+
+/**
+ * Ask a question and receive the answer as a Server-Sent Events stream.
+ * Sources arrive first, then tokens as the model generates them.
+ * Aborting the signal closes the connection, which stops generation on the server.
+ * @param {string} question - The user's question
+ * @param {AnswerStreamHandlers} handlers - Event callbacks
+ * @param {AbortSignal} signal - Optional abort signal
+ * @returns {Promise<void>} Resolves when the stream ends
+ */
+export const askQuestionStream = async (
+  question: string,
+  handlers: AnswerStreamHandlers,
+  signal?: AbortSignal
+): Promise<void> => {
+  const response = await fetch(`${API_BASE_URL}/ask/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+    },
+    body: JSON.stringify({ question }),
+    signal,
+  });
+
+  if (!response.ok || !response.body) {
+    const errorData = await response.json().catch(() => ({}));
+    throw new Error(errorData.detail || 'Failed to get answer');
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+
+  while (true) {
+    const { value, done } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const rawEvent = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      let event = 'message';
+      let data = '';
+      for (const line of rawEvent.split('\n')) {
+        if (line.startsWith('event: ')) event = line.slice(7);
+        else if (line.startsWith('data: ')) data += line.slice(6);
+      }
+      if (!data) continue;
+      const payload = JSON.parse(data);
+
+      if (event === 'sources') handlers.onSources?.(payload.sources);
+      else if (event === 'token') handlers.onToken(payload.token);
+      else if (event === 'done') handlers.onDone?.(payload);
+      else if (event === 'error') throw new Error(payload.detail || 'Failed to get answer');
+    }
+  }
+};